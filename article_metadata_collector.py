@@ -5,89 +5,38 @@ from urllib.parse import urlparse, parse_qs
 import time
 import re
 import os
+from datetime import datetime, UTC
 from typing import List, Dict
 import yaml
 from loguru import logger
 from utils import commit_and_push, controlled_request
+from storage import get_store
+from semantic_scholar import SemanticScholarClient
+from citation_refresh import refresh_citations
+from paper_identifiers import IdentifierIndex, extract_arxiv_id, parse_bibtex
+from serialization import load_json, save_json
 
 # Load configuration
 with open('config.yaml', 'r') as config_file:
     config = yaml.safe_load(config_file)
 
-SEMANTIC_SCHOLAR_BATCH_URL = "https://api.semanticscholar.org/graph/v1/paper/batch"
-SEMANTIC_SCHOLAR_FIELDS = "title,authors,abstract,year,venue,url,doi,arxivId,paperId,citationCount,influentialCitationCount,referenceCount"
-BATCH_SIZE = 500  # Maximum allowed by the API
 COMMIT_INTERVAL = config['COMMIT_INTERVAL']
 CHUNK_SIZE = config['CHUNK_SIZE']
 #RATE_LIMIT_THRESHOLD = config['RATE_LIMIT_THRESHOLD']
 ARXIV_METADATA_FILE = config['ARXIV_METADATA_FILE']
+CITATION_REFRESH_BUDGET = config['CITATION_REFRESH_BUDGET']
 
 # Configure logger
 logger.add("arxiv_metadata_collector.log", rotation="10 MB")
 
-def extract_arxiv_id(url_or_id):
-    # Check if it's a URL
-    if url_or_id.startswith('http'):
-        parsed_url = urlparse(url_or_id)
-        if parsed_url.netloc == 'arxiv.org':
-            path_parts = parsed_url.path.split('/')
-            if 'abs' in path_parts or 'pdf' in path_parts:
-                return path_parts[-1].replace('.pdf', '').split('v')[0]  # Remove version number
-    else:
-        # Check if it's already an arXiv ID
-        arxiv_pattern = r'(\d{4}\.\d{4,5})(v\d+)?'
-        match = re.search(arxiv_pattern, url_or_id)
-        if match:
-            return match.group(1)  # Return only the base ID without version
-    return None
-
-def parse_bibtex(bibtex_str):
-    fields = {}
-    # Remove any surrounding whitespace and curly braces
-    bibtex_str = bibtex_str.strip().strip('{').strip('}')
-    
-    # Use regex to find all key-value pairs
-    pattern = r'(\w+)\s*=\s*[{"]?((?:[^{"}]|{[^}]*})*)["}]?'
-    matches = re.findall(pattern, bibtex_str, re.DOTALL)
-    
-    for key, value in matches:
-        key = key.lower()
-        value = value.strip().strip(',').strip('{').strip('}').strip()
-        if key == 'doi':
-            # Remove any surrounding quotes or braces from the DOI
-            value = value.strip('"').strip("'").strip('{').strip('}')
-        fields[key] = value
-    
-    return fields
+# Parses are cached by content hash, so dedup and process_papers share them and later runs reuse them
+identifier_index = IdentifierIndex()
 
 def extract_identifier(paper):
-    if 'url' in paper:
-        arxiv_id = extract_arxiv_id(paper['url'])
-        if arxiv_id:
-            return f"arxiv:{arxiv_id}"
-    elif 'bibtex' in paper:
-        bibtex_data = parse_bibtex(paper['bibtex'])
-        if 'doi' in bibtex_data:
-            return f"doi:{bibtex_data['doi']}"
-        elif 'arxiv' in bibtex_data:
-            arxiv_id = extract_arxiv_id(bibtex_data['arxiv'])
-            if arxiv_id:
-                return f"arxiv:{arxiv_id}"
-        elif 'title' in bibtex_data:
-            return f"title:{bibtex_data['title']}"
-    return None
+    return identifier_index.identifier(paper)
 
 def deduplicate_papers(papers):
-    unique_papers = []
-    seen_identifiers = set()
-
-    for paper in papers:
-        identifier = extract_identifier(paper)
-        if identifier and identifier not in seen_identifiers:
-            unique_papers.append(paper)
-            seen_identifiers.add(identifier)
-
-    return unique_papers
+    return identifier_index.deduplicate(papers)
 
 def fetch_arxiv_metadata_batch(arxiv_ids):
     base_url = "http://export.arxiv.org/api/query"
@@ -175,57 +124,46 @@ def fetch_semantic_scholar_data(identifier, id_type='arxiv'):
         }
     return None
 
-def fetch_semantic_scholar_data_batch(identifiers: List[Dict[str, str]]) -> Dict[str, Dict]:
+def semantic_scholar_record(paper):
+    external_ids = paper.get('externalIds') or {}
+    return {
+        'source': 'Semantic Scholar',
+        'title': paper.get('title'),
+        'authors': [author['name'] for author in paper.get('authors') or []],
+        'abstract': paper.get('abstract'),
+        'year': paper.get('year'),
+        'venue': paper.get('venue'),
+        'url': paper.get('url'),
+        'doi': external_ids.get('DOI'),
+        'arxivId': external_ids.get('ArXiv'),
+        'paperId': paper.get('paperId'),
+        'citation_count': paper.get('citationCount'),
+        'influential_citation_count': paper.get('influentialCitationCount'),
+        'reference_count': paper.get('referenceCount')
+    }
+
+def fetch_semantic_scholar_data_batch(identifiers: List[Dict[str, str]], client=None) -> Dict[str, Dict]:
     """
     Fetch data for multiple papers from Semantic Scholar using the batch API.
     
     :param identifiers: List of dictionaries with 'id' and 'id_type' keys
+    :param client: SemanticScholarClient to use; a new one by default
     :return: Dictionary of paper data, keyed by the original identifier
     """
-    results = {}
-    for i in range(0, len(identifiers), BATCH_SIZE):
-        batch = identifiers[i:i+BATCH_SIZE]
-        ids = [f"{id_info['id_type']}:{id_info['id']}" for id_info in batch]
-        
-        response = controlled_request(
-            SEMANTIC_SCHOLAR_BATCH_URL,
-            method='post',
-            params={'fields': SEMANTIC_SCHOLAR_FIELDS},
-            json={"ids": ids}
-        )
-        
-        if response and response.status_code == 200:
-            batch_results = response.json()
-            for paper, id_info in zip(batch_results, batch):
-                if paper:  # Check if paper data is not None
-                    original_id = f"{id_info['id_type']}:{id_info['id']}"
-                    results[original_id] = {
-                        'source': 'Semantic Scholar',
-                        'title': paper.get('title'),
-                        'authors': [author['name'] for author in paper.get('authors', [])],
-                        'abstract': paper.get('abstract'),
-                        'year': paper.get('year'),
-                        'venue': paper.get('venue'),
-                        'url': paper.get('url'),
-                        'doi': paper.get('doi'),
-                        'arxivId': paper.get('arxivId'),
-                        'paperId': paper.get('paperId'),
-                        'citation_count': paper.get('citationCount'),
-                        'influential_citation_count': paper.get('influentialCitationCount'),
-                        'reference_count': paper.get('referenceCount')
-                    }
-    
-    return results
+    client = client or SemanticScholarClient()
+    papers = client.fetch([f"{id_info['id_type']}:{id_info['id']}" for id_info in identifiers])
+    client.log_stats()
+    if client.failed_ids:
+        logger.warning(f"{len(client.failed_ids)} identifiers could not be fetched; they stay missing and are retried next run.")
+    return {identifier: semantic_scholar_record(paper) for identifier, paper in papers.items()}
 
 def load_existing_data():
     if os.path.exists(ARXIV_METADATA_FILE):
-        with open(ARXIV_METADATA_FILE, 'r') as f:
-            return json.load(f)
+        return load_json(ARXIV_METADATA_FILE)
     return {"last_updated": None, "papers": {}}
 
 def save_data(data):
-    with open(ARXIV_METADATA_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+    save_json(data, ARXIV_METADATA_FILE)
 
 def process_papers(papers, existing_data):
     changes_made = False
@@ -242,9 +180,10 @@ def process_papers(papers, existing_data):
 
     if semantic_scholar_batch:
         semantic_scholar_data = fetch_semantic_scholar_data_batch(semantic_scholar_batch)
+        fetched_at = datetime.now(UTC).isoformat()
         for identifier, data in semantic_scholar_data.items():
             if data:
-                existing_data['papers'][identifier] = data
+                existing_data['papers'][identifier] = dict(data, fetched_at=fetched_at)
                 changes_made = True
 
     if changes_made:
@@ -256,12 +195,13 @@ def process_papers(papers, existing_data):
 def main():
     existing_data = load_existing_data()
 
-    with open('github_stars.json', 'r') as f:
-        github_stars_data = json.load(f)
+    github_stars_data = get_store().load()
 
     papers = []
     for repo_data in github_stars_data['repositories'].values():
         if 'arxiv' in repo_data:
+            for arxiv_id in repo_data['arxiv'].get('ids', []):
+                papers.append({'arxiv': arxiv_id})
             for url in repo_data['arxiv'].get('urls', []):
                 papers.append({'url': url})
             for bibtex in repo_data['arxiv'].get('bibtex_citations', []):
@@ -273,6 +213,13 @@ def main():
     logger.info(f"Deduplicated to {len(deduplicated_papers)} unique papers")
 
     process_papers(deduplicated_papers, existing_data)
+
+    if refresh_citations(existing_data['papers'], CITATION_REFRESH_BUDGET):
+        save_data(existing_data)
+        commit_and_push(ARXIV_METADATA_FILE)
+
+    identifier_index.save()
+    identifier_index.log_stats()
     logger.info("arXiv metadata collection completed")
 
 if __name__ == "__main__":
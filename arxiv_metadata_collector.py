@@ -1,12 +1,18 @@
 import json
 import os
 import re
+import threading
+from queue import Queue, Full
 import yaml
 
 from loguru import logger
 import arxiv
 
 from utils import commit_and_push
+from storage import get_store
+from serialization import load_json, save_json
+from migrations import SCHEMA_VERSION_KEY, current_version
+from negative_cache import NegativeCache
 
 # Load configuration
 with open('config.yaml', 'r') as config_file:
@@ -15,7 +21,11 @@ with open('config.yaml', 'r') as config_file:
 COMMIT_INTERVAL = config['COMMIT_INTERVAL']
 CHUNK_SIZE = config['CHUNK_SIZE']
 ARXIV_METADATA_FILE = 'arxiv_metadata.json'
-ARXIV_API_BATCH_SIZE = 100  # arxiv package default is 100 results per query
+ARXIV_NEGATIVE_CACHE_FILE = 'arxiv_negative_cache.json'  # IDs the API had nothing for, and when to retry them
+ARXIV_MAX_RESULTS = 2000  # Most results the API returns for one request
+ARXIV_ID_LIST_MAX_CHARS = 6000  # Keeps the id_list query string, commas URL-encoded, well under common 8KB URL limits
+ARXIV_DELAY_SECONDS = 3  # arXiv asks for no more than one request every three seconds
+ARXIV_PREFETCH = 2  # Batches fetched ahead of the one being parsed and saved
 
 # Configure logger
 logger.add("arxiv_metadata_collector.log", rotation="10 MB")
@@ -38,77 +48,183 @@ def extract_arxiv_id(url_or_id):
     
     return clean_arxiv_id(arxiv_id)
 
-def fetch_arxiv_metadata_batch(arxiv_ids):
-    client = arxiv.Client()
-    search = arxiv.Search(
-        id_list=arxiv_ids,
-        max_results=len(arxiv_ids)
-    )
-    
-    results = {}
-    for result in client.results(search):
-        arxiv_id = result.get_short_id()
-        arxiv_id = clean_arxiv_id(arxiv_id)
-        results[arxiv_id] = {
-            'id': result.entry_id,
-            'title': result.title,
-            'authors': [author.name for author in result.authors],
-            'abstract': result.summary,
-            'categories': result.categories,
-            'published': result.published.isoformat(),
-            'updated': result.updated.isoformat(),
-            'doi': result.doi,
-            'comment': result.comment,
-            'journal_ref': result.journal_ref,
-            'primary_category': result.primary_category
-        }
-    return results
+def result_metadata(result):
+    return {
+        'id': result.entry_id,
+        'title': result.title,
+        'authors': [author.name for author in result.authors],
+        'abstract': result.summary,
+        'categories': result.categories,
+        'published': result.published.isoformat(),
+        'updated': result.updated.isoformat(),
+        'doi': result.doi,
+        'comment': result.comment,
+        'journal_ref': result.journal_ref,
+        'primary_category': result.primary_category
+    }
+
+def pack_id_batches(arxiv_ids, max_results=ARXIV_MAX_RESULTS, max_chars=ARXIV_ID_LIST_MAX_CHARS):
+    """Split `arxiv_ids` into the fewest id_list queries that fit both the result and the URL length limits."""
+    batches, batch, chars = [], [], 0
+    for arxiv_id in arxiv_ids:
+        id_chars = len(arxiv_id) + 3  # Plus its URL-encoded comma
+        if batch and (len(batch) == max_results or chars + id_chars > max_chars):
+            batches.append(batch)
+            batch, chars = [], 0
+        batch.append(arxiv_id)
+        chars += id_chars
+    if batch:
+        batches.append(batch)
+    return batches
+
+def _put(queue, item, stop):
+    while not stop.is_set():
+        try:
+            queue.put(item, timeout=0.1)
+            return True
+        except Full:
+            continue
+    return False
+
+class ArxivFetcher:
+    """
+    Long-lived arXiv API fetcher: one client and connection, requests pipelined ahead of the caller.
+
+    Batches are packed as large as the API accepts, and a background thread
+    issues them back to back through a single arxiv.Client, whose built-in
+    delay keeps the whole run at one request per ARXIV_DELAY_SECONDS. Up to
+    `prefetch` responses wait in a bounded queue, so the caller's parsing and
+    saving overlap the next request instead of adding to the wall time.
+    """
+
+    def __init__(self, client=None, prefetch=ARXIV_PREFETCH):
+        self.client = client or arxiv.Client(page_size=ARXIV_MAX_RESULTS, delay_seconds=ARXIV_DELAY_SECONDS)
+        self.prefetch = prefetch
+
+    def search(self, batch):
+        return list(self.client.results(arxiv.Search(id_list=batch, max_results=len(batch))))
+
+    def search_or_split(self, batch):
+        """
+        [(batch, results)] for `batch`, or for each half of it if the request fails.
+
+        A half that fails again is logged and left out, so one bad batch costs
+        its own IDs (neither hits nor misses, retried next run) and not the run.
+        """
+        try:
+            return [(batch, self.search(batch))]
+        except Exception as e:
+            logger.warning(f"arXiv request for {len(batch)} IDs failed, retrying in halves: {e}")
+        searched = []
+        half = (len(batch) + 1) // 2
+        for part in (batch[:half], batch[half:]):
+            if not part:
+                continue
+            try:
+                searched.append((part, self.search(part)))
+            except Exception as e:
+                logger.error(f"Skipping {len(part)} arXiv IDs ({part[0]}..{part[-1]}): {e}")
+        return searched
+
+    def fetch(self, arxiv_ids):
+        """Yield (batch, {arxiv_id: metadata}) for each packed batch of `arxiv_ids`, in order; failed batches are split or skipped."""
+        queue = Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+
+        def produce():
+            try:
+                for batch in pack_id_batches(arxiv_ids):
+                    for searched in self.search_or_split(batch):
+                        if not _put(queue, searched, stop):
+                            return
+            except Exception as e:
+                _put(queue, e, stop)
+                return
+            _put(queue, None, stop)
+
+        threading.Thread(target=produce, name='arxiv-fetcher', daemon=True).start()
+        try:
+            while True:
+                item = queue.get()
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                batch, results = item
+                yield batch, {clean_arxiv_id(result.get_short_id()): result_metadata(result) for result in results}
+        finally:
+            # Stops the producer after its current request if the caller bails out early
+            stop.set()
+
+def fetch_arxiv_metadata_batch(arxiv_ids, fetcher=None):
+    fetcher = fetcher or ArxivFetcher()
+    return {clean_arxiv_id(result.get_short_id()): result_metadata(result) for result in fetcher.search(arxiv_ids)}
 
 def load_existing_data():
+    """{"schema_version": ..., "papers": {arxiv_id: metadata}}; files from before versioning are the bare papers map."""
     if os.path.exists(ARXIV_METADATA_FILE):
-        with open(ARXIV_METADATA_FILE, 'r') as f:
-            return json.load(f)
-    return {}
+        data = load_json(ARXIV_METADATA_FILE)
+        if SCHEMA_VERSION_KEY in data:
+            return data
+        # Not migrated yet, so stays at version 0 until `python migrations.py` brings its records up to date
+        return {SCHEMA_VERSION_KEY: 0, 'papers': data}
+    return {SCHEMA_VERSION_KEY: current_version(ARXIV_METADATA_FILE), 'papers': {}}
 
 def save_data(data):
-    with open(ARXIV_METADATA_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+    save_json(data, ARXIV_METADATA_FILE)
 
-def process_arxiv_ids(arxiv_ids, existing_data):
-    changes_made = False
-    new_arxiv_ids = list(set([clean_arxiv_id(id) for id in arxiv_ids if clean_arxiv_id(id) not in existing_data]))
+def process_arxiv_ids(arxiv_ids, existing_data, fetcher=None, negative_cache=None):
+    papers = existing_data['papers']
+    negative_cache = negative_cache or NegativeCache(ARXIV_NEGATIVE_CACHE_FILE)
+    unknown = sorted({clean_arxiv_id(arxiv_id) for arxiv_id in arxiv_ids} - papers.keys())
+    new_arxiv_ids = negative_cache.filter(unknown)
+    logger.info(f"Fetching metadata for {len(new_arxiv_ids)} new arXiv IDs "
+                f"({len(unknown) - len(new_arxiv_ids)} skipped as recent misses)")
 
-    for i in range(0, len(new_arxiv_ids), ARXIV_API_BATCH_SIZE):
-        batch = new_arxiv_ids[i:i+ARXIV_API_BATCH_SIZE]
-        metadata_batch = fetch_arxiv_metadata_batch(batch)
-        
+    changes_made = False
+    processed = last_saved = saves = 0
+    for batch, metadata_batch in (fetcher or ArxivFetcher()).fetch(new_arxiv_ids):
+        processed += len(batch)
+        for arxiv_id in batch:
+            if arxiv_id in metadata_batch:
+                negative_cache.record_hit(arxiv_id)
+            else:
+                negative_cache.record_miss(arxiv_id)
         if metadata_batch:
-            existing_data.update(metadata_batch)
+            papers.update(metadata_batch)
             changes_made = True
 
-        if i > 0 and i % CHUNK_SIZE == 0:
-            logger.info(f"Processed {i} arXiv IDs")
-            if changes_made:
-                save_data(existing_data)
-                if i % (CHUNK_SIZE * COMMIT_INTERVAL) == 0:
-                    commit_and_push(ARXIV_METADATA_FILE)
-                changes_made = False
+        # Saving here overlaps the fetcher's wait for its next request
+        if changes_made and processed - last_saved >= CHUNK_SIZE:
+            logger.info(f"Processed {processed} arXiv IDs")
+            save_data(existing_data)
+            negative_cache.save()
+            saves += 1
+            if saves % COMMIT_INTERVAL == 0:
+                commit_and_push(ARXIV_METADATA_FILE)
+            changes_made = False
+            last_saved = processed
 
     if changes_made:
         save_data(existing_data)
+    if saves % COMMIT_INTERVAL or changes_made:
         commit_and_push(ARXIV_METADATA_FILE)
+    negative_cache.save()
+    commit_and_push(ARXIV_NEGATIVE_CACHE_FILE)
+    negative_cache.log_stats("arXiv negative cache")
 
     return existing_data
 
 def main():
     existing_data = load_existing_data()
 
-    with open('github_stars.json', 'r') as f:
-        github_stars_data = json.load(f)
+    github_stars_data = get_store().load()
 
     arxiv_ids = set()
     for repo_data in github_stars_data['repositories'].values():
         if 'arxiv' in repo_data:
+            # Repos carry `ids` since the URL-to-ID migration; `urls` only in unmigrated data
+            arxiv_ids.update(repo_data['arxiv'].get('ids', []))
             for url in repo_data['arxiv'].get('urls', []):
                 arxiv_id = extract_arxiv_id(url)
                 if arxiv_id:
@@ -0,0 +1,73 @@
+"""
+README extraction timings: the previous per-call regexes against readme_scanner.scan_readme.
+
+Runs over the README fixtures in benchmarks/fixtures/readmes (or any directory of
+README files, e.g. ones pulled from the README store), plus the whole corpus
+concatenated as one large README. Run from the repository root:
+
+    python benchmarks/bench_readme_scanner.py [--readmes DIR]
+"""
+import argparse
+import re
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from readme_scanner import primary_arxiv_id, scan_readme
+
+FIXTURES = Path(__file__).resolve().parent / 'fixtures' / 'readmes'
+
+def legacy_extract(description, text):
+    """What process_repo did before the scanner: three scans, regexes built per call."""
+    arxiv_ids = list(OrderedDict.fromkeys(re.findall(r'(?:arxiv\.org/(?:abs|pdf)/|arxiv:)(\d{4}\.\d{4,5})', text)))
+    bibtex = re.findall(r'(@\w+\{[^@]*\})', text, re.DOTALL)
+    primary = None
+    if description and arxiv_ids:
+        desc_ids = list(OrderedDict.fromkeys(re.findall(r'(?:arxiv\.org/(?:abs|pdf)/|arxiv:)(\d{4}\.\d{4,5})', description)))
+        if desc_ids:
+            primary = desc_ids[0]
+    if primary is None:
+        badge = re.search(r'\[!\[arXiv\].*\]\(https://arxiv\.org/abs/(\d{4}\.\d{4,5})\)', text)
+        if badge:
+            primary = badge.group(1)
+        elif len(arxiv_ids) == 1:
+            primary = arxiv_ids[0]
+    return arxiv_ids, primary, bibtex
+
+def scanner_extract(description, text):
+    scan = scan_readme(text)
+    return scan.arxiv_ids, primary_arxiv_id(description, scan), scan.bibtex
+
+def best_of(repeat, fn, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--readmes', type=Path, default=FIXTURES)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    corpus = {path.name: path.read_text(errors='replace') for path in sorted(args.readmes.iterdir()) if path.is_file()}
+    corpus['(all concatenated)'] = '\n'.join(corpus.values())
+    description = "Official implementation"
+
+    print(f"{'README':<28} {'size':>9} {'legacy':>10} {'scanner':>10} {'ids':>9} {'bibtex':>9}")
+    for name, text in corpus.items():
+        legacy = best_of(args.repeat, legacy_extract, description, text)
+        scanner = best_of(args.repeat, scanner_extract, description, text)
+        legacy_ids, _, legacy_bibtex = legacy_extract(description, text)
+        ids, _, bibtex = scanner_extract(description, text)
+        print(f"{name:<28} {len(text):>8}B {legacy * 1e3:>8.3f}ms {scanner * 1e3:>8.3f}ms "
+              f"{len(legacy_ids):>4}/{len(ids):<4} {len(legacy_bibtex):>4}/{len(bibtex):<4}")
+    print("ids and bibtex columns: legacy/scanner counts")
+
+if __name__ == "__main__":
+    main()
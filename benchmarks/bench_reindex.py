@@ -0,0 +1,53 @@
+"""
+Offline re-extraction timings: `scrape_stars reindex` over a synthetic README store.
+
+Fills a temporary README store with the fixture READMEs (each repo's copy made
+unique by an extra arXiv link), then times `reindex_repos` in one process and
+across the process pool. Run from the repository root:
+
+    python benchmarks/bench_reindex.py --repos 10000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from readme_store import ReadmeStore
+from scrape_stars import reindex_repos
+
+FIXTURES = Path(__file__).resolve().parent / 'fixtures' / 'readmes'
+
+def build_dataset(store, repos, rng):
+    readmes = [path.read_bytes() for path in sorted(FIXTURES.iterdir())]
+    data = {'repositories': {}}
+    for i in range(repos):
+        name = f"owner{i % 500}/repo-{i}"
+        extra = f"\n\nSee arxiv:{rng.randint(1501, 2412)}.{rng.randint(1, 29999):05d}\n".encode()
+        store.put(name, rng.choice(readmes) + extra)
+        data['repositories'][name] = {'metadata': {'description': "A synthetic repository"}}
+    return data
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repos', type=int, default=10000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ReadmeStore(tmp)
+        data = build_dataset(store, args.repos, random.Random(0))
+        for workers in (1, None):
+            for repo_data in data['repositories'].values():
+                repo_data.pop('arxiv', None)
+            start = time.perf_counter()
+            changed = reindex_repos(data, target_store=store, workers=workers)
+            elapsed = time.perf_counter() - start
+            label = '1 process' if workers == 1 else f"{os.cpu_count()} processes"
+            print(f"{args.repos} repos, {label:<12} {elapsed:>7.2f}s  ({len(changed)} arxiv blocks rewritten)")
+
+if __name__ == "__main__":
+    main()
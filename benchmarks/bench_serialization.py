@@ -0,0 +1,102 @@
+"""
+Save/load timings for the stars data file on synthetic datasets.
+
+Compares the old `json.dump(..., indent=2)` rewrite against `serialization.save_json`
+in pretty and compact mode, and reports file sizes. Run from the repository root:
+
+    python benchmarks/bench_serialization.py --sizes 10000 100000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import serialization
+from serialization import load_json, save_json
+
+def synthetic_repo(i, rng):
+    name = f"owner{i % 5000}/repo-{i}"
+    arxiv_ids = [f"{rng.randint(1501, 2412)}.{rng.randint(1, 29999):05d}" for _ in range(rng.choice((0, 0, 1, 3)))]
+    return name, {
+        'lists': rng.sample(['ml', 'tools', 'papers', 'rust', 'viz', 'llm'], rng.randint(0, 2)),
+        'metadata': {
+            'id': i,
+            'name': f"repo-{i}",
+            'full_name': name,
+            'description': "A synthetic repository used for benchmarking. " * rng.randint(1, 4),
+            'url': f"https://github.com/{name}",
+            'homepage': None,
+            'language': rng.choice(['Python', 'Rust', 'TypeScript', None]),
+            'stars': rng.randint(0, 100000),
+            'forks': rng.randint(0, 10000),
+            'open_issues': rng.randint(0, 500),
+            'created_at': "2020-01-01T00:00:00Z",
+            'updated_at': "2024-01-01T00:00:00Z",
+            'pushed_at': "2024-01-01T00:00:00Z",
+            'starred_at': "2023-06-01T00:00:00Z",
+        },
+        'last_updated': "2024-06-01T00:00:00+00:00",
+        'arxiv': {
+            'ids': arxiv_ids,
+            'primary_id': arxiv_ids[0] if arxiv_ids else None,
+            'bibtex_citations': [],
+        },
+    }
+
+def synthetic_data(size, seed=0):
+    rng = random.Random(seed)
+    return {
+        'last_updated': "2024-06-01T00:00:00+00:00",
+        'repositories': dict(synthetic_repo(i, rng) for i in range(size)),
+    }
+
+def legacy_save(data, path):
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+def legacy_load(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def best_of(repeat, fn, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def run(size, repeat, directory):
+    data = synthetic_data(size)
+    cases = [
+        ('json indent=2 (legacy)', legacy_save, legacy_load),
+        ('save_json pretty', lambda d, p: save_json(d, p, compact=False), load_json),
+        ('save_json compact', lambda d, p: save_json(d, p, compact=True), load_json),
+    ]
+    for label, save, load in cases:
+        path = os.path.join(directory, f"bench-{size}.json")
+        save_time = best_of(repeat, save, data, path)
+        load_time = best_of(repeat, load, path)
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"{size:>8} {label:<24} save {save_time * 1000:8.1f} ms   load {load_time * 1000:8.1f} ms   {size_mb:7.1f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    backend = 'orjson' if serialization.orjson is not None else 'json (orjson not installed)'
+    print(f"Serializer backend: {backend}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            run(size, args.repeat, directory)
+
+if __name__ == "__main__":
+    main()
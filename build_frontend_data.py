@@ -0,0 +1,174 @@
+import argparse
+import hashlib
+import os
+import shutil
+from datetime import datetime, UTC
+from loguru import logger
+
+from serialization import dumps
+from storage import get_store
+from search_index import build_search_index
+from paper_store import PAPERS_FILE, load_papers
+
+FRONTEND_DATA_DIR = os.path.join('public', 'data')
+FIRST_SHARD_MAX_BYTES = 16 * 1024  # Enough for the first page of results, so the dashboard renders early
+SHARD_MAX_BYTES = 128 * 1024
+PAPER_SUMMARY_FIELDS = ('title', 'categories', 'published', 'updated')
+DATE_SORT_FIELDS = ('created_at', 'updated_at', 'pushed_at', 'starred_at')
+ARXIV_SORT_FIELDS = {'arxiv_published': 'published', 'arxiv_updated': 'updated'}
+
+def starred_order(item):
+    name, repo_data = item
+    return repo_data.get('metadata', {}).get('starred_at') or '', name
+
+def summarize_repo(repo_data):
+    """The fields the repository list needs to render, filter and sort; BibTeX and full paper metadata live in the detail file."""
+    arxiv = repo_data.get('arxiv') or {}
+    return {
+        'lists': repo_data.get('lists', []),
+        'metadata': repo_data.get('metadata', {}),
+        'arxiv': {'ids': arxiv.get('ids', []), 'primary_id': arxiv.get('primary_id')},
+    }
+
+def summarize_paper(paper):
+    return {field: paper.get(field) for field in PAPER_SUMMARY_FIELDS if field in paper}
+
+def detail_path(name):
+    return f"repos/{name}.json"
+
+def build_shards(rows, first_max_bytes=FIRST_SHARD_MAX_BYTES, max_bytes=SHARD_MAX_BYTES):
+    """
+    Split `rows` into consecutive shards whose serialized size stays under the byte bound.
+
+    Each row is (name, summary, papers); a shard is {"repositories": [[name, summary], ...],
+    "papers": {...}} carrying the paper summaries its repos reference. A single row
+    larger than the bound gets a shard to itself.
+    """
+    shards = []
+    current, current_bytes = {'repositories': [], 'papers': {}}, 0
+    limit = first_max_bytes
+    for name, summary, papers in rows:
+        row_bytes = len(dumps([name, summary], compact=True)) + len(dumps(papers, compact=True))
+        if current['repositories'] and current_bytes + row_bytes > limit:
+            shards.append(current)
+            current, current_bytes = {'repositories': [], 'papers': {}}, 0
+            limit = max_bytes
+        current['repositories'].append([name, summary])
+        current['papers'].update(papers)
+        current_bytes += row_bytes
+    if current['repositories']:
+        shards.append(current)
+    return shards
+
+def epoch_seconds(value):
+    if not value:
+        return None
+    try:
+        return int(datetime.fromisoformat(value).timestamp())
+    except ValueError:
+        return None
+
+def sort_values(summary, papers):
+    """Every sortable field of one row as an integer (epoch seconds for dates), or None if unknown."""
+    metadata = summary['metadata']
+    values = {'stars': metadata.get('stars')}
+    for field in DATE_SORT_FIELDS:
+        values[field] = epoch_seconds(metadata.get(field))
+    paper = papers.get(summary['arxiv']['primary_id']) or {}
+    for field, paper_field in ARXIV_SORT_FIELDS.items():
+        values[field] = epoch_seconds(paper.get(paper_field))
+    return values
+
+def build_sort_keys(rows):
+    """
+    Columnar sort keys: per field, the value of every row by ordinal and the ascending order of ordinals.
+
+    Unknown values sort first, ties keep shard order, so the frontend can sort by
+    walking `order` (or its reverse) instead of comparing dates.
+    """
+    columns = {}
+    for name, summary, papers in rows:
+        for field, value in sort_values(summary, papers).items():
+            columns.setdefault(field, []).append(value)
+    fields = {}
+    for field, values in columns.items():
+        order = sorted(range(len(values)), key=lambda ordinal: (values[ordinal] is not None, values[ordinal] or 0, ordinal))
+        fields[field] = {'values': values, 'order': order}
+    return {'total': len(rows), 'fields': fields}
+
+def write_file(out_dir, relative_path, payload):
+    # Build output is regenerated wholesale, so plain writes; no need for save_json's fsync per file
+    path = os.path.join(out_dir, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(payload)
+
+def build_frontend_data(data, papers, out_dir=FRONTEND_DATA_DIR):
+    """
+    Write the manifest, list shards, search index, sort keys and per-repo detail files the dashboard loads.
+
+    Shards are ordered by the dashboard's default sort (starred_at, newest first),
+    so the first shard is the first page. Shard file names carry a content hash, so
+    browsers can cache them indefinitely and only the manifest needs refetching.
+    """
+    repositories = sorted(data.get('repositories', {}).items(), key=starred_order, reverse=True)
+
+    if os.path.exists(out_dir):
+        shutil.rmtree(out_dir)
+
+    rows = []
+    lists = set()
+    for name, repo_data in repositories:
+        summary = summarize_repo(repo_data)
+        lists.update(summary['lists'])
+        arxiv_ids = summary['arxiv']['ids'] + [summary['arxiv']['primary_id']]
+        referenced = {arxiv_id: papers[arxiv_id] for arxiv_id in arxiv_ids if arxiv_id in papers}
+        rows.append((name, summary, {arxiv_id: summarize_paper(paper) for arxiv_id, paper in referenced.items()}))
+        write_file(out_dir, detail_path(name), dumps(dict(repo_data, papers=referenced), compact=True))
+
+    shard_entries = []
+    for index, shard in enumerate(build_shards(rows)):
+        payload = dumps(shard, compact=True)
+        digest = hashlib.sha256(payload).hexdigest()[:12]
+        path = f"shards/{index:04d}-{digest}.json"
+        write_file(out_dir, path, payload)
+        shard_entries.append({'path': path, 'count': len(shard['repositories']), 'bytes': len(payload)})
+
+    # Ordinals in the search index are positions in shard order
+    payload = dumps(build_search_index(rows), compact=True)
+    search_index_path = f"search-index-{hashlib.sha256(payload).hexdigest()[:12]}.json"
+    write_file(out_dir, search_index_path, payload)
+
+    payload = dumps(build_sort_keys(rows), compact=True)
+    sort_keys_path = f"sort-keys-{hashlib.sha256(payload).hexdigest()[:12]}.json"
+    write_file(out_dir, sort_keys_path, payload)
+
+    # Every paper once, keyed by canonical ID (paper_store.py); shards and detail files carry only what their repos reference
+    payload = dumps(papers, compact=True)
+    papers_path = f"papers-{hashlib.sha256(payload).hexdigest()[:12]}.json"
+    write_file(out_dir, papers_path, payload)
+
+    manifest = {
+        'generated_at': datetime.now(UTC).isoformat(),
+        'last_updated': data.get('last_updated'),
+        'total': len(repositories),
+        'sort': {'field': 'starred_at', 'direction': 'desc'},
+        'lists': sorted(lists),
+        'shards': shard_entries,
+        'search_index': search_index_path,
+        'sort_keys': sort_keys_path,
+        'papers': papers_path,
+    }
+    write_file(out_dir, 'manifest.json', dumps(manifest, compact=True))
+    logger.info(f"Wrote {len(repositories)} repositories in {len(shard_entries)} shards to {out_dir}")
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the sharded data files the dashboard loads.")
+    parser.add_argument('--out', default=FRONTEND_DATA_DIR, help=f"Output directory (default: {FRONTEND_DATA_DIR})")
+    parser.add_argument('--papers', default=PAPERS_FILE, help=f"Paper store built by paper_store.py (default: {PAPERS_FILE})")
+    args = parser.parse_args()
+    build_frontend_data(get_store().load(), load_papers(args.papers), args.out)
+
+if __name__ == "__main__":
+    main()
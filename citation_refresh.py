@@ -0,0 +1,102 @@
+import heapq
+from datetime import datetime, UTC
+from loguru import logger
+
+from semantic_scholar import SemanticScholarClient
+
+CITATION_FIELDS = "paperId,citationCount,influentialCitationCount,referenceCount"
+COUNT_FIELDS = {
+    'citation_count': 'citationCount',
+    'influential_citation_count': 'influentialCitationCount',
+    'reference_count': 'referenceCount',
+}
+MIN_REFRESH_AGE_DAYS = 1.0  # Counts fetched more recently than this are left alone
+BASELINE_GROWTH = 0.05  # Citations/day assumed for every paper, so quiet ones still come round eventually
+
+def days_between(earlier, later):
+    return (later - earlier).total_seconds() / 86400
+
+def semantic_scholar_id(identifier, paper):
+    """The batch-endpoint ID for a stored paper: its S2 paperId if known, else its arXiv ID or DOI."""
+    if paper.get('paperId'):
+        return paper['paperId']
+    id_type, id_value = identifier.split(':', 1)
+    if id_type == 'arxiv':
+        return f"arXiv:{id_value}"
+    if id_type == 'doi':
+        return f"DOI:{id_value}"
+    return None
+
+def refresh_priority(paper, now):
+    """
+    Expected citations missed since the last fetch: age in days times the observed growth rate.
+
+    Age runs from the last attempt, successful (`fetched_at`) or not
+    (`refresh_failed_at`). Papers never attempted come first, and papers
+    attempted within MIN_REFRESH_AGE_DAYS return None.
+    """
+    attempts = [paper[field] for field in ('fetched_at', 'refresh_failed_at') if paper.get(field)]
+    if not attempts:
+        return float('inf')
+    age = days_between(max(datetime.fromisoformat(attempt) for attempt in attempts), now)
+    if age < MIN_REFRESH_AGE_DAYS:
+        return None
+    return age * (max(paper.get('citation_growth') or 0.0, 0.0) + BASELINE_GROWTH)
+
+def select_stale(papers, limit, now):
+    """The identifiers of the `limit` papers most worth refreshing, highest priority first."""
+    candidates = []
+    for identifier, paper in papers.items():
+        if semantic_scholar_id(identifier, paper) is None:
+            continue
+        priority = refresh_priority(paper, now)
+        if priority is not None:
+            candidates.append((priority, identifier))
+    return [identifier for _, identifier in heapq.nlargest(limit, candidates)]
+
+def apply_counts(paper, counts, now):
+    """Update a stored paper's counts from a batch response, tracking its citation growth per day."""
+    previous_count = paper.get('citation_count')
+    previous_fetch = paper.get('fetched_at')
+    for field, api_field in COUNT_FIELDS.items():
+        paper[field] = counts.get(api_field)
+    if counts.get('paperId'):
+        paper['paperId'] = counts['paperId']
+    if previous_count is not None and previous_fetch is not None and paper['citation_count'] is not None:
+        age = days_between(datetime.fromisoformat(previous_fetch), now)
+        if age > 0:
+            paper['citation_growth'] = round((paper['citation_count'] - previous_count) / age, 4)
+    paper['fetched_at'] = now.isoformat()
+    paper.pop('refresh_failed_at', None)
+
+def refresh_citations(papers, budget, client=None, now=None):
+    """
+    Re-fetch citation counts for the stalest, fastest-growing papers, within `budget` requests.
+
+    `papers` is the collector's {identifier: record} map and is updated in
+    place; returns the identifiers updated. Every request sent counts against
+    the budget, retries and split batches included. Papers Semantic Scholar
+    doesn't return keep their counts and are stamped with `refresh_failed_at`,
+    so they drop back in the queue instead of heading it every run.
+    """
+    now = now or datetime.now(UTC)
+    client = client or SemanticScholarClient(fields=CITATION_FIELDS)
+    selected = select_stale(papers, budget * client.batch_size, now)
+    if not selected:
+        return []
+
+    lookup = {semantic_scholar_id(identifier, papers[identifier]): identifier for identifier in selected}
+    results = client.fetch(list(lookup), max_requests=budget)
+    for s2_id, counts in results.items():
+        apply_counts(papers[lookup[s2_id]], counts, now)
+    # Failed and unsent IDs were never answered; only a successful response without the paper counts as a miss
+    unanswered = set(client.failed_ids) | set(client.unsent_ids)
+    missing = [s2_id for s2_id in lookup if s2_id not in results and s2_id not in unanswered]
+    for s2_id in missing:
+        papers[lookup[s2_id]]['refresh_failed_at'] = now.isoformat()
+    client.log_stats()
+    logger.info(
+        f"Refreshed citation counts for {len(results)} of {len(selected)} selected papers ({len(papers)} stored); "
+        f"{len(missing)} not returned."
+    )
+    return [lookup[s2_id] for s2_id in list(results) + missing]
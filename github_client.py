@@ -0,0 +1,262 @@
+import hashlib
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from loguru import logger
+
+from http_cache import http_cache
+from rate_governor import governor as default_governor, RateBudgetExhausted
+
+GITHUB_API = "https://api.github.com"
+POOL_SIZE = 32  # Keep-alive connections per host
+MAX_RETRIES = 5
+RETRY_STATUSES = (500, 502, 503, 504)
+BACKOFF_FACTOR = 1  # Seconds; doubled on each retry
+MAX_BACKOFF = 300
+DEFAULT_RATE_LIMIT = 60  # Default to 60 requests per minute for web scraping
+DEFAULT_RATE_LIMIT_WINDOW = 60  # 1 minute in seconds
+WEB_RATE_LIMIT_THRESHOLD = 10  # Number of requests to keep in reserve
+USER_AGENT = "dmarx-stars"
+
+_session = None
+_session_lock = threading.Lock()
+_clients = {}
+
+def build_session(pool_size=POOL_SIZE, max_retries=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR, status_forcelist=RETRY_STATUSES):
+    """
+    A pooled keep-alive session that retries connection errors and `status_forcelist` responses (5xx).
+
+    Rate-limit responses (429, secondary-limit 403s) are left to the caller, since
+    each API signals and paces them differently.
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=status_forcelist,
+        allowed_methods=None,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
+        "User-Agent": USER_AGENT,
+    })
+    return session
+
+def get_session():
+    """The process-wide pooled session, shared by every client."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = build_session()
+        return _session
+
+def backoff_delay(attempt, base=BACKOFF_FACTOR, retry_after=None):
+    if retry_after is not None:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return min(base * (2 ** attempt), MAX_BACKOFF) + random.uniform(0, 1)
+
+def token_key(token):
+    """Stable, non-secret key for a token in the shared governor state."""
+    if not token:
+        return 'anonymous'
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()[:16]
+
+def rate_limit_resource(url):
+    """The GitHub rate-limit resource a request counts against, or None if it isn't rate limited."""
+    if not url.startswith(GITHUB_API) or url.startswith(f"{GITHUB_API}/rate_limit"):
+        return None
+    if url.startswith(f"{GITHUB_API}/graphql"):
+        return 'graphql'
+    if url.startswith(f"{GITHUB_API}/search/"):
+        return 'search'
+    return 'core'
+
+def is_secondary_rate_limited(response):
+    if response.status_code == 429:
+        return True
+    # GitHub signals secondary rate limits with a 403 carrying Retry-After
+    return response.status_code == 403 and 'Retry-After' in response.headers
+
+def is_primary_rate_limited(response):
+    return response.status_code in (403, 429) and response.headers.get('X-RateLimit-Remaining') == '0'
+
+class RateLimiter:
+    """Token bucket pacing for endpoints that don't report rate-limit headers, such as github.com pages."""
+
+    def __init__(self, limit=DEFAULT_RATE_LIMIT, window=DEFAULT_RATE_LIMIT_WINDOW):
+        self.limit = limit
+        self.window = window
+        self.tokens = limit
+        self.last_updated = time.time()
+        self._lock = threading.Lock()
+
+    def update_rate_limit(self, headers):
+        with self._lock:
+            new_limit = int(headers.get('X-RateLimit-Limit', self.limit))
+            new_remaining = int(headers.get('X-RateLimit-Remaining', self.tokens))
+            new_reset = int(headers.get('X-RateLimit-Reset', time.time() + self.window))
+
+            # Only update if we're dealing with API rate limits (which are typically higher)
+            if new_limit > DEFAULT_RATE_LIMIT:
+                self.limit = new_limit
+                self.tokens = new_remaining
+                self.window = max(new_reset - time.time(), 1)
+            else:
+                # For web scraping, stick to the default limits
+                self.tokens = min(new_remaining, self.tokens)
+
+            self.last_updated = time.time()
+
+    def wait_if_needed(self):
+        # Take the token under the lock, possibly going into debt, and sleep outside it;
+        # concurrent callers below the reserve each wait for their own later slot
+        with self._lock:
+            now = time.time()
+            time_passed = now - self.last_updated
+            self.tokens = min(self.limit, self.tokens + time_passed * (self.limit / self.window)) - 1
+            self.last_updated = now
+            sleep_time = (WEB_RATE_LIMIT_THRESHOLD - self.tokens) * (self.window / self.limit)
+
+        if sleep_time > 0:
+            logger.info(f"Approaching rate limit. Sleeping for {sleep_time:.2f} seconds.")
+            time.sleep(sleep_time)
+
+def parse_tokens(value):
+    """Split a token pool given as a comma- or whitespace-separated string (or iterable) into a tuple."""
+    if not value:
+        return ()
+    if isinstance(value, str):
+        value = value.replace(',', ' ').split()
+    return tuple(token for token in value if token)
+
+class GitHubClient:
+    """
+    Authenticated GitHub client on top of the shared pooled session.
+
+    `tokens` may be a single token or a pool. Each token has its own budget in
+    the cross-process RateGovernor, and every API request is routed to the
+    token with the most headroom; exhausted tokens are skipped without
+    sleeping, and RateBudgetExhausted is raised only once every token is spent.
+    Secondary rate limits (429s, 403s with Retry-After) are retried with
+    backoff that honours Retry-After. GETs are served through the
+    conditional-request cache unless `use_cache=False`.
+    """
+
+    def __init__(self, tokens=None, session=None, governor=None, cache=http_cache,
+                 max_retries=MAX_RETRIES, backoff_base=BACKOFF_FACTOR):
+        self.tokens = parse_tokens(tokens) or (None,)
+        self.keys = {token: token_key(token) for token in self.tokens}
+        self.session = session or get_session()
+        self.governor = governor or default_governor
+        self.cache = cache
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+
+    def headroom(self, token, resource='core'):
+        remaining = self.governor.remaining(self.keys[token], resource)
+        return float('inf') if remaining is None else remaining
+
+    def can_afford(self, cost, resource='core'):
+        """Whether the pool as a whole has `cost` requests left above each token's reserve."""
+        spendable = 0
+        for token in self.tokens:
+            remaining = self.governor.remaining(self.keys[token], resource)
+            if remaining is None:
+                return True
+            spendable += max(remaining - self.governor.reserve, 0)
+        return spendable >= cost
+
+    def acquire_token(self, resource):
+        """Reserve one request on the token with the most headroom, pacing if every bucket is momentarily empty."""
+        while True:
+            waits = []
+            exhausted = None
+            for token in sorted(self.tokens, key=lambda t: self.headroom(t, resource), reverse=True):
+                try:
+                    wait = self.governor.try_acquire(self.keys[token], resource)
+                except RateBudgetExhausted as e:
+                    exhausted = e
+                    continue
+                if not wait:
+                    return token
+                waits.append(wait)
+            if not waits:
+                raise exhausted
+            logger.debug(f"Pacing {resource} requests: sleeping {min(waits):.2f}s")
+            time.sleep(min(waits))
+
+    def _headers(self, url, headers, token):
+        merged = {}
+        if url.startswith(GITHUB_API):
+            merged["Accept"] = "application/vnd.github.v3+json"
+        if token:
+            merged["Authorization"] = f"token {token}"
+        merged.update(headers or {})
+        return merged
+
+    def request(self, method, url, headers=None, params=None, json=None, use_cache=True, token=None):
+        resource = rate_limit_resource(url)
+        for attempt in range(self.max_retries):
+            if token is not None:
+                request_token = token
+            elif resource:
+                request_token = self.acquire_token(resource)
+            else:
+                request_token = self.tokens[0]
+            request_headers = self._headers(url, headers, request_token)
+
+            try:
+                if method == 'get' and use_cache and self.cache is not None:
+                    response = self.cache.get(url, headers=request_headers, params=params, getter=self.session.get)
+                else:
+                    response = self.session.request(method, url, headers=request_headers, params=params, json=json)
+            except requests.exceptions.RequestException:
+                if resource and token is None:
+                    self.governor.release(self.keys[request_token], resource)
+                raise
+
+            if resource:
+                self.governor.update(response.headers, self.keys.get(request_token, token_key(request_token)))
+            if is_primary_rate_limited(response):
+                if resource and token is None and len(self.tokens) > 1 and attempt < self.max_retries - 1:
+                    # The governor now knows this token is spent; route the retry elsewhere
+                    logger.warning(f"Token {token_key(request_token)} exhausted; switching tokens.")
+                    continue
+                raise RateBudgetExhausted(
+                    response.headers.get('X-RateLimit-Resource', resource),
+                    0, int(response.headers.get('X-RateLimit-Reset', 0))
+                )
+            if is_secondary_rate_limited(response) and attempt < self.max_retries - 1:
+                delay = backoff_delay(attempt, self.backoff_base, response.headers.get('Retry-After'))
+                logger.warning(f"Rate limited ({response.status_code}) on {url}. Backing off for {delay:.2f} seconds.")
+                time.sleep(delay)
+                continue
+            return response
+
+    def get(self, url, headers=None, params=None, use_cache=True, token=None):
+        return self.request('get', url, headers=headers, params=params, use_cache=use_cache, token=token)
+
+    def post(self, url, json=None, headers=None):
+        return self.request('post', url, headers=headers, json=json)
+
+def get_client(tokens):
+    """One shared client per token pool, so every caller in the process reuses the same pooled session."""
+    tokens = parse_tokens(tokens)
+    with _session_lock:
+        client = _clients.get(tokens)
+    if client is None:
+        client = GitHubClient(tokens)
+        with _session_lock:
+            client = _clients.setdefault(tokens, client)
+    return client
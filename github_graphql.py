@@ -0,0 +1,110 @@
+import json
+from loguru import logger
+
+from github_client import get_client
+
+GITHUB_GRAPHQL_API = "https://api.github.com/graphql"
+GRAPHQL_BATCH_SIZE = 100  # Repositories per aliased query
+
+# The GraphQL API has no equivalent of the REST `/readme` lookup, so we probe
+# the usual README file names on the default branch and keep the first hit.
+README_CANDIDATES = (
+    "README.md",
+    "README.rst",
+    "README",
+    "README.markdown",
+    "README.txt",
+    "readme.md",
+    "Readme.md",
+)
+
+REPOSITORY_FIELDS = """
+    databaseId
+    name
+    nameWithOwner
+    description
+    url
+    homepageUrl
+    primaryLanguage { name }
+    stargazerCount
+    forkCount
+    issues(states: OPEN) { totalCount }
+    pullRequests(states: OPEN) { totalCount }
+    createdAt
+    updatedAt
+    pushedAt
+"""
+
+def build_batch_query(full_names):
+    """Build one query with a `repository` alias per repo, plus README blobs."""
+    readme_fields = "\n".join(
+        f'    readme{i}: object(expression: {json.dumps("HEAD:" + name)}) {{ ... on Blob {{ text }} }}'
+        for i, name in enumerate(README_CANDIDATES)
+    )
+    aliases = []
+    for i, full_name in enumerate(full_names):
+        owner, name = full_name.split('/', 1)
+        aliases.append(
+            f"  r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) {{"
+            f"{REPOSITORY_FIELDS}{readme_fields}\n  }}"
+        )
+    return "query {\n" + "\n".join(aliases) + "\n  rateLimit { cost remaining resetAt }\n}"
+
+def to_rest_metadata(node):
+    """Map a GraphQL repository node onto the REST `/repos/{full_name}` fields used by `extract_metadata`."""
+    language = node.get('primaryLanguage') or {}
+    return {
+        'id': node['databaseId'],
+        'name': node['name'],
+        'full_name': node['nameWithOwner'],
+        'description': node['description'],
+        'html_url': node['url'],
+        'homepage': node['homepageUrl'],
+        'language': language.get('name'),
+        'stargazers_count': node['stargazerCount'],
+        'forks_count': node['forkCount'],
+        # REST counts open pull requests as open issues
+        'open_issues_count': node['issues']['totalCount'] + node['pullRequests']['totalCount'],
+        'created_at': node['createdAt'],
+        'updated_at': node['updatedAt'],
+        'pushed_at': node['pushedAt'],
+    }
+
+def extract_readme_text(node):
+    for i in range(len(README_CANDIDATES)):
+        blob = node.get(f'readme{i}')
+        if blob and blob.get('text'):
+            return blob['text']
+    return ''
+
+def fetch_repos_graphql(full_names, token, url=GITHUB_GRAPHQL_API):
+    """
+    Fetch metadata and README text for up to GRAPHQL_BATCH_SIZE repos in one request.
+
+    Returns a dict mapping full_name -> (metadata, readme_content), where metadata is
+    shaped like the REST API response (or None if the repo is inaccessible) and
+    readme_content is '' when the repo has no README.
+    """
+    response = get_client(token).post(url, json={"query": build_batch_query(full_names)})
+    response.raise_for_status()
+    payload = response.json()
+
+    errors = payload.get('errors') or []
+    for error in errors:
+        if error.get('type') not in ('NOT_FOUND', 'FORBIDDEN'):
+            raise RuntimeError(f"GraphQL error: {error.get('message')}")
+        logger.warning(f"GraphQL {error['type']} for {error.get('path')}: {error.get('message')}")
+
+    data = payload.get('data') or {}
+    rate_limit = data.get('rateLimit')
+    if rate_limit:
+        logger.debug(f"GraphQL batch cost {rate_limit['cost']}, {rate_limit['remaining']} points remaining.")
+
+    results = {}
+    for i, full_name in enumerate(full_names):
+        node = data.get(f'r{i}')
+        if node:
+            results[full_name] = (to_rest_metadata(node), extract_readme_text(node))
+        else:
+            results[full_name] = (None, '')
+    return results
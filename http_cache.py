@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import requests
+from requests.structures import CaseInsensitiveDict
+from loguru import logger
+
+HTTP_CACHE_DIR = os.environ.get('HTTP_CACHE_DIR', os.path.join('.cache', 'http'))
+HTTP_CACHE_MAX_BYTES = int(os.environ.get('HTTP_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+# Headers replayed from the cache on a 304. Rate-limit headers always come from the fresh response.
+CACHED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Link')
+
+class HTTPCache:
+    """
+    On-disk cache of GitHub API responses, revalidated with conditional requests.
+
+    Entries are keyed by URL (including query string) and Accept header. Later
+    requests for the same key send If-None-Match / If-Modified-Since; a 304 reply
+    is answered from disk and doesn't count against GitHub's rate limit. The
+    least recently used entries are evicted once the cache exceeds `max_bytes`;
+    the directory's size is scanned once and then tracked as entries are written,
+    so only a store that takes it over the cap pays for another scan.
+    """
+
+    def __init__(self, cache_dir=HTTP_CACHE_DIR, max_bytes=HTTP_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.total_bytes = None  # Unknown until the first store scans the directory
+
+    def _key(self, url, headers):
+        accept = (headers or {}).get('Accept', '')
+        return hashlib.sha256(f"{accept}\n{url}".encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read(self, key):
+        try:
+            with open(self._path(key), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, key, entry):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f)
+        if self.total_bytes is not None:
+            replaced = os.path.getsize(path) if os.path.exists(path) else 0
+            self.total_bytes += os.path.getsize(tmp_path) - replaced
+        os.replace(tmp_path, path)
+        self.stores += 1
+
+    def get(self, url, headers=None, params=None, getter=requests.get):
+        """Conditional GET through `getter`, answering 304s from the cache."""
+        prepared_url = requests.Request('GET', url, params=params).prepare().url
+        key = self._key(prepared_url, headers)
+        entry = self._read(key)
+
+        request_headers = dict(headers or {})
+        if entry:
+            if entry.get('etag'):
+                request_headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                request_headers['If-Modified-Since'] = entry['last_modified']
+
+        response = getter(prepared_url, headers=request_headers)
+
+        if entry and response.status_code == 304:
+            self.hits += 1
+            os.utime(self._path(key))
+            return self._replay(entry, response)
+
+        self.misses += 1
+        if response.status_code == 200:
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if etag or last_modified:
+                self._write(key, {
+                    'url': prepared_url,
+                    'etag': etag,
+                    'last_modified': last_modified,
+                    'headers': {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers},
+                    'body': response.text,
+                })
+                self.evict()
+        return response
+
+    def _replay(self, entry, not_modified):
+        response = requests.Response()
+        response.status_code = 200
+        response.url = entry['url']
+        response.encoding = 'utf-8'
+        response._content = entry['body'].encode('utf-8')
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        for name, value in not_modified.headers.items():
+            if name.lower().startswith('x-ratelimit-'):
+                response.headers[name] = value
+        response.request = not_modified.request
+        return response
+
+    def _scan(self):
+        try:
+            entries = [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith('.json')]
+        except FileNotFoundError:
+            return []
+        return [(entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in entries]
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in `max_bytes`."""
+        if self.total_bytes is None:
+            self.total_bytes = sum(size for _, size, _ in self._scan())
+        if self.total_bytes <= self.max_bytes:
+            return
+        stats = self._scan()
+        total = sum(size for _, size, _ in stats)
+        for _, size, path in sorted(stats):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            self.evictions += 1
+        self.total_bytes = total
+
+    def log_stats(self):
+        total = self.hits + self.misses
+        hit_rate = (self.hits / total * 100) if total else 0
+        logger.info(
+            f"HTTP cache: {self.hits} hits (304), {self.misses} misses, {hit_rate:.1f}% hit rate, "
+            f"{self.stores} stored, {self.evictions} evicted."
+        )
+
+http_cache = HTTPCache()
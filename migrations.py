@@ -0,0 +1,327 @@
+import argparse
+import codecs
+import json
+import os
+import re
+from collections import namedtuple
+from loguru import logger
+
+from readme_scanner import find_arxiv_ids
+from serialization import COMPACT_JSON, dumps, load_json, save_json
+from storage import STARS_FILE, file_sha256
+
+ARXIV_METADATA_FILE = 'arxiv_metadata.json'
+SCHEMA_VERSION_KEY = 'schema_version'
+READ_CHUNK_SIZE = 1 << 20
+CHECKPOINT_INTERVAL = 1000  # Records between checkpoints of an interrupted migration
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+# Files written by `migrate_file` (and the collectors) lead with their version
+VERSION_HEADER = re.compile(rb'\A\s*\{\s*"schema_version"\s*:\s*(\d+)')
+
+# `apply(key, record)` migrates one record in place or returns a replacement. It
+# must be idempotent: a file whose version marker is missing or out of date has
+# every pending migration applied to every record, whatever state each is in.
+Migration = namedtuple('Migration', ['version', 'description', 'apply'])
+# `flat` files may still have the legacy layout, the bare records object with no
+# version; they are rewritten as {"schema_version": ..., records_key: {...}}
+DataFile = namedtuple('DataFile', ['records_key', 'flat', 'migrations'])
+
+def arxiv_urls_to_ids(repo_name, repo):
+    """Replace the arxiv block's `urls`/`primary_url` with `ids`/`primary_id`; a URL without an ID is dropped, not fatal."""
+    arxiv = repo.get('arxiv')
+    if not arxiv:
+        return repo
+    if 'urls' in arxiv:
+        ids = {}
+        for url in arxiv.pop('urls'):
+            url_ids = find_arxiv_ids(url)
+            if url and not url_ids:
+                logger.warning(f"{repo_name}: no arXiv ID in {url!r}; dropping it")
+            ids.update(dict.fromkeys(url_ids))
+        arxiv['ids'] = list(ids)
+    if 'primary_url' in arxiv:
+        primary_url = arxiv.pop('primary_url')
+        primary_ids = find_arxiv_ids(primary_url)
+        if primary_ids:
+            arxiv['primary_id'] = primary_ids[0]
+        elif primary_url:
+            logger.warning(f"{repo_name}: no arXiv ID in primary URL {primary_url!r}; dropping it")
+    return repo
+
+def category_terms(paper_id, paper):
+    """Flatten Atom-feed category objects ({"@term": "cs.LG", ...}) to plain category strings."""
+    categories = paper.get('categories')
+    if isinstance(categories, list):
+        paper['categories'] = [
+            category['@term'] if isinstance(category, dict) and '@term' in category else category
+            for category in categories
+        ]
+    return paper
+
+DATA_FILES = {
+    STARS_FILE: DataFile('repositories', False, [
+        Migration(1, "arXiv URLs to IDs (was scripts/convert_arxiv_urls_to_ids.py)", arxiv_urls_to_ids),
+    ]),
+    ARXIV_METADATA_FILE: DataFile('papers', True, [
+        Migration(1, "category objects to strings (was scripts/transform_categories.py)", category_terms),
+    ]),
+}
+
+def data_file_for(path):
+    return DATA_FILES[os.path.basename(path)]
+
+def current_version(path):
+    return max(migration.version for migration in data_file_for(path).migrations)
+
+def file_version(path):
+    """The schema version recorded at the head of `path`, or None for files that predate versioning."""
+    with open(path, 'rb') as f:
+        match = VERSION_HEADER.match(f.read(256))
+    return int(match.group(1)) if match else None
+
+class JSONStream:
+    """
+    Incremental reader for a JSON file: walk objects member by member and decode one value at a time.
+
+    Only the value being decoded (plus one read chunk) is held in memory, so a
+    data file is streamed record by record however large it is. `offset` is the
+    byte position in the file, for checkpointing; pass it back to resume there.
+    """
+
+    def __init__(self, f, offset=0, chunk_size=None):
+        self.f = f
+        self.chunk_size = chunk_size or READ_CHUNK_SIZE
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.json_decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.base = offset  # Byte offset of buffer[0]
+        self.eof = False
+
+    @property
+    def offset(self):
+        return self.base + len(self.buffer[:self.pos].encode('utf-8'))
+
+    def _fill(self):
+        if self.eof:
+            return False
+        self.base = self.offset
+        self.buffer = self.buffer[self.pos:]
+        self.pos = 0
+        chunk = self.f.read(self.chunk_size)
+        self.eof = not chunk
+        self.buffer += self.decoder.decode(chunk, final=self.eof)
+        return True
+
+    def peek(self):
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise ValueError(f"Unexpected end of JSON at byte {self.offset}")
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at byte {self.offset}, found {self.buffer[self.pos]!r}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.json_decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number that ends the buffer may continue in the next chunk
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def members(self, first=True):
+        """Yield the keys of the object being read (after its '{'); the caller must consume each value."""
+        while True:
+            if self.peek() == '}':
+                self.pos += 1
+                return
+            if not first:
+                self.expect(',')
+            first = False
+            key = self.value()
+            self.expect(':')
+            yield key
+
+class JSONWriter:
+    """Streaming counterpart of `serialization.dumps`: writes objects member by member, byte-identical to dumping the whole."""
+
+    def __init__(self, f, compact=COMPACT_JSON, offset=0, depth=0):
+        self.f = f
+        self.compact = compact
+        self.offset = offset
+        self.stack = [True] * depth  # Per open object: whether it has members yet
+
+    def _write(self, payload):
+        self.f.write(payload)
+        self.offset += len(payload)
+
+    def _prefix(self, key):
+        separator = b',' if self.stack[-1] else b''
+        self.stack[-1] = True
+        if self.compact:
+            return separator + dumps(key, compact=True) + b':'
+        return separator + b'\n' + b'  ' * len(self.stack) + dumps(key, compact=True) + b': '
+
+    def open_object(self, key=None):
+        self._write(b'{' if key is None else self._prefix(key) + b'{')
+        self.stack.append(False)
+
+    def member(self, key, value):
+        payload = dumps(value, compact=self.compact)
+        if not self.compact:
+            payload = payload.replace(b'\n', b'\n' + b'  ' * len(self.stack))
+        self._write(self._prefix(key) + payload)
+
+    def close_object(self):
+        had_members = self.stack.pop()
+        if had_members and not self.compact:
+            self._write(b'\n' + b'  ' * len(self.stack) + b'}')
+        else:
+            self._write(b'}')
+
+def _finish(out, tmp_path, path):
+    out.flush()
+    os.fsync(out.fileno())
+    out.close()
+    os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+    os.replace(tmp_path, path)
+
+def migrate_file(path, data_file=None, compact=COMPACT_JSON, checkpoint_interval=CHECKPOINT_INTERVAL):
+    """
+    Bring `path` up to its current schema version in one streaming pass; returns whether it was rewritten.
+
+    Every pending migration is applied to each record as it streams past, and the
+    result is written to `<path>.migrating`, which replaces `path` only once
+    complete. Every `checkpoint_interval` records the output is fsynced and the
+    input/output offsets saved to `<path>.migration.json`, so an interrupted run
+    resumes from the last checkpoint, provided `path` hasn't changed meanwhile.
+    A file already at the current version is left untouched.
+    """
+    data_file = data_file or data_file_for(path)
+    target = max(migration.version for migration in data_file.migrations)
+    tmp_path, checkpoint_path = f"{path}.migrating", f"{path}.migration.json"
+    source_sha256 = file_sha256(path)
+
+    checkpoint = load_json(checkpoint_path) if os.path.exists(checkpoint_path) else None
+    if checkpoint and (checkpoint['source_sha256'] != source_sha256 or checkpoint['to_version'] != target
+                       or not os.path.exists(tmp_path) or os.path.getsize(tmp_path) < checkpoint['output_offset']):
+        logger.info(f"Discarding a stale migration checkpoint for {path}")
+        checkpoint = None
+
+    header_version = file_version(path)
+    version = header_version or 0
+    if version >= target:
+        return False
+    flat = data_file.flat and header_version is None
+    pending = [migration for migration in data_file.migrations if migration.version > version]
+    logger.info(f"Migrating {path} from schema version {version} to {target}: "
+                + "; ".join(migration.description for migration in pending))
+
+    source = open(path, 'rb')
+    if checkpoint:
+        logger.info(f"Resuming after {checkpoint['records']} records")
+        source.seek(checkpoint['input_offset'])
+        reader = JSONStream(source, offset=checkpoint['input_offset'])
+        out = open(tmp_path, 'r+b')
+        out.truncate(checkpoint['output_offset'])
+        out.seek(checkpoint['output_offset'])
+        writer = JSONWriter(out, compact, offset=checkpoint['output_offset'], depth=2)
+        records = checkpoint['records']
+    else:
+        reader = JSONStream(source)
+        out = open(tmp_path, 'wb')
+        writer = JSONWriter(out, compact)
+        records = 0
+
+    def migrate_record(key, layout):
+        nonlocal records
+        record = reader.value()
+        for migration in pending:
+            record = migration.apply(key, record)
+        writer.member(key, record)
+        records += 1
+        if records % checkpoint_interval == 0:
+            out.flush()
+            os.fsync(out.fileno())
+            save_json({
+                'source_sha256': source_sha256, 'from_version': version, 'to_version': target,
+                'layout': layout, 'input_offset': reader.offset, 'output_offset': writer.offset,
+                'records': records,
+            }, checkpoint_path, compact=True)
+
+    def migrate_records(first):
+        for key in reader.members(first):
+            migrate_record(key, 'nested')
+        writer.close_object()
+
+    def migrate_top_level(first, flat_open, records_written):
+        for key in reader.members(first):
+            if key == SCHEMA_VERSION_KEY:
+                reader.value()  # Rewritten at the head
+            elif flat and key != data_file.records_key:
+                if not flat_open:
+                    writer.open_object(data_file.records_key)
+                    flat_open = records_written = True
+                migrate_record(key, 'flat')
+            elif key == data_file.records_key:
+                reader.expect('{')
+                writer.open_object(key)
+                migrate_records(first=True)
+                records_written = True
+            else:
+                writer.member(key, reader.value())
+        if flat_open:
+            writer.close_object()
+        if not records_written:
+            writer.open_object(data_file.records_key)
+            writer.close_object()
+        writer.close_object()
+
+    try:
+        if not checkpoint:
+            reader.expect('{')
+            writer.open_object()
+            writer.member(SCHEMA_VERSION_KEY, target)
+            migrate_top_level(first=True, flat_open=False, records_written=False)
+        elif checkpoint['layout'] == 'nested':
+            migrate_records(first=False)
+            migrate_top_level(first=False, flat_open=False, records_written=True)
+        else:
+            migrate_top_level(first=False, flat_open=True, records_written=True)
+        source.close()
+        _finish(out, tmp_path, path)
+    except BaseException:
+        source.close()
+        out.close()
+        raise
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    logger.info(f"Migrated {records} records in {path} to schema version {target}")
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations to the data files.")
+    parser.add_argument('paths', nargs='*', default=list(DATA_FILES),
+                        help=f"Data files to migrate (default: {', '.join(DATA_FILES)})")
+    args = parser.parse_args()
+    for path in args.paths:
+        if os.path.exists(path):
+            migrate_file(path)
+        else:
+            logger.info(f"Skipping {path}: not found")
+
+if __name__ == "__main__":
+    main()
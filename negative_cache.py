@@ -0,0 +1,85 @@
+import os
+import threading
+from datetime import datetime, timedelta, UTC
+from loguru import logger
+
+from serialization import load_json, save_json
+
+NEGATIVE_CACHE_TTL_DAYS = 7  # Wait before the first retry of a miss; doubles with every further miss
+NEGATIVE_CACHE_MAX_TTL_DAYS = 180
+
+class NegativeCache:
+    """
+    Persistent record of keys a lookup came back empty for, and when each is worth retrying.
+
+    Every miss pushes the key's next retry out by `ttl_days`, doubled for each
+    consecutive miss up to `max_ttl_days`, so a typo'd or withdrawn ID costs a
+    request a handful of times a year instead of on every run; an expired entry
+    is retried like a new key, and dropped once it resolves. The file maps each
+    key to {"misses", "last_miss", "retry_after"}.
+    """
+
+    def __init__(self, path, ttl_days=NEGATIVE_CACHE_TTL_DAYS, max_ttl_days=NEGATIVE_CACHE_MAX_TTL_DAYS):
+        self.path = path
+        self.ttl = timedelta(days=ttl_days)
+        self.max_ttl = timedelta(days=max_ttl_days)
+        self._lock = threading.Lock()
+        self._entries = None
+        self._dirty = False
+        self.hits = 0  # Lookups skipped
+        self.expired = 0  # Cached misses due for a retry
+        self.misses = 0  # Misses recorded this run
+        self.resolved = 0  # Cached misses that turned up after all
+
+    @property
+    def entries(self):
+        with self._lock:
+            if self._entries is None:
+                self._entries = load_json(self.path) if os.path.exists(self.path) else {}
+            return self._entries
+
+    def filter(self, keys, now=None):
+        """The keys worth looking up: everything not cached as a miss, or whose retry time has come."""
+        now = now or datetime.now(UTC)
+        entries = self.entries
+        wanted = []
+        for key in keys:
+            entry = entries.get(key)
+            if entry is None:
+                wanted.append(key)
+            elif datetime.fromisoformat(entry['retry_after']) <= now:
+                self.expired += 1
+                wanted.append(key)
+            else:
+                self.hits += 1
+        return wanted
+
+    def record_miss(self, key, now=None):
+        now = now or datetime.now(UTC)
+        entries = self.entries
+        with self._lock:
+            misses = entries.get(key, {}).get('misses', 0) + 1
+            ttl = min(self.ttl * 2 ** (misses - 1), self.max_ttl)
+            entries[key] = {'misses': misses, 'last_miss': now.isoformat(), 'retry_after': (now + ttl).isoformat()}
+            self.misses += 1
+            self._dirty = True
+
+    def record_hit(self, key):
+        entries = self.entries
+        with self._lock:
+            if entries.pop(key, None) is not None:
+                self.resolved += 1
+                self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            save_json(dict(sorted(self._entries.items())), self.path)
+            self._dirty = False
+
+    def log_stats(self, label="Negative cache"):
+        logger.info(
+            f"{label}: {self.hits} lookups skipped, {self.expired} retried after expiry, "
+            f"{self.misses} misses recorded, {self.resolved} resolved, {len(self.entries)} entries."
+        )
@@ -0,0 +1,166 @@
+import hashlib
+import os
+import re
+from collections import namedtuple
+from urllib.parse import urlparse
+from loguru import logger
+
+from serialization import load_json, save_json
+
+PAPER_IDENTIFIER_CACHE = os.environ.get('PAPER_IDENTIFIER_CACHE', os.path.join('.cache', 'paper_identifiers.json'))
+IDENTITY_FIELDS = ('arxiv', 'doi', 'title')
+
+TITLE_NOISE = re.compile(r'[\W_]+')  # Punctuation, whitespace and BibTeX braces
+DOI_PREFIX = re.compile(r'^(?:https?://(?:dx\.)?doi\.org/|doi:)', re.IGNORECASE)
+
+# What a paper reference identifies, as far as its URL or BibTeX says; fields it doesn't give are None
+Identity = namedtuple('Identity', IDENTITY_FIELDS)
+NO_IDENTITY = Identity(None, None, None)
+
+def extract_arxiv_id(url_or_id):
+    # Check if it's a URL
+    if url_or_id.startswith('http'):
+        parsed_url = urlparse(url_or_id)
+        if parsed_url.netloc == 'arxiv.org':
+            path_parts = parsed_url.path.split('/')
+            if 'abs' in path_parts or 'pdf' in path_parts:
+                return path_parts[-1].replace('.pdf', '').split('v')[0]  # Remove version number
+    else:
+        # Check if it's already an arXiv ID
+        arxiv_pattern = r'(\d{4}\.\d{4,5})(v\d+)?'
+        match = re.search(arxiv_pattern, url_or_id)
+        if match:
+            return match.group(1)  # Return only the base ID without version
+    return None
+
+def parse_bibtex(bibtex_str):
+    fields = {}
+    # Remove any surrounding whitespace and curly braces
+    bibtex_str = bibtex_str.strip().strip('{').strip('}')
+
+    # Use regex to find all key-value pairs
+    pattern = r'(\w+)\s*=\s*[{"]?((?:[^{"}]|{[^}]*})*)["}]?'
+    matches = re.findall(pattern, bibtex_str, re.DOTALL)
+
+    for key, value in matches:
+        key = key.lower()
+        value = value.strip().strip(',').strip('{').strip('}').strip()
+        if key == 'doi':
+            # Remove any surrounding quotes or braces from the DOI
+            value = value.strip('"').strip("'").strip('{').strip('}')
+        fields[key] = value
+
+    return fields
+
+def normalize_title(title):
+    """Casefolded, with punctuation and whitespace removed, so trivially different spellings compare equal."""
+    return TITLE_NOISE.sub('', title.casefold()) if title else None
+
+def normalize_doi(doi):
+    return DOI_PREFIX.sub('', doi.strip()).lower() if doi else None
+
+def parse_identity(paper):
+    """Parse a paper reference ({'url': ...}, {'bibtex': ...} or {'arxiv': ...}); the uncached path."""
+    if 'url' in paper:
+        return Identity(extract_arxiv_id(paper['url']), None, None)
+    if 'arxiv' in paper:
+        return Identity(extract_arxiv_id(paper['arxiv']), None, None)
+    if 'bibtex' in paper:
+        fields = parse_bibtex(paper['bibtex'])
+        arxiv_id = extract_arxiv_id(fields['arxiv']) if 'arxiv' in fields else None
+        # An `arxiv` field that doesn't parse leaves the entry unidentified, as it always has: no title fallback
+        title = fields.get('title') if arxiv_id or 'arxiv' not in fields else None
+        return Identity(arxiv_id, fields.get('doi') or None, title or None)
+    return NO_IDENTITY
+
+def content_key(paper):
+    for kind in ('url', 'arxiv', 'bibtex'):
+        if kind in paper:
+            return hashlib.sha1(f"{kind}\0{paper[kind]}".encode('utf-8')).hexdigest()
+    return None
+
+def format_identifier(paper, identity):
+    if 'bibtex' not in paper:
+        return f"arxiv:{identity.arxiv}" if identity.arxiv else None
+    if identity.doi:
+        return f"doi:{identity.doi}"
+    if identity.arxiv:
+        return f"arxiv:{identity.arxiv}"
+    if identity.title:
+        return f"title:{identity.title}"
+    return None
+
+def normalized_keys(identity):
+    return (('arxiv', identity.arxiv), ('doi', normalize_doi(identity.doi)), ('title', normalize_title(identity.title)))
+
+class IdentifierIndex:
+    """
+    Normalized paper identities, parsed once per distinct URL/BibTeX and cached by content hash.
+
+    The parse cache persists across runs in `cache_path`, so a run only pays
+    for BibTeX it hasn't seen before. `deduplicate` keeps DOI, arXiv and
+    normalized-title maps to the identifier of the first paper seen with each,
+    so papers sharing any of them merge in one linear pass.
+    """
+
+    def __init__(self, cache_path=PAPER_IDENTIFIER_CACHE):
+        self.cache_path = cache_path
+        self._cache = None
+        self._dirty = False
+        self.maps = {field: {} for field in IDENTITY_FIELDS}
+        self.parsed = 0
+        self.cached = 0
+
+    @property
+    def cache(self):
+        if self._cache is None:
+            self._cache = load_json(self.cache_path) if self.cache_path and os.path.exists(self.cache_path) else {}
+        return self._cache
+
+    def identity(self, paper):
+        key = content_key(paper)
+        if key is None:
+            return NO_IDENTITY
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cached += 1
+            return Identity(*cached)
+        identity = parse_identity(paper)
+        self.cache[key] = list(identity)
+        self._dirty = True
+        self.parsed += 1
+        return identity
+
+    def identifier(self, paper):
+        """The paper's lookup key: 'arxiv:<id>' for URLs, and for BibTeX its DOI, else arXiv ID, else title."""
+        return format_identifier(paper, self.identity(paper))
+
+    def lookup(self, field, value):
+        """Identifier of the deduplicated paper with this arXiv ID, DOI or title, or None."""
+        normalize = {'doi': normalize_doi, 'title': normalize_title}.get(field)
+        return self.maps[field].get(normalize(value) if normalize else value)
+
+    def deduplicate(self, papers):
+        """Papers with an identifier, minus any sharing an arXiv ID, DOI or normalized title with an earlier one."""
+        self.maps = {field: {} for field in IDENTITY_FIELDS}
+        unique = []
+        for paper in papers:
+            identity = self.identity(paper)
+            identifier = format_identifier(paper, identity)
+            if not identifier:
+                continue
+            keys = [(field, value) for field, value in normalized_keys(identity) if value]
+            if any(value in self.maps[field] for field, value in keys):
+                continue
+            for field, value in keys:
+                self.maps[field][value] = identifier
+            unique.append(paper)
+        return unique
+
+    def save(self):
+        if self._dirty:
+            save_json(self._cache, self.cache_path, compact=True)
+            self._dirty = False
+
+    def log_stats(self):
+        logger.info(f"Paper identifiers: {self.parsed} parsed, {self.cached} from cache.")
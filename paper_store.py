@@ -0,0 +1,144 @@
+import argparse
+import os
+from datetime import datetime, UTC
+from loguru import logger
+
+from paper_identifiers import normalize_doi
+from serialization import load_json, save_json
+
+PAPERS_FILE = 'papers.json'
+ARXIV_METADATA_FILE = 'arxiv_metadata.json'  # arxiv_metadata_collector.py, keyed by bare arXiv ID
+ARTICLE_METADATA_FILE = 'article_metadata.json'  # article_metadata_collector.py, keyed by arxiv:/doi:/title: identifiers
+INDEX_KINDS = ('arxiv', 'doi', 'paperId')
+# Fields arXiv is authoritative for; other sources only fill them in when arXiv hasn't
+PREFERRED_SOURCES = {field: 'arxiv' for field in ('title', 'authors', 'abstract', 'categories', 'published', 'updated')}
+
+def load_papers(path):
+    """Paper records keyed by ID; accepts both the flat and the {"papers": ...} layouts."""
+    if not os.path.exists(path):
+        return {}
+    data = load_json(path)
+    return data.get('papers', data) if isinstance(data, dict) else {}
+
+def index_keys(paper):
+    return (('arxiv', paper.get('arxiv_id')), ('doi', normalize_doi(paper.get('doi'))), ('paperId', paper.get('paperId')))
+
+def canonical_id(paper):
+    """The bare arXiv ID when the paper has one, as repositories reference it; else 'doi:<doi>' or 's2:<paperId>'."""
+    if paper.get('arxiv_id'):
+        return paper['arxiv_id']
+    if paper.get('doi'):
+        return f"doi:{normalize_doi(paper['doi'])}"
+    if paper.get('paperId'):
+        return f"s2:{paper['paperId']}"
+    return None
+
+def merge(paper, record, source=None):
+    """Merge `record` into `paper` in place; `source` overrides fields it is preferred for, anything else only fills gaps."""
+    for field, value in record.items():
+        if value is None or field == 'sources':
+            continue
+        if field not in paper or (source is not None and PREFERRED_SOURCES.get(field, source) == source):
+            paper[field] = value
+    paper['sources'] = sorted(set(paper.get('sources', [])) | set(record.get('sources', [])) | ({source} if source else set()))
+    return paper
+
+def from_arxiv(arxiv_id, record):
+    return dict({field: value for field, value in record.items() if field != 'id'}, arxiv_id=arxiv_id)
+
+def from_semantic_scholar(identifier, record):
+    paper = {field: value for field, value in record.items() if field not in ('source', 'arxivId')}
+    id_type, id_value = identifier.split(':', 1)
+    paper['arxiv_id'] = record.get('arxivId') or (id_value if id_type == 'arxiv' else None)
+    if id_type == 'doi' and not paper.get('doi'):
+        paper['doi'] = id_value
+    return paper
+
+class PaperStore:
+    """
+    Every known paper once, keyed by canonical ID, with O(1) lookup by arXiv ID, DOI or Semantic Scholar paperId.
+
+    `upsert` folds a collector's record into whichever paper shares any of
+    those identifiers, merging papers that turn out to be the same one and
+    re-keying a paper when it gains an arXiv ID. The indexes are rebuilt on
+    load, so the file only holds the records.
+    """
+
+    def __init__(self, papers=None):
+        self.papers = {}
+        self.indexes = {kind: {} for kind in INDEX_KINDS}
+        for paper in (papers or {}).values():
+            self.upsert(paper)
+
+    @classmethod
+    def load(cls, path=PAPERS_FILE):
+        return cls(load_papers(path))
+
+    def __len__(self):
+        return len(self.papers)
+
+    def lookup(self, kind, value):
+        """The paper with this arXiv ID, DOI or paperId, or None."""
+        if kind == 'doi':
+            value = normalize_doi(value)
+        return self.papers.get(self.indexes[kind].get(value))
+
+    def _remove(self, paper_id):
+        paper = self.papers.pop(paper_id)
+        for kind, value in index_keys(paper):
+            if value and self.indexes[kind].get(value) == paper_id:
+                del self.indexes[kind][value]
+        return paper
+
+    def upsert(self, record, source=None):
+        """Merge `record` (with 'arxiv_id', 'doi' and/or 'paperId') into the store; returns its canonical ID, or None without any."""
+        matches = []
+        for kind, value in index_keys(record):
+            paper_id = self.indexes[kind].get(value) if value else None
+            if paper_id and paper_id not in matches:
+                matches.append(paper_id)
+        paper = {}
+        for paper_id in matches:
+            merge(paper, self._remove(paper_id))
+        merge(paper, record, source)
+
+        paper_id = canonical_id(paper)
+        if paper_id is None:
+            return None
+        self.papers[paper_id] = paper
+        for kind, value in index_keys(paper):
+            if value:
+                self.indexes[kind][value] = paper_id
+        return paper_id
+
+    def upsert_arxiv(self, papers):
+        for arxiv_id, record in papers.items():
+            self.upsert(from_arxiv(arxiv_id, record), 'arxiv')
+
+    def upsert_semantic_scholar(self, papers):
+        skipped = sum(self.upsert(from_semantic_scholar(identifier, record), 'semantic_scholar') is None
+                      for identifier, record in papers.items())
+        if skipped:
+            logger.info(f"Skipped {skipped} Semantic Scholar records without an arXiv ID, DOI or paperId.")
+
+    def save(self, path=PAPERS_FILE):
+        save_json({'last_updated': datetime.now(UTC).isoformat(), 'papers': dict(sorted(self.papers.items()))}, path, compact=True)
+
+def build_paper_store(arxiv_path=ARXIV_METADATA_FILE, article_path=ARTICLE_METADATA_FILE, path=PAPERS_FILE):
+    store = PaperStore.load(path)
+    store.upsert_arxiv(load_papers(arxiv_path))
+    store.upsert_semantic_scholar(load_papers(article_path))
+    store.save(path)
+    logger.info(f"Wrote {len(store)} papers to {path}")
+    return store
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge both collectors' paper metadata into one deduplicated store.")
+    parser.add_argument('--arxiv-metadata', default=ARXIV_METADATA_FILE)
+    parser.add_argument('--article-metadata', default=ARTICLE_METADATA_FILE)
+    parser.add_argument('--out', default=PAPERS_FILE)
+    args = parser.parse_args()
+    build_paper_store(args.arxiv_metadata, args.article_metadata, args.out)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from loguru import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to best-effort, unlocked state sharing
+    fcntl = None
+
+RATE_STATE_FILE = os.environ.get(
+    'GITHUB_RATE_STATE_FILE', os.path.join(tempfile.gettempdir(), 'github_rate_governor.json')
+)
+GOVERNOR_RESERVE = 100  # Requests per resource never spent, left for other jobs and retries
+BURST_SECONDS = 10  # Bucket capacity, in seconds' worth of the paced rate
+MIN_BURST = 5  # Always allow at least this many back-to-back requests
+MAX_PACING_SLEEP = 30  # Upper bound on a single pacing sleep, in seconds
+
+class RateBudgetExhausted(Exception):
+    """The remaining budget can't cover more work before the window resets; checkpoint and exit."""
+
+    def __init__(self, resource, remaining, reset):
+        self.resource = resource
+        self.remaining = remaining
+        self.reset = reset
+        wait = max(reset - time.time(), 0)
+        super().__init__(f"GitHub {resource} budget exhausted ({remaining} remaining, resets in {wait:.0f}s)")
+
+class RateGovernor:
+    """
+    Token-bucket pacing of GitHub requests, shared between processes through a locked file.
+
+    The state file holds, per key (one per token) and resource, the last known
+    `remaining`/`reset` from GitHub plus the bucket fill level. The refill rate
+    spreads whatever budget is left above the reserve evenly over the time until
+    reset, so requests are paced rather than parked until the window rolls over.
+    Every `acquire` also provisionally spends from `remaining` and counts the
+    request as in flight, so concurrent processes see each other's consumption
+    before their next response arrives. Each response settles one in-flight
+    request and resets `remaining` to GitHub's figure minus those still in
+    flight, so requests GitHub didn't charge for (304s) are given back.
+    """
+
+    def __init__(self, path=RATE_STATE_FILE, reserve=GOVERNOR_RESERVE):
+        self.path = path
+        self.reserve = reserve
+
+    @contextmanager
+    def _locked_state(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'a+') as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    state = json.loads(f.read() or '{}')
+                except ValueError:
+                    state = {}
+                yield state
+                f.seek(0)
+                f.truncate()
+                json.dump(state, f)
+                f.flush()
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def try_acquire(self, key='default', resource='core', cost=1):
+        """
+        Take `cost` requests from the bucket if available.
+
+        Returns 0 on success, otherwise the seconds to wait before the bucket
+        will have refilled enough. Raises RateBudgetExhausted if the budget
+        above the reserve is gone for this window.
+        """
+        with self._locked_state() as state:
+            bucket = state.get(key, {}).get(resource)
+            now = time.time()
+            if bucket is None or now >= bucket['reset']:
+                # Nothing known for this window yet; the first response will tell us
+                return 0
+            spendable = bucket['remaining'] - self.reserve
+            if spendable < cost:
+                raise RateBudgetExhausted(resource, bucket['remaining'], bucket['reset'])
+
+            rate = spendable / max(bucket['reset'] - now, 1)
+            capacity = max(rate * BURST_SECONDS, MIN_BURST)
+            tokens = min(capacity, bucket['tokens'] + (now - bucket['refilled_at']) * rate)
+            bucket['refilled_at'] = now
+            if tokens >= cost:
+                bucket['tokens'] = tokens - cost
+                bucket['remaining'] -= cost
+                bucket['in_flight'] = bucket.get('in_flight', 0) + cost
+                return 0
+            bucket['tokens'] = tokens
+            return min((cost - tokens) / rate, MAX_PACING_SLEEP)
+
+    def acquire(self, key='default', resource='core', cost=1):
+        """Block until `cost` requests may be sent, or raise RateBudgetExhausted."""
+        while True:
+            wait = self.try_acquire(key, resource, cost)
+            if not wait:
+                return
+            logger.debug(f"Pacing {resource} requests: sleeping {wait:.2f}s")
+            time.sleep(wait)
+
+    def update(self, headers, key='default'):
+        """Record the rate-limit headers from a GitHub response, settling one in-flight request."""
+        if 'X-RateLimit-Remaining' not in headers:
+            return
+        resource = headers.get('X-RateLimit-Resource', 'core')
+        remaining = int(headers['X-RateLimit-Remaining'])
+        reset = int(headers.get('X-RateLimit-Reset', 0))
+        with self._locked_state() as state:
+            buckets = state.setdefault(key, {})
+            bucket = buckets.get(resource)
+            if bucket and bucket['reset'] == reset:
+                # Same window: requests still in flight, here or in another process, aren't in GitHub's figure yet
+                bucket['in_flight'] = max(bucket.get('in_flight', 0) - 1, 0)
+                bucket['remaining'] = remaining - bucket['in_flight']
+            else:
+                buckets[resource] = {
+                    'remaining': remaining,
+                    'reset': reset,
+                    'tokens': MIN_BURST,
+                    'refilled_at': time.time(),
+                    'in_flight': 0,
+                }
+
+    def release(self, key='default', resource='core', cost=1):
+        """Settle acquired requests that never got a response, returning their provisional spend."""
+        with self._locked_state() as state:
+            bucket = state.get(key, {}).get(resource)
+            if bucket and bucket.get('in_flight'):
+                settled = min(bucket['in_flight'], cost)
+                bucket['in_flight'] -= settled
+                bucket['remaining'] += settled
+
+    def remaining(self, key='default', resource='core'):
+        """Last known remaining requests, or None if unknown or the window has reset."""
+        with self._locked_state() as state:
+            bucket = state.get(key, {}).get(resource)
+        if bucket is None or time.time() >= bucket['reset']:
+            return None
+        return bucket['remaining']
+
+    def can_afford(self, cost, key='default', resource='core'):
+        """Whether `cost` more requests fit in the current window above the reserve."""
+        remaining = self.remaining(key, resource)
+        return remaining is None or remaining - self.reserve >= cost
+
+governor = RateGovernor()
@@ -0,0 +1,160 @@
+import re
+from collections import namedtuple
+
+NEW_STYLE_ID = r'\d{4}\.\d{4,5}'
+OLD_STYLE_ID = r'[A-Za-z-]+(?:\.[A-Za-z]{2})?/\d{7}'  # e.g. hep-th/9901001, math.GT/0309136
+
+# The legacy extractors' shape: separate scans that each start with a literal
+# ('ar', '[![', '@'), the only case in which the regex engine skips ahead with a
+# fast substring search instead of trying every position. One alternation walked
+# once, or scanning a lowercased copy, costs more than all three together. The
+# version suffix sits outside the group, so only old-style IDs ever need normalizing.
+ARXIV_ID_SCANNER = re.compile(rf'ar[xX]iv(?:\.org/(?:abs|pdf)/|:\s?)({NEW_STYLE_ID}|{OLD_STYLE_ID})(?:v\d+)?', re.ASCII)
+BADGE_SCANNER = re.compile(
+    rf'\[!\[[Aa][Rr][Xx][Ii][Vv][^\]\n]*\][^\n]*?\]\((?:https?://)?(?:www\.)?arxiv\.org/(?:abs|pdf)/'
+    rf'({NEW_STYLE_ID}|{OLD_STYLE_ID})', re.ASCII
+)
+BIBTEX_SCANNER = re.compile(r'@[A-Za-z]+\s*(\{)\s*[^\s,{}]+\s*,')  # An entry always opens with its key
+BRACES = re.compile(r'[{}]')
+VERSION_SUFFIX = re.compile(r'v\d+$')
+MAX_BIBTEX_LENGTH = 20000  # Longer 'entries' are taken to be an unterminated one swallowing the rest
+QUICK_CLOSE_BRACES = 16  # Closing braces an entry is followed through with str.find before BraceMatcher takes over
+QUICK_CLOSE_WINDOW = 4096
+
+ReadmeScan = namedtuple('ReadmeScan', ['arxiv_ids', 'badge_id', 'bibtex'])
+
+def normalize_arxiv_id(arxiv_id):
+    """Drop the version suffix, and the subject class and case from old-style archive names."""
+    if 'v' in arxiv_id:
+        arxiv_id = VERSION_SUFFIX.sub('', arxiv_id)
+    if '/' in arxiv_id:
+        archive, number = arxiv_id.split('/', 1)
+        arxiv_id = f"{archive.split('.')[0].lower()}/{number}"
+    return arxiv_id
+
+def find_arxiv_ids(text):
+    """arXiv IDs cited in `text` as arxiv.org links or 'arXiv:' references, normalized, in order of first appearance."""
+    if not text:
+        return []
+    raw_ids = ARXIV_ID_SCANNER.findall(text)
+    if not raw_ids:
+        return []
+    # Deduplicate raw matches first; awesome lists repeat the same links many times
+    ids = dict.fromkeys(raw_ids)
+    if '/' in ' '.join(ids):
+        # Only old-style IDs can need normalizing, and the list is rebuilt only if one does
+        renamed = {arxiv_id: normalize_arxiv_id(arxiv_id) for arxiv_id in ids if '/' in arxiv_id}
+        if any(arxiv_id != normalized for arxiv_id, normalized in renamed.items()):
+            ids = dict.fromkeys(renamed.get(arxiv_id, arxiv_id) for arxiv_id in ids)
+    return list(ids)
+
+class BraceMatcher:
+    """
+    Finds the '}' closing each BibTeX entry, reading every character of the text at most once.
+
+    Entries are looked up in order. A brace's partner depends only on the text
+    after it, so the scan jumps straight to an entry once everything before it
+    is settled, and otherwise resumes where the previous lookup stopped: an
+    unterminated entry's tail is read once, not again for every '@' inside it.
+    """
+
+    def __init__(self, text, max_length=MAX_BIBTEX_LENGTH):
+        self.text = text
+        self.max_length = max_length
+        self.pairs = {}
+        self.stack = []
+        self.scanned = 0
+
+    def close(self, open_at):
+        """The index just past the '}' closing the '{' at `open_at`, or None if it isn't closed within `max_length`."""
+        if open_at >= self.scanned:
+            self.stack, self.scanned = [], open_at
+        elif open_at in self.pairs:
+            return self.pairs[open_at]
+        limit = min(open_at + self.max_length, len(self.text))
+        for brace in BRACES.finditer(self.text, self.scanned, limit):
+            if brace.group() == '{':
+                self.stack.append(brace.start())
+            elif self.stack:
+                opened = self.stack.pop()
+                self.pairs[opened] = brace.end()
+                if opened == open_at:
+                    self.scanned = brace.end()
+                    return brace.end()
+        self.scanned = max(self.scanned, limit)
+        return None
+
+def quick_close(text, open_at):
+    """
+    The index just past the '}' closing the '{' at `open_at`, following closing braces with str.find.
+
+    Settles ordinary entries without a Python step per brace; returns None for
+    anything longer or more deeply braced than that, which BraceMatcher decides.
+    """
+    depth, start = 1, open_at + 1
+    window = min(open_at + QUICK_CLOSE_WINDOW, len(text))
+    for _ in range(QUICK_CLOSE_BRACES):
+        end = text.find('}', start, window)
+        if end < 0:
+            return None
+        depth += text.count('{', start, end) - 1
+        if depth == 0:
+            return end + 1
+        start = end + 1
+    return None
+
+def find_badge_id(text):
+    """The arXiv ID linked from the first arXiv badge in `text`, or None."""
+    # str.find hops between image links faster than the regex engine's own prefix search
+    start = text.find('[![')
+    while start >= 0:
+        badge = BADGE_SCANNER.match(text, start)
+        if badge:
+            return normalize_arxiv_id(badge.group(1))
+        start = text.find('[![', start + 3)
+    return None
+
+def find_bibtex(text):
+    """BibTeX entries in `text`, brace-matched so emails and URLs inside an entry don't truncate it."""
+    if not text or '@' not in text:
+        return []
+    bibtex = []
+    bibtex_end = 0
+    braces = None
+    for match in BIBTEX_SCANNER.finditer(text):
+        if match.start() < bibtex_end:
+            continue  # An '@' inside the previous entry
+        end = quick_close(text, match.start(1))
+        if end is None:
+            braces = braces or BraceMatcher(text)
+            end = braces.close(match.start(1))
+        if end is not None:
+            bibtex.append(text[match.start():end])
+            bibtex_end = end
+    return bibtex
+
+def scan_readme(text):
+    """
+    Find arXiv IDs, the first arXiv badge link and BibTeX entries in `text` in a single call.
+
+    IDs are normalized and deduplicated in order of first appearance; IDs cited
+    inside BibTeX entries are picked up too.
+    """
+    text = text or ''
+    return ReadmeScan(find_arxiv_ids(text), find_badge_id(text), find_bibtex(text))
+
+def primary_arxiv_id(description, scan):
+    """
+    The repo's own paper: an ID in the description, else the first arXiv badge, else the only ID.
+
+    As before, the description is only trusted when the README links to arXiv at all.
+    """
+    if description and scan.arxiv_ids:
+        description_ids = find_arxiv_ids(description)
+        if description_ids:
+            return description_ids[0]
+    if scan.badge_id:
+        return scan.badge_id
+    if len(scan.arxiv_ids) == 1:
+        return scan.arxiv_ids[0]
+    return None
@@ -0,0 +1,95 @@
+import hashlib
+import os
+import threading
+import zlib
+from loguru import logger
+
+from serialization import load_json, save_json
+
+README_STORE_DIR = os.environ.get('README_STORE_DIR', os.path.join('.cache', 'readmes'))
+
+def git_blob_sha(content):
+    """The SHA git (and the GitHub `/readme` endpoint) assigns to a file with these bytes."""
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+class ReadmeStore:
+    """
+    Local, zlib-compressed README store, content-addressed by git blob SHA.
+
+    Blobs live in objects/<sha[:2]>/<sha[2:]>; index.json maps each repo's full
+    name to the SHA and ETag of its current README. Identical READMEs (forks,
+    templates) are stored once, and a README whose SHA hasn't changed is never
+    rewritten. Blobs are written as they arrive; the index is written by `save`.
+    """
+
+    def __init__(self, root=README_STORE_DIR):
+        self.root = root
+        self.index_path = os.path.join(root, 'index.json')
+        self._lock = threading.Lock()
+        self._index = None
+        self._dirty = False
+        self.stored = 0
+        self.unchanged = 0
+
+    @property
+    def index(self):
+        with self._lock:
+            if self._index is None:
+                self._index = load_json(self.index_path) if os.path.exists(self.index_path) else {}
+            return self._index
+
+    def _object_path(self, sha):
+        return os.path.join(self.root, 'objects', sha[:2], sha[2:])
+
+    def entry(self, full_name):
+        """{"sha": ..., "etag": ...} for the stored README of `full_name`, or None."""
+        return self.index.get(full_name)
+
+    def read_blob(self, sha):
+        try:
+            with open(self._object_path(sha), 'rb') as f:
+                return zlib.decompress(f.read())
+        except (OSError, zlib.error):
+            return None
+
+    def get(self, full_name):
+        """The stored README text of `full_name`, or None if there isn't one."""
+        entry = self.entry(full_name)
+        content = self.read_blob(entry['sha']) if entry else None
+        return content.decode('utf-8', errors='replace') if content is not None else None
+
+    def put(self, full_name, content, etag=None):
+        """Record `content` (bytes) as the README of `full_name`; returns its blob SHA."""
+        sha = git_blob_sha(content)
+        path = self._object_path(sha)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(zlib.compress(content))
+            os.replace(tmp_path, path)
+            self.stored += 1
+        else:
+            self.unchanged += 1
+        entry = {'sha': sha, 'etag': etag}
+        index = self.index
+        with self._lock:
+            if index.get(full_name) != entry:
+                index[full_name] = entry
+                self._dirty = True
+        return sha
+
+    def names(self):
+        return list(self.index)
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            save_json(self._index, self.index_path, compact=True)
+            self._dirty = False
+
+    def log_stats(self):
+        logger.info(f"README store: {self.stored} blobs written, {self.unchanged} unchanged, {len(self.index)} repos indexed.")
+
+readme_store = ReadmeStore()
@@ -3,38 +3,57 @@ import json
 import os
 import re
 import sys
-import base64
 from collections import defaultdict, OrderedDict
 from datetime import datetime, timedelta, UTC
 import random
 import time
+import asyncio
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from loguru import logger
 import subprocess
 
+from github_client import get_client, parse_tokens
+from rate_governor import RateBudgetExhausted
+from github_graphql import fetch_repos_graphql, GRAPHQL_BATCH_SIZE
+from http_cache import http_cache
+from storage import get_store, Journal, STARS_FILE
+from readme_scanner import scan_readme, primary_arxiv_id, find_arxiv_ids, find_bibtex
+from readme_store import ReadmeStore, readme_store
+
 GITHUB_API = "https://api.github.com"
-STARS_FILE = 'github_stars.json'
 CHUNK_SIZE = 100
-UPDATE_INTERVAL = 7
+REINDEX_CHUNK_SIZE = 200  # Repos per process pool task when re-extracting from stored READMEs
+UPDATE_INTERVAL = 7  # Days before a repo's metadata is considered stale
+REFRESH_COST = 2  # Worst-case requests per refresh: metadata, plus README if the repo was pushed to
+PUSH_RECENCY_DAYS = 30  # Recently pushed repos are refreshed up to twice as eagerly
 COMMIT_INTERVAL = 5
 RATE_LIMIT_THRESHOLD = 100 
-CORE_RATE_LIMIT_THRESHOLD = 100
 SEARCH_RATE_LIMIT_THRESHOLD = 5
+README_MEDIA_TYPE = "application/vnd.github.raw"  # The file itself, rather than base64 wrapped in JSON
+MAX_CONCURRENCY = int(os.environ.get('SCRAPE_CONCURRENCY', 8))  # Repos fetched in parallel
+FETCH_MODE = os.environ.get('SCRAPE_FETCH_MODE', 'rest')  # 'rest' or 'graphql'
+FULL_SYNC = os.environ.get('SCRAPE_FULL_SYNC', '').lower() in ('1', 'true', 'yes')  # Walk every page of stars
 
 # Configure logger
 logger.add("scraper.log", rotation="10 MB")
 
-def check_initial_rate_limit(token):
+def get_core_rate_limit(token):
+    """Core requests remaining across every token in the pool, and the latest reset time."""
     url = f"{GITHUB_API}/rate_limit"
-    headers = {
-        "Authorization": f"token {token}",
-        "Accept": "application/vnd.github.v3+json"
-    }
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-    data = response.json()
-    
-    remaining = data['resources']['core']['remaining']
-    reset_time = data['resources']['core']['reset']
+    client = get_client(token)
+    remaining, reset_time = 0, 0
+    for pool_token in client.tokens:
+        response = client.get(url, use_cache=False, token=pool_token)
+        response.raise_for_status()
+        core = response.json()['resources']['core']
+        remaining += core['remaining']
+        reset_time = max(reset_time, core['reset'])
+    return remaining, reset_time
+
+def check_initial_rate_limit(token):
+    remaining, reset_time = get_core_rate_limit(token)
     
     if remaining <= RATE_LIMIT_THRESHOLD:
         current_time = time.time()
@@ -47,54 +66,50 @@ def check_initial_rate_limit(token):
     logger.info(f"Initial rate limit check passed. {remaining} requests remaining.")
     return True
 
-def handle_rate_limit(response):
-    remaining = int(response.headers.get('X-RateLimit-Remaining', 0))
-    reset_time = int(response.headers.get('X-RateLimit-Reset', 0))
-    
-    if remaining <= CORE_RATE_LIMIT_THRESHOLD:
-        current_time = time.time()
-        sleep_time = max(reset_time - current_time, 0) + 1
-        
-        if sleep_time > 0:
-            logger.warning(f"Rate limit low. {remaining} requests remaining. Sleeping for {sleep_time:.2f} seconds until reset.")
-            time.sleep(sleep_time)
-        else:
-            logger.info(f"Rate limit low but reset time has passed. Proceeding cautiously.")
+def get_starred_repos(username, token, known_stars=None):
+    """
+    Fetch starred repos, newest first.
 
-def get_starred_repos(username, token, since=None):
+    If `known_stars` (a set of (full_name, starred_at) pairs) is given, paging stops
+    after the first page on which every star is already known, since every later
+    page is older still.
+    """
     url = f"{GITHUB_API}/users/{username}/starred"
-    params = {"per_page": 100}
-    if since:
-        params["since"] = since.isoformat()
+    params = {"per_page": 100, "sort": "created", "direction": "desc"}
     
-    headers = {
-        "Authorization": f"token {token}",
-        "Accept": "application/vnd.github.v3.star+json"
-    }
+    headers = {"Accept": "application/vnd.github.v3.star+json"}
+    client = get_client(token)
     starred_repos = []
     
     while url:
-        response = requests.get(url, headers=headers, params=params)
+        response = client.get(url, headers=headers, params=params)
         response.raise_for_status()
-        handle_rate_limit(response)
         
-        starred_repos.extend(response.json())
+        page = response.json()
+        starred_repos.extend(page)
+        if known_stars is not None and all(
+            (item['repo']['full_name'], item['starred_at']) in known_stars for item in page
+        ):
+            logger.info(f"Reached already-synced stars after {len(starred_repos)} repositories; stopping early.")
+            break
         url = response.links.get('next', {}).get('url')
         if url:
             params = {}  # Clear params for pagination
     
     return starred_repos
 
+def get_known_stars(existing_data):
+    return {
+        (repo_name, repo_data['metadata'].get('starred_at'))
+        for repo_name, repo_data in existing_data['repositories'].items()
+        if 'metadata' in repo_data
+    }
+
 def get_repo_metadata(repo, token):
     url = f"{GITHUB_API}/repos/{repo['full_name']}"
-    headers = {
-        "Authorization": f"token {token}",
-        "Accept": "application/vnd.github.v3+json"
-    }
     try:
-        response = requests.get(url, headers=headers)
+        response = get_client(token).get(url)
         response.raise_for_status()
-        handle_rate_limit(response)
         return response.json()
     except requests.exceptions.HTTPError as e:
         if e.response.status_code in [403, 404]:
@@ -102,15 +117,24 @@ def get_repo_metadata(repo, token):
             return None
         raise
 
+store = get_store()
+journal = Journal()
+
 def load_existing_data():
-    if os.path.exists(STARS_FILE):
-        with open(STARS_FILE, 'r') as f:
-            return json.load(f)
-    return {"last_updated": None, "repositories": {}, "last_processed_index": 0}
+    """Load the store, then replay any repos a previous run finished but didn't get to save."""
+    data = store.load({"last_updated": None, "repositories": {}})
+    replayed = journal.replay(data)
+    if replayed:
+        logger.info(f"Replayed {replayed} repositories from the journal of an interrupted run.")
+        # Compact straight away, so a run with nothing new to do doesn't leave them to be replayed again
+        save_data(data)
+    return data
 
 def save_data(data):
-    with open(STARS_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+    store.save(data)
+    readme_store.save()
+    # Everything journaled so far is now in the store
+    journal.clear()
 
 def extract_metadata(metadata, starred_at):
     return {
@@ -131,74 +155,104 @@ def extract_metadata(metadata, starred_at):
     }
 
 def get_readme_content(repo_full_name, token):
+    """
+    The repo's README text, fetched raw and kept in the README store.
+
+    The request carries the stored README's ETag, so an unchanged README costs a
+    304 and is read back from the store instead of being downloaded again.
+    """
     url = f"{GITHUB_API}/repos/{repo_full_name}/readme"
-    headers = {
-        "Authorization": f"token {token}",
-        "Accept": "application/vnd.github.v3+json"
-    }
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        content = response.json().get('content', '')
-        if content:
-            return base64.b64decode(content).decode('utf-8')
+    client = get_client(token)
+    headers = {"Accept": README_MEDIA_TYPE}
+    entry = readme_store.entry(repo_full_name)
+    conditional = dict(headers, **{"If-None-Match": entry['etag']}) if entry and entry.get('etag') else headers
+    response = client.get(url, headers=conditional, use_cache=False)
+    if response.status_code == 304:
+        content = readme_store.get(repo_full_name)
+        if content is not None:
+            return content
+        # The index outlived its blob; fetch it unconditionally
+        response = client.get(url, headers=headers, use_cache=False)
+    if response.status_code == 200 and response.content:
+        readme_store.put(repo_full_name, response.content, response.headers.get('ETag'))
+        return response.content.decode('utf-8', errors='replace')
     return None
 
-# def extract_arxiv_urls(text):
-#     arxiv_pattern = r'(?:arxiv\.org/(?:abs|pdf)/|arxiv:)(\d{4}\.\d{4,5})'
-#     return list(OrderedDict.fromkeys(re.findall(arxiv_pattern, text)))
-
 def extract_arxiv_id(url):
-    arxiv_pattern = r'(?:arxiv\.org/(?:abs|pdf)/|arxiv:)(\d{4}\.\d{4,5})'
-    match = re.search(arxiv_pattern, url)
-    return match.group(1) if match else None
+    arxiv_ids = find_arxiv_ids(url)
+    return arxiv_ids[0] if arxiv_ids else None
 
 def extract_arxiv_ids(text):
-    arxiv_pattern = r'(?:arxiv\.org/(?:abs|pdf)/|arxiv:)(\d{4}\.\d{4,5})'
-    return list(OrderedDict.fromkeys(re.findall(arxiv_pattern, text)))
+    return find_arxiv_ids(text)
 
 def infer_primary_arxiv_id(description, readme_content, arxiv_ids):
-    if description and arxiv_ids:
-        desc_ids = extract_arxiv_ids(description)
-        if desc_ids:
-            return desc_ids[0]
-    
-    if readme_content:
-        # Check for arXiv badge
-        badge_pattern = r'\[!\[arXiv\].*\]\(https://arxiv\.org/abs/(\d{4}\.\d{4,5})\)'
-        badge_match = re.search(badge_pattern, readme_content)
-        if badge_match:
-            return badge_match.group(1)
-    
-    if len(arxiv_ids) == 1:
-        return arxiv_ids[0]
-    
-    return None
+    return primary_arxiv_id(description, scan_readme(readme_content)._replace(arxiv_ids=arxiv_ids))
 
 def extract_bibtex(text):
-    bibtex_pattern = r'(@\w+\{[^@]*\})'
-    return re.findall(bibtex_pattern, text, re.DOTALL)
+    return find_bibtex(text)
 
-def process_repo(repo_name, repo_data, token):
-    readme_content = get_readme_content(repo_name, token)
-    
-    arxiv_ids = []
-    if readme_content:
-        arxiv_ids = extract_arxiv_ids(readme_content)
-        bibtex_citations = extract_bibtex(readme_content)
-    else:
-        bibtex_citations = []
-    
-    description = repo_data['metadata'].get('description', '')
-    primary_arxiv_id = infer_primary_arxiv_id(description, readme_content, arxiv_ids)
-    
-    repo_data['arxiv'] = {
-        'ids': arxiv_ids,
-        'primary_id': primary_arxiv_id,
-        'bibtex_citations': bibtex_citations
+def extract_arxiv(description, readme_content):
+    """The `arxiv` block of a repo record, from its description and README."""
+    scan = scan_readme(readme_content)
+    return {
+        'ids': scan.arxiv_ids,
+        'primary_id': primary_arxiv_id(description, scan),
+        'bibtex_citations': scan.bibtex
     }
+
+def process_repo(repo_name, repo_data, token, readme_content=None):
+    if readme_content is None:
+        readme_content = get_readme_content(repo_name, token)
+    elif readme_content:
+        # Fetched some other way (GraphQL); keep it for re-extraction all the same
+        readme_store.put(repo_name, readme_content.encode('utf-8'))
     
+    repo_data['arxiv'] = extract_arxiv(repo_data['metadata'].get('description', ''), readme_content)
     return repo_data
 
+def reindex_chunk(store_root, items):
+    """Process pool worker: re-extract (repo_name, description, readme_sha) items from the README store."""
+    store = ReadmeStore(store_root)
+    results = []
+    for repo_name, description, sha in items:
+        content = store.read_blob(sha)
+        if content is not None:
+            results.append((repo_name, extract_arxiv(description, content.decode('utf-8', errors='replace'))))
+    return results
+
+def reindex_repos(existing_data, target_store=None, workers=None, chunk_size=REINDEX_CHUNK_SIZE):
+    """
+    Rebuild every repo's `arxiv` block from the README store, without touching the network.
+
+    Extraction runs across a process pool; repos with no stored README keep their
+    current block. Only blocks that come out different are replaced, so a save
+    afterwards rewrites just those records. Returns the names of the repos that changed.
+    """
+    target_store = target_store or readme_store
+    items = []
+    for repo_name, repo_data in existing_data['repositories'].items():
+        entry = target_store.entry(repo_name)
+        if entry:
+            items.append((repo_name, repo_data.get('metadata', {}).get('description', ''), entry['sha']))
+    chunks = [items[i:i+chunk_size] for i in range(0, len(items), chunk_size)]
+    logger.info(f"Re-extracting {len(items)} of {len(existing_data['repositories'])} repositories from stored READMEs.")
+
+    if workers == 1:
+        results = [reindex_chunk(target_store.root, chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(partial(reindex_chunk, target_store.root), chunks))
+
+    changed = []
+    for chunk_results in results:
+        for repo_name, arxiv in chunk_results:
+            repo_data = existing_data['repositories'][repo_name]
+            if repo_data.get('arxiv') != arxiv:
+                repo_data['arxiv'] = arxiv
+                changed.append(repo_name)
+    logger.info(f"Re-extraction changed the arxiv fields of {len(changed)} repositories.")
+    return changed
+
 def process_repo_batch(repos, token, existing_data):
     for item in repos:
         repo_name = item['repo']['full_name']
@@ -224,6 +278,7 @@ def process_repo_batch(repos, token, existing_data):
 
 def commit_and_push():
     try:
+        store.export(STARS_FILE)
         subprocess.run(["git", "config", "--global", "user.name", "GitHub Action"], check=True)
         subprocess.run(["git", "config", "--global", "user.email", "action@github.com"], check=True)
         subprocess.run(["git", "add", STARS_FILE], check=True)
@@ -266,50 +321,133 @@ def get_git_remote_username():
     return None
 
 
-def process_stars(username, token, existing_data):
+async def fetch_repo_record(item, token, semaphore):
+    """Fetch metadata and README for one starred repo, bounded by `semaphore`."""
+    repo_name = item['repo']['full_name']
+    async with semaphore:
+        metadata = await asyncio.to_thread(get_repo_metadata, item['repo'], token)
+        if not metadata:
+            return repo_name, None
+        repo_data = {
+            'lists': [],  # Initialize as empty, to be populated by a separate process
+            'metadata': extract_metadata(metadata, item['starred_at']),
+            'last_updated': datetime.now(UTC).isoformat()
+        }
+        repo_data = await asyncio.to_thread(process_repo, repo_name, repo_data, token)
+    journal.append(repo_name, repo_data)
+    return repo_name, repo_data
+
+async def process_chunk_async(chunk, token, existing_data, concurrency=MAX_CONCURRENCY):
+    """
+    Fetch all repos in `chunk` that are not yet in `existing_data` concurrently.
+
+    Results are merged back in star order, so the stored records are identical
+    to a sequential run. Returns True if any repo was added.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    new_items = [item for item in chunk if item['repo']['full_name'] not in existing_data['repositories']]
+    results = await asyncio.gather(
+        *(fetch_repo_record(item, token, semaphore) for item in new_items),
+        return_exceptions=True
+    )
+
+    chunk_changes = False
+    errors = []
+    for result in results:
+        if isinstance(result, Exception):
+            errors.append(result)
+            continue
+        repo_name, repo_data = result
+        if repo_data:
+            existing_data['repositories'][repo_name] = repo_data
+            chunk_changes = True
+        else:
+            logger.warning(f"Skipping repo {repo_name} due to metadata retrieval failure.")
+    if errors:
+        # Repos that did complete are kept, so the caller can checkpoint them
+        raise errors[0]
+    return chunk_changes
+
+def process_chunk_graphql(chunk, token, existing_data):
+    """
+    Fetch all repos in `chunk` that are not yet in `existing_data` with batched GraphQL queries.
+
+    Each query returns metadata and README text for up to GRAPHQL_BATCH_SIZE repos, which
+    are fed through `extract_metadata` and `process_repo` exactly like the REST path.
+    Returns True if any repo was added.
+    """
+    new_items = [item for item in chunk if item['repo']['full_name'] not in existing_data['repositories']]
+
+    chunk_changes = False
+    for i in range(0, len(new_items), GRAPHQL_BATCH_SIZE):
+        batch = new_items[i:i+GRAPHQL_BATCH_SIZE]
+        results = fetch_repos_graphql([item['repo']['full_name'] for item in batch], token)
+        for item in batch:
+            repo_name = item['repo']['full_name']
+            metadata, readme_content = results[repo_name]
+            if not metadata:
+                logger.warning(f"Skipping repo {repo_name} due to metadata retrieval failure.")
+                continue
+            repo_data = {
+                'lists': [],  # Initialize as empty, to be populated by a separate process
+                'metadata': extract_metadata(metadata, item['starred_at']),
+                'last_updated': datetime.now(UTC).isoformat()
+            }
+            existing_data['repositories'][repo_name] = process_repo(repo_name, repo_data, token, readme_content)
+            journal.append(repo_name, existing_data['repositories'][repo_name])
+            chunk_changes = True
+    return chunk_changes
+
+def process_stars(username, token, existing_data, concurrency=MAX_CONCURRENCY, fetch_mode=FETCH_MODE, full_sync=FULL_SYNC):
     logger.info("Starting star processing...")
-    all_starred = get_starred_repos(username, token)
+    if full_sync or not existing_data['repositories']:
+        all_starred = get_starred_repos(username, token)
+    else:
+        logger.info("Running incremental sync against existing stars.")
+        all_starred = get_starred_repos(username, token, known_stars=get_known_stars(existing_data))
     total_repos = len(all_starred)
     
-    logger.info(f"Found {total_repos} total starred repositories.")
+    logger.info(f"Found {total_repos} starred repositories to check.")
+    if fetch_mode == 'graphql':
+        logger.info(f"Fetching repositories in GraphQL batches of {GRAPHQL_BATCH_SIZE}.")
+    else:
+        logger.info(f"Fetching up to {concurrency} repositories concurrently.")
+        client = get_client(token)
+        new_repos = sum(1 for item in all_starred if item['repo']['full_name'] not in existing_data['repositories'])
+        if not client.can_afford(2 * new_repos):
+            logger.warning(f"Remaining rate budget can't cover {new_repos} new repositories; "
+                           "this run will checkpoint and exit when it runs out.")
 
     changes_made = False
     chunks_processed = 0
+    repo_count = len(existing_data['repositories'])
 
-    for i in range(0, total_repos, CHUNK_SIZE):
-        chunk = all_starred[i:i+CHUNK_SIZE]
-        logger.info(f"Processing chunk {i//CHUNK_SIZE + 1} of {total_repos//CHUNK_SIZE + 1}")
-        
-        chunk_changes = False
-        
-        for item in chunk:
-            repo_name = item['repo']['full_name']
-            if repo_name not in existing_data['repositories']:
-                metadata = get_repo_metadata(item['repo'], token)
-                if metadata:
-                    existing_data['repositories'][repo_name] = {
-                        'lists': [],  # Initialize as empty, to be populated by a separate process
-                        'metadata': extract_metadata(metadata, item['starred_at']),
-                        'last_updated': datetime.now(UTC).isoformat()
-                    }
-                    existing_data['repositories'][repo_name] = process_repo(
-                        repo_name, 
-                        existing_data['repositories'][repo_name], 
-                        token
-                    )
-                    chunk_changes = True
-                    changes_made = True
-                else:
-                    logger.warning(f"Skipping repo {repo_name} due to metadata retrieval failure.")
-        
-        if chunk_changes:
+    try:
+        for i in range(0, total_repos, CHUNK_SIZE):
+            chunk = all_starred[i:i+CHUNK_SIZE]
+            logger.info(f"Processing chunk {i//CHUNK_SIZE + 1} of {total_repos//CHUNK_SIZE + 1}")
+            
+            if fetch_mode == 'graphql':
+                chunk_changes = process_chunk_graphql(chunk, token, existing_data)
+            else:
+                chunk_changes = asyncio.run(process_chunk_async(chunk, token, existing_data, concurrency))
+            changes_made = changes_made or chunk_changes
+            
+            if chunk_changes:
+                existing_data['last_updated'] = datetime.now(UTC).isoformat()
+                save_data(existing_data)
+                chunks_processed += 1
+            
+            # Commit and push every COMMIT_INTERVAL chunks with changes
+            if chunk_changes and (chunks_processed % COMMIT_INTERVAL == 0):
+                commit_and_push()
+    except RateBudgetExhausted:
+        if len(existing_data['repositories']) != repo_count:
+            logger.warning("Rate budget exhausted; checkpointing progress before exiting.")
             existing_data['last_updated'] = datetime.now(UTC).isoformat()
             save_data(existing_data)
-            chunks_processed += 1
-        
-        # Commit and push every COMMIT_INTERVAL chunks with changes
-        if chunk_changes and (chunks_processed % COMMIT_INTERVAL == 0):
             commit_and_push()
+        raise
 
     # Final commit if there are any uncommitted changes
     if changes_made:
@@ -319,19 +457,129 @@ def process_stars(username, token, existing_data):
     logger.info("Star processing completed.")
     logger.info("Note: Star lists information is not available and needs to be populated separately.")
 
+def parse_timestamp(value):
+    if not value:
+        return datetime.min.replace(tzinfo=UTC)
+    return datetime.fromisoformat(value)
+
+def refresh_priority(repo_data, now):
+    """
+    Score how urgently a repo needs refreshing; None if it isn't stale yet.
+
+    Staleness (days since `last_updated`) is the base score, scaled by up to 2x
+    for repos that have been pushed to recently, since those are the ones whose
+    stars, forks and README are most likely to have moved.
+    """
+    staleness = (now - parse_timestamp(repo_data.get('last_updated'))).total_seconds() / 86400
+    if staleness < UPDATE_INTERVAL:
+        return None
+    pushed_at = repo_data.get('metadata', {}).get('pushed_at')
+    days_since_push = max((now - parse_timestamp(pushed_at)).total_seconds() / 86400, 0)
+    return staleness * (1 + PUSH_RECENCY_DAYS / (PUSH_RECENCY_DAYS + days_since_push))
+
+def select_stale_repos(existing_data, budget, now=None):
+    """Pick the highest-priority stale repos whose worst-case refresh cost fits in `budget` requests."""
+    now = now or datetime.now(UTC)
+    scored = []
+    for repo_name, repo_data in existing_data['repositories'].items():
+        priority = refresh_priority(repo_data, now)
+        if priority is not None:
+            scored.append((priority, repo_name))
+    scored.sort(reverse=True)
+    return [repo_name for _, repo_name in scored[:max(budget, 0) // REFRESH_COST]]
+
+async def refresh_repo_record(repo_name, repo_data, token, semaphore):
+    """Refetch metadata for a stored repo, and its README if it was pushed to since the last refresh."""
+    async with semaphore:
+        metadata = await asyncio.to_thread(get_repo_metadata, {'full_name': repo_name}, token)
+        refreshed = dict(repo_data, last_updated=datetime.now(UTC).isoformat())
+        # Without metadata, keep the last known record, but don't retry it before the next interval
+        if metadata:
+            old_metadata = repo_data.get('metadata', {})
+            refreshed['metadata'] = extract_metadata(metadata, old_metadata.get('starred_at'))
+            if refreshed['metadata']['pushed_at'] != old_metadata.get('pushed_at') or 'arxiv' not in repo_data:
+                refreshed = await asyncio.to_thread(process_repo, repo_name, refreshed, token)
+    journal.append(repo_name, refreshed)
+    return repo_name, refreshed
+
+async def refresh_chunk_async(repo_names, token, existing_data, concurrency=MAX_CONCURRENCY):
+    semaphore = asyncio.Semaphore(concurrency)
+    results = await asyncio.gather(*(
+        refresh_repo_record(repo_name, existing_data['repositories'][repo_name], token, semaphore)
+        for repo_name in repo_names
+    ), return_exceptions=True)
+    errors = [result for result in results if isinstance(result, Exception)]
+    for result in results:
+        if not isinstance(result, Exception):
+            repo_name, repo_data = result
+            existing_data['repositories'][repo_name] = repo_data
+    if errors:
+        raise errors[0]
+
+def refresh_stale_repos(token, existing_data, budget=None, concurrency=MAX_CONCURRENCY):
+    """
+    Refresh as many stale repos as the remaining core rate-limit budget allows.
+
+    Runs after new-star ingestion, so it only ever spends what ingestion left over
+    (minus RATE_LIMIT_THRESHOLD per token in reserve). Repos not reached this run keep their
+    priority and are picked up by later runs.
+    """
+    if budget is None:
+        remaining, _ = get_core_rate_limit(token)
+        budget = remaining - RATE_LIMIT_THRESHOLD * len(get_client(token).tokens)
+    stale = select_stale_repos(existing_data, budget)
+    logger.info(f"Refreshing {len(stale)} stale repositories with a budget of {budget} requests.")
+
+    chunks_processed = 0
+    try:
+        for i in range(0, len(stale), CHUNK_SIZE):
+            try:
+                asyncio.run(refresh_chunk_async(stale[i:i+CHUNK_SIZE], token, existing_data, concurrency))
+            finally:
+                # Checkpoint whatever was refreshed, even if the budget ran out mid-chunk
+                existing_data['last_updated'] = datetime.now(UTC).isoformat()
+                save_data(existing_data)
+                chunks_processed += 1
+            if chunks_processed % COMMIT_INTERVAL == 0:
+                commit_and_push()
+    except RateBudgetExhausted:
+        # With the sqlite backend, only commit_and_push exports what was saved
+        logger.warning("Rate budget exhausted; committing refreshed repositories before exiting.")
+        commit_and_push()
+        raise
+
+    if chunks_processed % COMMIT_INTERVAL != 0:
+        commit_and_push()
+    logger.info("Stale repository refresh completed.")
+
+def reindex(workers=None):
+    existing_data = load_existing_data()
+    if reindex_repos(existing_data, workers=workers):
+        save_data(existing_data)
+
 def main():
+    parser = argparse.ArgumentParser(description="Scrape starred repositories, or re-extract arXiv fields offline.")
+    parser.add_argument('mode', nargs='?', choices=('scrape', 'reindex'), default='scrape',
+                        help="'reindex' rebuilds every repo's arxiv fields from the README store without API calls")
+    parser.add_argument('--workers', type=int, help="Worker processes for reindex (default: one per CPU)")
+    args = parser.parse_args()
+    if args.mode == 'reindex':
+        reindex(args.workers)
+        return
+
     username = os.environ.get('GITHUB_USERNAME') or get_git_remote_username()
-    token = os.environ.get('GITHUB_TOKEN')
+    # GITHUB_TOKENS takes a comma-separated pool of tokens; requests are spread across all of them
+    token = parse_tokens(os.environ.get('GITHUB_TOKENS') or os.environ.get('GITHUB_TOKEN'))
     
     logger.info(f"Determined username: {username}")
-    logger.info(f"Token available: {'Yes' if token else 'No'}")
+    logger.info(f"Tokens available: {len(token)}")
     
     if not username:
         logger.error("Unable to determine GitHub username. Please set GITHUB_USERNAME environment variable or run from a git repository.")
         raise ValueError("GitHub username must be provided or determinable from git remote.")
     
     if not token:
-        logger.error("GITHUB_TOKEN environment variable is not set.")
+        logger.error("Neither GITHUB_TOKENS nor GITHUB_TOKEN environment variable is set.")
         raise ValueError("GitHub token must be provided as an environment variable.")
     
     logger.info(f"Using GitHub username: {username}")
@@ -344,10 +592,19 @@ def main():
     existing_data = load_existing_data()
     
     try:
-        process_stars(username, token, existing_data)
+        # Each token brings its own budget, so scale concurrency with the pool
+        concurrency = MAX_CONCURRENCY * len(token)
+        process_stars(username, token, existing_data, concurrency=concurrency)
+        refresh_stale_repos(token, existing_data, concurrency=concurrency)
+    except RateBudgetExhausted as e:
+        logger.warning(f"{e}. Progress has been checkpointed; the next run will pick up from here.")
     except Exception as e:
         logger.error(f"An error occurred during execution: {e}")
         raise
+    finally:
+        readme_store.save()
+        http_cache.log_stats()
+        readme_store.log_stats()
 
 if __name__ == "__main__":
     main()
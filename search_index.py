@@ -0,0 +1,67 @@
+import bisect
+import re
+
+# Letters and digits; matches the frontend's /[\p{L}\p{N}]+/gu so queries tokenize the same way
+TOKEN_PATTERN = re.compile(r'[^\W_]+')
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+def repo_search_text(name, summary, papers):
+    """Everything a repo is searchable by: name, description, language, lists and linked paper titles."""
+    metadata = summary.get('metadata', {})
+    fields = [name, metadata.get('description'), metadata.get('language'), *summary.get('lists', [])]
+    fields.extend(paper.get('title') for paper in papers.values())
+    return ' '.join(field for field in fields if field)
+
+def build_search_index(rows):
+    """
+    Inverted index over `rows` (name, summary, papers), in order, so ordinals match the manifest.
+
+    Returns {"terms": [...], "postings": [...]}: terms sorted so the frontend can
+    binary-search a prefix range, and each posting list of ordinals delta-encoded
+    (first ordinal, then gaps) to keep the file small.
+    """
+    postings = {}
+    for ordinal, (name, summary, papers) in enumerate(rows):
+        for term in set(tokenize(repo_search_text(name, summary, papers))):
+            postings.setdefault(term, []).append(ordinal)
+
+    terms = sorted(postings)
+    encoded = []
+    for term in terms:
+        previous = 0
+        deltas = []
+        for ordinal in postings[term]:
+            deltas.append(ordinal - previous)
+            previous = ordinal
+        encoded.append(deltas)
+    return {'terms': terms, 'postings': encoded}
+
+def decode_postings(deltas):
+    ordinals = []
+    current = 0
+    for delta in deltas:
+        current += delta
+        ordinals.append(current)
+    return ordinals
+
+def search(index, query):
+    """
+    Ordinals matching every query token as a term prefix; the reference for the frontend's search.
+
+    Returns None for a query with no tokens, meaning "no text filter".
+    """
+    terms = index['terms']
+    result = None
+    for token in tokenize(query):
+        matches = set()
+        start = bisect.bisect_left(terms, token)
+        for i in range(start, len(terms)):
+            if not terms[i].startswith(token):
+                break
+            matches.update(decode_postings(index['postings'][i]))
+        result = matches if result is None else result & matches
+        if not result:
+            break
+    return result
@@ -0,0 +1,172 @@
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import requests
+from loguru import logger
+
+from github_client import build_session
+
+SEMANTIC_SCHOLAR_BATCH_URL = "https://api.semanticscholar.org/graph/v1/paper/batch"
+SEMANTIC_SCHOLAR_FIELDS = "title,authors,abstract,year,venue,url,externalIds,paperId,citationCount,influentialCitationCount,referenceCount"
+SEMANTIC_SCHOLAR_API_KEY = os.environ.get('SEMANTIC_SCHOLAR_API_KEY')  # Optional; raises the shared rate limit
+BATCH_SIZE = 500  # Maximum allowed by the API
+MAX_IN_FLIGHT = 2
+MIN_INTERVAL = 1.0  # Seconds between request starts at full speed; the unauthenticated limit is about 1 request/s
+MAX_INTERVAL = 60.0
+INTERVAL_STEP = 0.25  # Additive speed-up per successful batch
+MAX_ATTEMPTS = 5
+REQUEST_TIMEOUT = 120
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+OVERSIZED_STATUSES = (400, 413)  # Too many IDs, or a payload the API rejects as a whole
+
+class AIMDPacer:
+    """
+    Spaces request starts adaptively: additive speed-up on success, multiplicative slow-down when throttled.
+
+    A throttled response also holds every request back until its Retry-After
+    has passed, so the client stops hammering the moment the API says so.
+    """
+
+    def __init__(self, interval=MIN_INTERVAL, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL, step=INTERVAL_STEP):
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.step = step
+        self.next_start = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self.next_start)
+            self.next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+    def success(self):
+        with self._lock:
+            self.interval = max(self.min_interval, self.interval - self.step)
+
+    def throttled(self, retry_after=None):
+        with self._lock:
+            self.interval = min(self.max_interval, self.interval * 2)
+            if retry_after is not None:
+                self.next_start = max(self.next_start, time.monotonic() + retry_after)
+
+def parse_retry_after(value):
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+class SemanticScholarClient:
+    """
+    Semantic Scholar batch lookups with adaptive pacing, a few batches in flight, and nothing silently dropped.
+
+    `fetch` splits IDs into batches of `batch_size` and keeps up to
+    `max_in_flight` of them outstanding, paced by an AIMDPacer that honours
+    Retry-After. Throttled and failed batches are re-queued, up to
+    `max_attempts` tries each; batches the API rejects as too large are split
+    in half and re-queued. IDs that still fail are listed in `failed_ids`, and
+    `log_stats` reports per-batch latency and outcome counts. A `max_requests`
+    cap on `fetch` counts every request sent, retries and splits included; IDs
+    left queued when it runs out are listed in `unsent_ids`.
+    """
+
+    def __init__(self, session=None, url=SEMANTIC_SCHOLAR_BATCH_URL, fields=SEMANTIC_SCHOLAR_FIELDS,
+                 batch_size=BATCH_SIZE, max_in_flight=MAX_IN_FLIGHT, max_attempts=MAX_ATTEMPTS,
+                 pacer=None, api_key=SEMANTIC_SCHOLAR_API_KEY):
+        # Its own session, without the shared one's 5xx retries: `fetch` re-queues those itself, paced
+        self.session = session or build_session(pool_size=max_in_flight, status_forcelist=())
+        self.url = url
+        self.fields = fields
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+        self.max_attempts = max_attempts
+        self.pacer = pacer or AIMDPacer()
+        self.headers = {'x-api-key': api_key} if api_key else {}
+        self.latencies = []
+        self.succeeded = 0
+        self.retried = 0
+        self.split = 0
+        self.failed_ids = []
+        self.unsent_ids = []
+
+    def _post(self, ids):
+        self.pacer.wait()
+        start = time.monotonic()
+        try:
+            response = self.session.post(self.url, params={'fields': self.fields}, json={'ids': ids},
+                                         headers=self.headers, timeout=REQUEST_TIMEOUT)
+        except requests.exceptions.RequestException as e:
+            return None, e, time.monotonic() - start
+        return response, None, time.monotonic() - start
+
+    def fetch(self, ids, max_requests=None):
+        """Look up `ids` ("arXiv:2104.08653", "DOI:10.1/x", ...); returns {id: paper} for the IDs Semantic Scholar knows."""
+        results = {}
+        pending = deque((ids[i:i+self.batch_size], 1) for i in range(0, len(ids), self.batch_size))
+        sent = 0
+        with ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix='semantic-scholar') as pool:
+            in_flight = {}
+            while in_flight or (pending and (max_requests is None or sent < max_requests)):
+                while pending and len(in_flight) < self.max_in_flight and (max_requests is None or sent < max_requests):
+                    batch, attempt = pending.popleft()
+                    in_flight[pool.submit(self._post, batch)] = (batch, attempt)
+                    sent += 1
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch, attempt = in_flight.pop(future)
+                    response, error, latency = future.result()
+                    self.latencies.append(latency)
+                    pending.extend(self._handle(batch, attempt, response, error, results))
+        unsent = [requested for batch, _ in pending for requested in batch]
+        if unsent:
+            self.unsent_ids.extend(unsent)
+            logger.warning(f"Semantic Scholar request budget of {max_requests} spent; {len(unsent)} IDs left unsent.")
+        return results
+
+    def _handle(self, batch, attempt, response, error, results):
+        """Record one batch's outcome; returns the (batch, attempt) pairs to queue again."""
+        if response is not None and response.status_code == 200:
+            self.pacer.success()
+            self.succeeded += 1
+            for requested, paper in zip(batch, response.json()):
+                if paper:
+                    results[requested] = paper
+            return []
+
+        if response is not None and response.status_code in OVERSIZED_STATUSES:
+            if len(batch) > 1:
+                self.split += 1
+                middle = len(batch) // 2
+                logger.info(f"Semantic Scholar rejected a batch of {len(batch)} IDs ({response.status_code}); splitting it.")
+                return [(batch[:middle], attempt), (batch[middle:], attempt)]
+            logger.warning(f"Semantic Scholar rejected {batch[0]}: {response.text[:200]}")
+            self.failed_ids.extend(batch)
+            return []
+
+        if response is not None and response.status_code == 429:
+            self.pacer.throttled(parse_retry_after(response.headers.get('Retry-After')))
+        reason = error or (response.status_code if response is not None else None)
+        if (response is None or response.status_code in RETRYABLE_STATUSES) and attempt < self.max_attempts:
+            self.retried += 1
+            logger.warning(f"Semantic Scholar batch of {len(batch)} IDs failed ({reason}); re-queued, attempt {attempt + 1}.")
+            return [(batch, attempt + 1)]
+        logger.error(f"Semantic Scholar batch of {len(batch)} IDs failed ({reason}) after {attempt} attempts.")
+        self.failed_ids.extend(batch)
+        return []
+
+    def log_stats(self):
+        if self.latencies:
+            latency = f"latency median {statistics.median(self.latencies):.2f}s, max {max(self.latencies):.2f}s"
+        else:
+            latency = "no requests"
+        logger.info(
+            f"Semantic Scholar: {len(self.latencies)} requests ({latency}); {self.succeeded} batches succeeded, "
+            f"{self.retried} re-queued, {self.split} split; {len(self.failed_ids)} IDs failed; "
+            f"pacing interval {self.pacer.interval:.2f}s."
+        )
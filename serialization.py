@@ -0,0 +1,53 @@
+import json
+import os
+import tempfile
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library; same output, just slower
+    orjson = None
+
+# Compact output drops the indentation, roughly halving file size; pretty output keeps diffs readable
+COMPACT_JSON = os.environ.get('STARS_COMPACT_JSON', '').lower() in ('1', 'true', 'yes')
+
+def dumps(data, compact=COMPACT_JSON):
+    """Serialize `data` to UTF-8 JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data, option=0 if compact else orjson.OPT_INDENT_2)
+    if compact:
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+def loads(text):
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+def load_json(path):
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+def save_json(data, path, compact=COMPACT_JSON):
+    """
+    Write `data` to `path` atomically.
+
+    The JSON is written to a temporary file in the same directory, fsynced, and
+    renamed over `path`, so readers and a killed job only ever see the old or
+    the new file, never a truncated one.
+    """
+    payload = dumps(data, compact)
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            # mkstemp creates the file owner-only; keep the permissions of the file being replaced
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o777 if os.path.exists(path) else 0o644)
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
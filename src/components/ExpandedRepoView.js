@@ -1,9 +1,26 @@
-import React from 'react';
+import React, { useState, useEffect } from 'react';
 import { extractArXivId } from '../utils/arxivUtils';
+import { DATA_URL } from '../hooks/useRepositories';
 
 const ExpandedRepoView = ({ repo, name, arxivMetadata }) => {
+  const [detail, setDetail] = useState(null);
+
+  useEffect(() => {
+    // The list shards only carry paper summaries; authors and abstracts live in the per-repo detail file
+    let cancelled = false;
+    fetch(`${DATA_URL}/repos/${name}.json`)
+      .then(response => response.json())
+      .then(repoDetail => {
+        if (!cancelled) setDetail(repoDetail);
+      })
+      .catch(error => console.error(`Error fetching details for ${name}:`, error));
+    return () => {
+      cancelled = true;
+    };
+  }, [name]);
+
   const arxivId = extractArXivId(repo.arxiv?.primary_id || repo.arxiv?.primary_url);
-  const paperMetadata = arxivMetadata[arxivId];
+  const paperMetadata = detail?.papers?.[arxivId] || arxivMetadata[arxivId];
 
   return (
     <div className="px-6 py-4 border-t border-gray-100">
@@ -20,14 +37,16 @@ const ExpandedRepoView = ({ repo, name, arxivMetadata }) => {
         <div className="mt-4">
           <h4 className="text-lg font-semibold mb-2">arXiv Paper Details</h4>
           <p className="text-sm text-gray-700 mb-1">Title: {paperMetadata.title}</p>
-          <p className="text-sm text-gray-700 mb-1">Authors: {paperMetadata.authors.join(', ')}</p>
+          <p className="text-sm text-gray-700 mb-1">Authors: {(paperMetadata.authors || []).join(', ')}</p>
           <p className="text-sm text-gray-700 mb-1">Published: {new Date(paperMetadata.published).toLocaleDateString()}</p>
           <p className="text-sm text-gray-700 mb-1">Last Updated: {new Date(paperMetadata.updated).toLocaleDateString()}</p>
-          <p className="text-sm text-gray-700 mb-1">Categories: {paperMetadata.categories.map(cat => cat['@term']).join(', ')}</p>
-          <details className="mt-2">
-            <summary className="text-sm text-blue-600 cursor-pointer">Abstract</summary>
-            <p className="text-sm text-gray-700 mt-1">{paperMetadata.abstract}</p>
-          </details>
+          <p className="text-sm text-gray-700 mb-1">Categories: {(paperMetadata.categories || []).map(cat => cat['@term']).join(', ')}</p>
+          {paperMetadata.abstract && (
+            <details className="mt-2">
+              <summary className="text-sm text-blue-600 cursor-pointer">Abstract</summary>
+              <p className="text-sm text-gray-700 mt-1">{paperMetadata.abstract}</p>
+            </details>
+          )}
         </div>
       )}
     </div>
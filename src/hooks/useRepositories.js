@@ -1,5 +1,8 @@
 import { useState, useEffect } from 'react';
 import { getArxivFieldValue } from '../utils/arxivUtils';
+import { decodeSearchIndex, searchIndexFor } from '../utils/searchIndex';
+
+export const DATA_URL = `${process.env.PUBLIC_URL}/data`;
 
 const useRepositories = () => {
   const [data, setData] = useState(null);
@@ -10,31 +13,63 @@ const useRepositories = () => {
   const [sortDirection, setSortDirection] = useState('desc');
   const [textSearch, setTextSearch] = useState('');
   const [searchConditions, setSearchConditions] = useState([]);
+  const [searchIndex, setSearchIndex] = useState(null);
+  const [repoOrder, setRepoOrder] = useState([]);
+  const [sortKeys, setSortKeys] = useState(null);
 
   useEffect(() => {
-    Promise.all([
-      fetch(`${process.env.PUBLIC_URL}/github_stars.json`).then(response => response.json()),
-      fetch(`${process.env.PUBLIC_URL}/arxiv_metadata.json`).then(response => response.json())
-    ])
-    .then(([jsonData, metadata]) => {
-      setData(jsonData);
-      setArxivMetadata(metadata);
-      const lists = new Set();
-      Object.values(jsonData.repositories).forEach(repo => {
-        (repo.lists || []).forEach(list => lists.add(list));
-      });
-      setAllLists(Array.from(lists).sort());
-    })
-    .catch(error => console.error('Error fetching data:', error));
+    // Render as soon as the first shard (the newest stars) arrives, then stream in the rest
+    let cancelled = false;
+    const loadShards = async () => {
+      const manifest = await fetch(`${DATA_URL}/manifest.json`).then(response => response.json());
+      if (cancelled) return;
+      setAllLists(manifest.lists);
+      fetch(`${DATA_URL}/${manifest.search_index}`)
+        .then(response => response.json())
+        .then(index => {
+          if (!cancelled) setSearchIndex(decodeSearchIndex(index));
+        })
+        .catch(error => console.error('Error fetching search index:', error));
+      fetch(`${DATA_URL}/${manifest.sort_keys}`)
+        .then(response => response.json())
+        .then(keys => {
+          if (!cancelled) setSortKeys(keys);
+        })
+        .catch(error => console.error('Error fetching sort keys:', error));
+      const repositories = {};
+      const papers = {};
+      const order = [];
+      for (const shard of manifest.shards) {
+        const shardData = await fetch(`${DATA_URL}/${shard.path}`).then(response => response.json());
+        if (cancelled) return;
+        shardData.repositories.forEach(([name, repo]) => {
+          repositories[name] = repo;
+          order.push(name);
+        });
+        Object.assign(papers, shardData.papers);
+        setData({ last_updated: manifest.last_updated, repositories: { ...repositories } });
+        setRepoOrder([...order]);
+        setArxivMetadata({ ...papers });
+      }
+    };
+    loadShards().catch(error => console.error('Error fetching data:', error));
+    return () => {
+      cancelled = true;
+    };
   }, []);
 
   useEffect(() => {
     if (data && data.repositories) {
+      // Intersect posting lists from the prebuilt index rather than scanning every repo's text
+      const indexMatches = searchIndex && textSearch !== '' ? searchIndexFor(searchIndex, textSearch) : null;
+      const indexedNames = indexMatches && new Set([...indexMatches].map(ordinal => repoOrder[ordinal]));
       let filtered = Object.entries(data.repositories).filter(([name, repo]) => {
         const matchesTextSearch = 
           textSearch === '' ||
-          name.toLowerCase().includes(textSearch.toLowerCase()) ||
-          (repo.metadata.description && repo.metadata.description.toLowerCase().includes(textSearch.toLowerCase()));
+          (indexedNames ? indexedNames.has(name) : (
+            name.toLowerCase().includes(textSearch.toLowerCase()) ||
+            (repo.metadata.description && repo.metadata.description.toLowerCase().includes(textSearch.toLowerCase()))
+          ));
 
         const matchesAdvancedSearch = searchConditions.every((condition) => {
           const fieldValue = condition.field === 'name' ? name : 
@@ -91,34 +126,46 @@ const useRepositories = () => {
         return matchesTextSearch && matchesAdvancedSearch;
       });
 
-      filtered.sort((a, b) => {
-        const [, repoA] = a;
-        const [, repoB] = b;
-        const direction = sortDirection === 'desc' ? -1 : 1;
+      const sortColumn = sortKeys && sortKeys.fields[sortOption];
+      if (sortColumn) {
+        // Walk the precomputed order instead of comparing parsed dates
+        const matching = new Map(filtered);
+        const order = sortDirection === 'desc' ? [...sortColumn.order].reverse() : sortColumn.order;
+        filtered = [];
+        order.forEach(ordinal => {
+          const name = repoOrder[ordinal];
+          if (matching.has(name)) filtered.push([name, matching.get(name)]);
+        });
+      } else {
+        filtered.sort((a, b) => {
+          const [, repoA] = a;
+          const [, repoB] = b;
+          const direction = sortDirection === 'desc' ? -1 : 1;
 
-        switch (sortOption) {
-          case 'stars':
-            return (repoB.metadata.stars - repoA.metadata.stars) * direction;
-          case 'name':
-            return a[0].localeCompare(b[0]) * direction;
-          case 'updated_at':
-          case 'created_at':
-          case 'pushed_at':
-          case 'starred_at':
-            return (new Date(repoA.metadata[sortOption]) - new Date(repoB.metadata[sortOption])) * direction; // Fixed order
-          case 'arxiv_published':
-          case 'arxiv_updated':
-            const dateA = new Date(getArxivFieldValue(repoA, sortOption, arxivMetadata) || 0);
-            const dateB = new Date(getArxivFieldValue(repoB, sortOption, arxivMetadata) || 0);
-            return (dateA - dateB) * direction; // Fixed order
-          default:
-            return 0;
-        }
-      });
+          switch (sortOption) {
+            case 'stars':
+              return (repoB.metadata.stars - repoA.metadata.stars) * direction;
+            case 'name':
+              return a[0].localeCompare(b[0]) * direction;
+            case 'updated_at':
+            case 'created_at':
+            case 'pushed_at':
+            case 'starred_at':
+              return (new Date(repoA.metadata[sortOption]) - new Date(repoB.metadata[sortOption])) * direction; // Fixed order
+            case 'arxiv_published':
+            case 'arxiv_updated':
+              const dateA = new Date(getArxivFieldValue(repoA, sortOption, arxivMetadata) || 0);
+              const dateB = new Date(getArxivFieldValue(repoB, sortOption, arxivMetadata) || 0);
+              return (dateA - dateB) * direction; // Fixed order
+            default:
+              return 0;
+          }
+        });
+      }
 
       setFilteredRepos(filtered);
     }
-  }, [data, sortOption, sortDirection, textSearch, searchConditions, arxivMetadata]);
+  }, [data, sortOption, sortDirection, textSearch, searchConditions, arxivMetadata, searchIndex, repoOrder, sortKeys]);
 
   const handleSortChange = (option) => {
     if (option === sortOption) {
@@ -137,7 +184,7 @@ const useRepositories = () => {
     data,
     filteredRepos,
     allLists,
-    allCategories: [...new Set(Object.values(arxivMetadata).flatMap(paper => paper.categories))],
+    allCategories: [...new Set(Object.values(arxivMetadata).flatMap(paper => paper.categories || []))],
     handleSortChange,
     toggleSortDirection,
     arxivMetadata,
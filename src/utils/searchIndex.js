@@ -0,0 +1,38 @@
+// Client side of the inverted index built by search_index.py; tokenization must match its TOKEN_PATTERN
+export const tokenize = (text) => (text ? text.toLowerCase().match(/[\p{L}\p{N}]+/gu) || [] : []);
+
+export const decodeSearchIndex = ({ terms, postings }) => ({
+  terms,
+  postings: postings.map(deltas => {
+    let ordinal = 0;
+    return deltas.map(delta => (ordinal += delta));
+  }),
+});
+
+const lowerBound = (terms, token) => {
+  let low = 0;
+  let high = terms.length;
+  while (low < high) {
+    const mid = (low + high) >> 1;
+    if (terms[mid] < token) {
+      low = mid + 1;
+    } else {
+      high = mid;
+    }
+  }
+  return low;
+};
+
+// Ordinals of repos matching every query token as a term prefix, or null if the query has no tokens
+export const searchIndexFor = (index, query) => {
+  let result = null;
+  for (const token of tokenize(query)) {
+    const matches = new Set();
+    for (let i = lowerBound(index.terms, token); i < index.terms.length && index.terms[i].startsWith(token); i++) {
+      index.postings[i].forEach(ordinal => matches.add(ordinal));
+    }
+    result = result === null ? matches : new Set([...result].filter(ordinal => matches.has(ordinal)));
+    if (result.size === 0) break;
+  }
+  return result;
+};
@@ -0,0 +1,306 @@
+import argparse
+import hashlib
+import os
+import sqlite3
+import threading
+from loguru import logger
+
+from serialization import dumps, loads, load_json, save_json
+
+STARS_FILE = 'github_stars.json'
+STARS_DB = os.environ.get('STARS_DB', 'github_stars.db')
+STARS_BACKEND = os.environ.get('STARS_BACKEND', 'json')  # 'json' or 'sqlite'
+STARS_JOURNAL = os.environ.get('STARS_JOURNAL', 'github_stars.journal.jsonl')
+FRONTEND_FILE = os.path.join('public', 'github_stars.json')
+
+SCHEMA_VERSION = 1
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS repos (
+    full_name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    starred_at TEXT,
+    pushed_at TEXT,
+    last_updated TEXT,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS repos_position ON repos (position);
+CREATE INDEX IF NOT EXISTS repos_starred_at ON repos (starred_at);
+CREATE INDEX IF NOT EXISTS repos_last_updated ON repos (last_updated);
+CREATE TABLE IF NOT EXISTS repo_lists (
+    full_name TEXT NOT NULL REFERENCES repos (full_name) ON DELETE CASCADE,
+    list_name TEXT NOT NULL,
+    PRIMARY KEY (full_name, list_name)
+);
+CREATE INDEX IF NOT EXISTS repo_lists_list_name ON repo_lists (list_name);
+CREATE TABLE IF NOT EXISTS arxiv_links (
+    full_name TEXT NOT NULL REFERENCES repos (full_name) ON DELETE CASCADE,
+    arxiv_id TEXT NOT NULL,
+    is_primary INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (full_name, arxiv_id)
+);
+CREATE INDEX IF NOT EXISTS arxiv_links_arxiv_id ON arxiv_links (arxiv_id);
+CREATE TABLE IF NOT EXISTS exports (
+    path TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL
+);
+"""
+
+def empty_data():
+    return {"last_updated": None, "repositories": {}}
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class JSONStore:
+    """The original store: the whole dataset as one JSON file, rewritten atomically on save."""
+
+    def __init__(self, path=STARS_FILE):
+        self.path = path
+
+    def load(self, default=None):
+        if os.path.exists(self.path):
+            return load_json(self.path)
+        return default if default is not None else empty_data()
+
+    def save(self, data):
+        save_json(data, self.path)
+
+    def export(self, path=None):
+        path = path or self.path
+        if os.path.abspath(path) != os.path.abspath(self.path):
+            save_json(self.load(), path)
+        return path
+
+class SQLiteStore:
+    """
+    Repository store backed by SQLite, with indexed tables for repos, star lists and arXiv links.
+
+    `load`/`save` take and return the same dict as JSONStore, so callers don't
+    change; `save` compares each record against what was last loaded or saved
+    and upserts only the repos that changed, in a single transaction. The JSON
+    file stays the interchange format: it is imported when the database is new
+    or the file was changed outside the store (a git pull, a JSON-backend
+    script), and `export` writes it back out for git and the frontend.
+    """
+
+    def __init__(self, db_path=STARS_DB, json_path=STARS_FILE):
+        self.db_path = db_path
+        self.json_path = json_path
+        self._conn = None
+        self._lock = threading.RLock()
+        self._snapshot = None  # full_name -> serialized record, as last seen in the database
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+            self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _exported_sha(self, path):
+        row = self.conn.execute("SELECT sha256 FROM exports WHERE path = ?", (os.path.abspath(path),)).fetchone()
+        return row[0] if row else None
+
+    def _record_export(self, path):
+        self.conn.execute(
+            "INSERT INTO exports (path, sha256) VALUES (?, ?) "
+            "ON CONFLICT (path) DO UPDATE SET sha256 = excluded.sha256",
+            (os.path.abspath(path), file_sha256(path))
+        )
+
+    def _sync_from_json(self):
+        """Import the JSON file if it differs from what this database last imported or exported."""
+        if not self.json_path or not os.path.exists(self.json_path):
+            return
+        if file_sha256(self.json_path) == self._exported_sha(self.json_path):
+            return
+        logger.info(f"Importing {self.json_path} into {self.db_path}")
+        self.save(load_json(self.json_path), replace=True)
+        with self.conn:
+            self._record_export(self.json_path)
+
+    def _load_snapshot(self):
+        return {name: record for name, record in self.conn.execute("SELECT full_name, record FROM repos")}
+
+    def load(self, default=None):
+        with self._lock:
+            self._sync_from_json()
+            rows = self.conn.execute("SELECT full_name, record FROM repos ORDER BY position, rowid").fetchall()
+            meta = self.conn.execute("SELECT key, value FROM meta").fetchall()
+            self._snapshot = dict(rows)
+        if not rows and not meta:
+            return default if default is not None else empty_data()
+        data = {key: loads(value) for key, value in meta}
+        data['repositories'] = {name: loads(record) for name, record in rows}
+        return data
+
+    def save(self, data, replace=False):
+        """Upsert every repo whose record changed since the last load/save, and delete removed ones."""
+        with self._lock:
+            snapshot = {} if replace else (self._snapshot if self._snapshot is not None else self._load_snapshot())
+            repositories = data.get('repositories', {})
+
+            changed = []
+            serialized = {}
+            for position, (name, repo_data) in enumerate(repositories.items()):
+                record = dumps(repo_data, compact=True).decode('utf-8')
+                serialized[name] = record
+                if snapshot.get(name) != record:
+                    changed.append((position, name, repo_data, record))
+            removed = [name for name in snapshot if name not in repositories]
+
+            with self.conn:
+                if replace:
+                    self.conn.execute("DELETE FROM repos")
+                self.conn.execute("DELETE FROM meta")
+                self.conn.executemany(
+                    "INSERT INTO meta (key, value) VALUES (?, ?)",
+                    [(key, dumps(value, compact=True).decode('utf-8')) for key, value in data.items() if key != 'repositories']
+                )
+                self.conn.executemany("DELETE FROM repos WHERE full_name = ?", [(name,) for name in removed])
+                for position, name, repo_data, record in changed:
+                    self._upsert(position, name, repo_data, record)
+            self._snapshot = serialized
+        if changed or removed:
+            logger.debug(f"Upserted {len(changed)} and removed {len(removed)} repositories in {self.db_path}")
+
+    def _upsert(self, position, name, repo_data, record):
+        metadata = repo_data.get('metadata', {})
+        self.conn.execute(
+            "INSERT INTO repos (full_name, position, starred_at, pushed_at, last_updated, record) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (full_name) DO UPDATE SET position = excluded.position, "
+            "starred_at = excluded.starred_at, pushed_at = excluded.pushed_at, "
+            "last_updated = excluded.last_updated, record = excluded.record",
+            (name, position, metadata.get('starred_at'), metadata.get('pushed_at'),
+             repo_data.get('last_updated'), record)
+        )
+        self.conn.execute("DELETE FROM repo_lists WHERE full_name = ?", (name,))
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO repo_lists (full_name, list_name) VALUES (?, ?)",
+            [(name, list_name) for list_name in repo_data.get('lists', [])]
+        )
+        arxiv = repo_data.get('arxiv') or {}
+        self.conn.execute("DELETE FROM arxiv_links WHERE full_name = ?", (name,))
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO arxiv_links (full_name, arxiv_id, is_primary) VALUES (?, ?, ?)",
+            [(name, arxiv_id, int(arxiv_id == arxiv.get('primary_id'))) for arxiv_id in arxiv.get('ids', [])]
+        )
+
+    def repos_in_list(self, list_name):
+        rows = self.conn.execute(
+            "SELECT l.full_name FROM repo_lists l JOIN repos r USING (full_name) "
+            "WHERE l.list_name = ? ORDER BY r.position, r.rowid", (list_name,)
+        )
+        return [name for (name,) in rows]
+
+    def repos_citing(self, arxiv_id):
+        rows = self.conn.execute(
+            "SELECT a.full_name FROM arxiv_links a JOIN repos r USING (full_name) "
+            "WHERE a.arxiv_id = ? ORDER BY r.position, r.rowid", (arxiv_id,)
+        )
+        return [name for (name,) in rows]
+
+    def arxiv_ids(self):
+        return [arxiv_id for (arxiv_id,) in self.conn.execute("SELECT DISTINCT arxiv_id FROM arxiv_links ORDER BY arxiv_id")]
+
+    def export(self, path=None):
+        """Write the store out as JSON, in the same format as JSONStore."""
+        path = path or self.json_path
+        save_json(self.load(), path)
+        if os.path.abspath(path) == os.path.abspath(self.json_path):
+            # Remember what we wrote, so loading doesn't re-import our own export
+            with self.conn:
+                self._record_export(path)
+        return path
+
+class Journal:
+    """
+    Append-only JSONL log of repo records completed since the last save.
+
+    Each line is one finished repo, flushed as soon as it is written, so a run
+    that dies mid-chunk loses at most the repo in flight. `replay` applies the
+    entries on top of freshly loaded data; `clear` compacts the journal once its
+    records have been saved to the store.
+    """
+
+    def __init__(self, path=STARS_JOURNAL):
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+
+    def append(self, full_name, record):
+        line = dumps({'full_name': full_name, 'record': record}, compact=True).decode('utf-8')
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a')
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def replay(self, data):
+        """
+        Apply journaled records to `data` in place; returns how many were replayed.
+
+        A crash mid-write leaves a partial last line. It is truncated away here,
+        before anything else is appended, so the next run's first entry starts
+        on a line of its own instead of being glued onto the broken one.
+        """
+        if not os.path.exists(self.path):
+            return 0
+        replayed = intact = 0
+        with open(self.path, 'rb+') as f:
+            for line in f:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError("missing newline")
+                    entry = loads(line)
+                except ValueError:
+                    logger.warning(f"Truncating a partial entry at the end of {self.path}")
+                    f.truncate(intact)
+                    break
+                data['repositories'][entry['full_name']] = entry['record']
+                intact += len(line)
+                replayed += 1
+        return replayed
+
+    def clear(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+def get_store(backend=None):
+    backend = backend or STARS_BACKEND
+    if backend == 'sqlite':
+        return SQLiteStore()
+    if backend == 'json':
+        return JSONStore()
+    raise ValueError(f"Unknown STARS_BACKEND: {backend!r}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the repository store as JSON.")
+    parser.add_argument('path', nargs='?', default=FRONTEND_FILE, help=f"Output file (default: {FRONTEND_FILE})")
+    args = parser.parse_args()
+    path = get_store().export(args.path)
+    logger.info(f"Exported repositories to {path}")
+
+if __name__ == "__main__":
+    main()
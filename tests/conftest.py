@@ -0,0 +1,14 @@
+import sys
+from pathlib import Path
+import pytest
+
+# Add the parent directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import rate_governor
+
+@pytest.fixture(autouse=True)
+def isolated_rate_governor(tmp_path, monkeypatch):
+    """Keep the shared governor's state out of the real temp dir, where concurrent runs and scrapes would see it."""
+    monkeypatch.setattr(rate_governor.governor, 'path', str(tmp_path / 'github_rate_governor.json'))
+    return rate_governor.governor
@@ -0,0 +1,99 @@
+"""
+Local stand-in for the GitHub GraphQL API, used by the tests.
+
+It understands the aliased `repository(owner:, name:)` queries built by
+`github_graphql.build_batch_query` and answers them from an in-memory dict of
+repositories, returning NOT_FOUND errors for anything it doesn't know about.
+"""
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPOSITORY_ALIAS = re.compile(r'(r\d+): repository\(owner: ("(?:[^"\\]|\\.)*"), name: ("(?:[^"\\]|\\.)*")\)')
+README_ALIAS = re.compile(r'(readme\d+): object\(expression: ("(?:[^"\\]|\\.)*")\)')
+
+def make_repository(full_name, readme=None, readme_name="README.md", **overrides):
+    """Build a repository fixture: GraphQL fields plus the files it contains."""
+    owner, name = full_name.split('/', 1)
+    node = {
+        'databaseId': abs(hash(full_name)) % 10**8,
+        'name': name,
+        'nameWithOwner': full_name,
+        'description': f"Description of {name}",
+        'url': f"https://github.com/{full_name}",
+        'homepageUrl': None,
+        'primaryLanguage': {'name': 'Python'},
+        'stargazerCount': 42,
+        'forkCount': 7,
+        'issues': {'totalCount': 3},
+        'pullRequests': {'totalCount': 1},
+        'createdAt': "2020-01-01T00:00:00Z",
+        'updatedAt': "2021-01-01T00:00:00Z",
+        'pushedAt': "2021-01-02T00:00:00Z",
+    }
+    node.update(overrides)
+    files = {readme_name: readme} if readme is not None else {}
+    return {'node': node, 'files': files}
+
+class FakeGitHubGraphQL:
+    def __init__(self, repositories):
+        self.repositories = repositories
+        self.requests = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/graphql"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def resolve(self, query):
+        readme_paths = {alias: json.loads(expr).split(':', 1)[1] for alias, expr in README_ALIAS.findall(query)}
+        data, errors = {}, []
+        for alias, owner, name in REPOSITORY_ALIAS.findall(query):
+            full_name = f"{json.loads(owner)}/{json.loads(name)}"
+            repo = self.repositories.get(full_name)
+            if repo is None:
+                data[alias] = None
+                errors.append({
+                    'type': 'NOT_FOUND',
+                    'path': [alias],
+                    'message': f"Could not resolve to a Repository with the name '{full_name}'."
+                })
+                continue
+            node = dict(repo['node'])
+            for readme_alias, path in readme_paths.items():
+                text = repo['files'].get(path)
+                node[readme_alias] = {'text': text} if text is not None else None
+            data[alias] = node
+        data['rateLimit'] = {'cost': 1, 'remaining': 4999, 'resetAt': "2030-01-01T00:00:00Z"}
+        payload = {'data': data}
+        if errors:
+            payload['errors'] = errors
+        return payload
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                fake.requests.append(body)
+                response = json.dumps(fake.resolve(body['query'])).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(response)))
+                self.send_header('X-RateLimit-Remaining', '4999')
+                self.send_header('X-RateLimit-Reset', '1893456000')
+                self.end_headers()
+                self.wfile.write(response)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
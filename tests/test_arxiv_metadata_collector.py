@@ -0,0 +1,156 @@
+import sys
+import threading
+import types
+from datetime import datetime, timedelta, UTC
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add the parent directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# The collector only needs arxiv.Client and arxiv.Search; stand in for the package where it isn't installed
+arxiv_stub = types.ModuleType('arxiv')
+arxiv_stub.Client = lambda **kwargs: None
+arxiv_stub.Search = lambda id_list, max_results: SimpleNamespace(id_list=id_list, max_results=max_results)
+sys.modules.setdefault('arxiv', arxiv_stub)
+
+import arxiv_metadata_collector
+from arxiv_metadata_collector import (
+    ArxivFetcher, pack_id_batches, process_arxiv_ids, ARXIV_MAX_RESULTS, ARXIV_ID_LIST_MAX_CHARS
+)
+from negative_cache import NegativeCache
+
+PUBLISHED = datetime(2021, 4, 17, tzinfo=UTC)
+
+def make_result(arxiv_id):
+    return SimpleNamespace(
+        entry_id=f"http://arxiv.org/abs/{arxiv_id}v1", title=f"Paper {arxiv_id}",
+        authors=[SimpleNamespace(name='A. Author')], summary='Abstract', categories=['cs.LG'],
+        published=PUBLISHED, updated=PUBLISHED, doi=None, comment=None, journal_ref=None,
+        primary_category='cs.LG', get_short_id=lambda: f"{arxiv_id}v1",
+    )
+
+class FakeArxivClient:
+    """Answers every ID in a search except `missing`, recording each id_list it was sent; calls numbered in `fail_on` raise."""
+
+    def __init__(self, missing=(), fail_on=()):
+        self.missing = set(missing)
+        self.fail_on = set(fail_on)
+        self.searches = []
+        self._lock = threading.Lock()
+
+    def results(self, search):
+        with self._lock:
+            self.searches.append(search.id_list)
+            call = len(self.searches)
+        if call in self.fail_on:
+            raise RuntimeError("arXiv API unavailable")
+        return (make_result(arxiv_id) for arxiv_id in search.id_list if arxiv_id not in self.missing)
+
+def arxiv_ids(count):
+    return [f"2104.{i:05d}" for i in range(count)]
+
+def join_fetcher_threads():
+    for thread in threading.enumerate():
+        if thread.name == 'arxiv-fetcher':
+            thread.join(timeout=5)
+            assert not thread.is_alive()
+
+def test_batches_respect_the_result_limit():
+    ids = arxiv_ids(4500)
+    batches = pack_id_batches(ids, max_chars=float('inf'))
+    assert [len(batch) for batch in batches] == [ARXIV_MAX_RESULTS, ARXIV_MAX_RESULTS, 500]
+    assert sum(batches, []) == ids
+
+def test_batches_respect_the_id_list_length_limit():
+    ids = arxiv_ids(1200)
+    batches = pack_id_batches(ids)
+    # Each ID costs its length plus an encoded comma
+    sizes = [sum(len(arxiv_id) + 3 for arxiv_id in batch) for batch in batches]
+    assert all(size <= ARXIV_ID_LIST_MAX_CHARS for size in sizes)
+    # Packed as full as the limit allows
+    assert len(batches) == 3 and sizes[0] + len(batches[1][0]) + 3 > ARXIV_ID_LIST_MAX_CHARS
+    assert sum(batches, []) == ids
+    assert pack_id_batches([]) == []
+
+def test_fetch_yields_batches_in_order():
+    ids = arxiv_ids(1200)
+    client = FakeArxivClient(missing={ids[5], ids[700]})
+    fetched = list(ArxivFetcher(client=client, prefetch=1).fetch(ids))
+
+    assert [batch for batch, _ in fetched] == client.searches == pack_id_batches(ids)
+    for batch, metadata in fetched:
+        assert list(metadata) == [arxiv_id for arxiv_id in batch if arxiv_id not in client.missing]
+    assert fetched[0][1][ids[0]]['id'] == f"http://arxiv.org/abs/{ids[0]}v1"
+    join_fetcher_threads()
+
+def test_a_failed_batch_is_retried_in_halves():
+    ids = arxiv_ids(1200)
+    first, second, third = pack_id_batches(ids)
+    client = FakeArxivClient(fail_on={2})
+    fetched = list(ArxivFetcher(client=client).fetch(ids))
+
+    half = (len(second) + 1) // 2
+    halves = [second[:half], second[half:]]
+    assert client.searches == [first, second, *halves, third]
+    assert [batch for batch, _ in fetched] == [first, *halves, third]
+    assert all(len(metadata) == len(batch) for batch, metadata in fetched)
+    join_fetcher_threads()
+
+def test_a_half_that_fails_again_is_skipped():
+    ids = arxiv_ids(1200)
+    first, second, third = pack_id_batches(ids)
+    client = FakeArxivClient(fail_on={2, 3})
+    fetched = list(ArxivFetcher(client=client).fetch(ids))
+
+    half = (len(second) + 1) // 2
+    # The run carries on past the failure, without the IDs that couldn't be fetched
+    assert [batch for batch, _ in fetched] == [first, second[half:], third]
+    join_fetcher_threads()
+
+def test_producer_stops_when_the_consumer_does():
+    ids = arxiv_ids(5000)  # Eleven batches
+    client = FakeArxivClient()
+    fetch = ArxivFetcher(client=client, prefetch=1).fetch(ids)
+    next(fetch)
+    fetch.close()
+
+    join_fetcher_threads()
+    # One batch consumed, one queued and at most one more in hand when the producer was told to stop
+    assert len(client.searches) <= 3
+
+class FakeFetcher:
+    """Yields one batch per fetch, answering every requested ID except `missing`."""
+
+    def __init__(self, missing=()):
+        self.missing = set(missing)
+        self.requested = []
+
+    def fetch(self, arxiv_ids):
+        self.requested.extend(arxiv_ids)
+        yield arxiv_ids, {arxiv_id: {'title': f"Paper {arxiv_id}"} for arxiv_id in arxiv_ids if arxiv_id not in self.missing}
+
+def test_process_arxiv_ids_skips_and_records_misses(tmp_path):
+    cache_path = str(tmp_path / 'arxiv_negative_cache.json')
+    seeded = NegativeCache(cache_path, ttl_days=7)
+    seeded.record_miss('2104.00004')  # Missed just now: not retried yet
+    seeded.record_miss('2104.00005', datetime.now(UTC) - timedelta(days=30))  # Due for a retry
+    seeded.save()
+
+    existing_data = {'papers': {'2104.00001': {'title': 'Known'}}}
+    fetcher = FakeFetcher(missing={'2104.00003'})
+    negative_cache = NegativeCache(cache_path, ttl_days=7)
+    with patch.object(arxiv_metadata_collector, 'ARXIV_METADATA_FILE', str(tmp_path / 'arxiv_metadata.json')), \
+         patch.object(arxiv_metadata_collector, 'commit_and_push'):
+        process_arxiv_ids(['2104.00001v2', 'arXiv:2104.00002', '2104.00003', '2104.00004', '2104.00005'],
+                          existing_data, fetcher=fetcher, negative_cache=negative_cache)
+
+    # Known papers and recent misses never reach arXiv
+    assert fetcher.requested == ['2104.00002', '2104.00003', '2104.00005']
+    assert set(existing_data['papers']) == {'2104.00001', '2104.00002', '2104.00005'}
+    # The new miss is recorded and the old one, now resolved, dropped; both persisted
+    entries = NegativeCache(cache_path).entries
+    assert set(entries) == {'2104.00003', '2104.00004'}
+    assert entries['2104.00003']['misses'] == 1
+    assert (negative_cache.hits, negative_cache.expired, negative_cache.misses, negative_cache.resolved) == (1, 1, 1, 1)
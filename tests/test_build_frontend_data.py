@@ -0,0 +1,88 @@
+import json
+import sys
+from pathlib import Path
+
+# Add the parent directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from build_frontend_data import build_frontend_data, build_shards, build_sort_keys
+from search_index import search
+
+def make_repo(i, arxiv_ids=()):
+    return {
+        'lists': ['ml'] if i % 2 else ['tools'],
+        'metadata': {'full_name': f"owner/repo{i}", 'description': "x" * 200, 'starred_at': f"2024-01-{i + 1:02d}T00:00:00Z"},
+        'last_updated': "2024-02-01T00:00:00+00:00",
+        'arxiv': {'ids': list(arxiv_ids), 'primary_id': arxiv_ids[0] if arxiv_ids else None,
+                  'bibtex_citations': ["@article{x, title={A long citation}}"]},
+    }
+
+def test_build_shards_respects_byte_bounds():
+    rows = [(f"owner/repo{i}", {'description': "x" * 100}, {}) for i in range(50)]
+    shards = build_shards(rows, first_max_bytes=300, max_bytes=1000)
+    assert [name for shard in shards for name, _ in shard['repositories']] == [name for name, _, _ in rows]
+    assert len(json.dumps(shards[0]['repositories'], separators=(',', ':'))) <= 300
+    assert all(len(json.dumps(shard['repositories'], separators=(',', ':'))) <= 1000 for shard in shards)
+
+    oversized = [("owner/huge", {'description': "x" * 5000}, {})] + rows[:2]
+    assert [len(shard['repositories']) for shard in build_shards(oversized, 300, 1000)] == [1, 2]
+
+def test_build_frontend_data(tmp_path):
+    data = {
+        'last_updated': "2024-02-01T00:00:00+00:00",
+        'repositories': {f"owner/repo{i}": make_repo(i, ['2401.00001'] if i == 3 else ()) for i in range(20)},
+    }
+    papers = {'2401.00001': {'title': "A paper", 'abstract': "Long abstract", 'authors': ["A"], 'categories': ["cs.LG"]}}
+    out = tmp_path / 'data'
+    (out / 'stale').mkdir(parents=True)
+
+    manifest = build_frontend_data(data, papers, str(out))
+
+    assert not (out / 'stale').exists()
+    assert json.loads((out / 'manifest.json').read_text()) == manifest
+    assert manifest['total'] == 20
+    assert manifest['lists'] == ['ml', 'tools']
+    assert sum(shard['count'] for shard in manifest['shards']) == 20
+
+    names, shard_papers = [], {}
+    for shard in manifest['shards']:
+        content = json.loads((out / shard['path']).read_text())
+        names.extend(name for name, _ in content['repositories'])
+        shard_papers.update(content['papers'])
+        assert all('bibtex_citations' not in repo['arxiv'] for _, repo in content['repositories'])
+    assert names == [f"owner/repo{i}" for i in reversed(range(20))]  # Newest star first
+    assert shard_papers == {'2401.00001': {'title': "A paper", 'categories': ["cs.LG"]}}
+
+    # Search index ordinals are positions in shard order
+    index = json.loads((out / manifest['search_index']).read_text())
+    assert [names[ordinal] for ordinal in sorted(search(index, "repo3"))] == ["owner/repo3"]
+    assert [names[ordinal] for ordinal in sorted(search(index, "paper"))] == ["owner/repo3"]
+
+    sort_keys = json.loads((out / manifest['sort_keys']).read_text())
+    assert [names[ordinal] for ordinal in sort_keys['fields']['starred_at']['order']] == list(reversed(names))
+
+    assert json.loads((out / manifest['papers']).read_text()) == papers
+
+    detail = json.loads((out / 'repos' / 'owner' / 'repo3.json').read_text())
+    assert detail['arxiv']['bibtex_citations']
+    assert detail['papers']['2401.00001']['abstract'] == "Long abstract"
+
+def test_build_sort_keys():
+    def row(name, stars, pushed_at, primary_id=None, published=None):
+        summary = {'metadata': {'stars': stars, 'pushed_at': pushed_at}, 'arxiv': {'ids': [], 'primary_id': primary_id}}
+        papers = {primary_id: {'published': published}} if primary_id else {}
+        return name, summary, papers
+
+    rows = [
+        row("a/a", 5, "2024-01-02T00:00:00Z"),
+        row("b/b", 50, None, '2401.00001', "2024-01-01T00:00:00+00:00"),
+        row("c/c", 5, "2023-01-01T00:00:00Z", '2301.00001', "2023-01-01T00:00:00+00:00"),
+    ]
+    keys = build_sort_keys(rows)
+    fields = keys['fields']
+    assert keys['total'] == 3
+    assert set(fields) == {'stars', 'created_at', 'updated_at', 'pushed_at', 'starred_at', 'arxiv_published', 'arxiv_updated'}
+    assert fields['stars'] == {'values': [5, 50, 5], 'order': [0, 2, 1]}  # Ties keep shard order
+    assert fields['pushed_at']['values'] == [1704153600, None, 1672531200]
+    assert fields['pushed_at']['order'] == [1, 2, 0]  # Unknown values first
+    assert fields['arxiv_published']['order'] == [0, 2, 1]
@@ -0,0 +1,81 @@
+import sys
+from datetime import datetime, timedelta, UTC
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Add the parent directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from citation_refresh import refresh_citations, select_stale, semantic_scholar_id
+from semantic_scholar import AIMDPacer, SemanticScholarClient
+
+NOW = datetime(2025, 6, 1, tzinfo=UTC)
+
+def fetched(days_ago, count, growth=None, **extra):
+    paper = {'citation_count': count, 'fetched_at': (NOW - timedelta(days=days_ago)).isoformat(), **extra}
+    if growth is not None:
+        paper['citation_growth'] = growth
+    return paper
+
+def test_semantic_scholar_id_prefers_paper_id():
+    assert semantic_scholar_id('arxiv:2104.08653', {}) == 'arXiv:2104.08653'
+    assert semantic_scholar_id('doi:10.1/x', {'paperId': 'abc'}) == 'abc'
+    assert semantic_scholar_id('title:Some Title', {}) is None
+
+def test_select_stale_ranks_by_age_and_growth():
+    papers = {
+        'arxiv:fresh': fetched(0.5, 10, growth=100),
+        'arxiv:old-quiet': fetched(60, 10, growth=0),
+        'arxiv:recent-hot': fetched(5, 500, growth=10),
+        'arxiv:unstamped': {'citation_count': 3},
+        'title:no-id': {'citation_count': 1},
+    }
+    assert select_stale(papers, 10, NOW) == ['arxiv:unstamped', 'arxiv:recent-hot', 'arxiv:old-quiet']
+    assert select_stale(papers, 1, NOW) == ['arxiv:unstamped']
+
+def test_refresh_stays_within_budget_and_tracks_growth():
+    papers = {f"arxiv:{i}": fetched(10 + i, 100) for i in range(5)}
+    session = MagicMock()
+    session.post.side_effect = lambda url, params=None, json=None, **kwargs: MagicMock(
+        status_code=200, json=MagicMock(return_value=[{'paperId': f"s2-{i}", 'citationCount': 120} for i in json['ids']]))
+    client = SemanticScholarClient(session=session, batch_size=2, pacer=AIMDPacer(interval=0, min_interval=0))
+
+    refreshed = refresh_citations(papers, budget=1, client=client, now=NOW)
+
+    assert session.post.call_count == 1
+    assert sorted(refreshed) == ['arxiv:3', 'arxiv:4']  # The two stalest
+    assert papers['arxiv:4']['citation_count'] == 120
+    assert papers['arxiv:4']['citation_growth'] == round(20 / 14, 4)
+    assert papers['arxiv:4']['fetched_at'] == NOW.isoformat()
+    assert papers['arxiv:4']['paperId'] == 's2-arXiv:4'
+    assert papers['arxiv:0']['citation_count'] == 100
+
+def test_papers_missing_from_the_response_keep_their_counts_and_drop_back():
+    papers = {'arxiv:1': fetched(30, 7), 'arxiv:2': {'citation_count': 3}}
+    session = MagicMock()
+    session.post.return_value = MagicMock(status_code=200, json=MagicMock(return_value=[None, None]))
+    client = SemanticScholarClient(session=session, pacer=AIMDPacer(interval=0, min_interval=0))
+    assert sorted(refresh_citations(papers, budget=1, client=client, now=NOW)) == ['arxiv:1', 'arxiv:2']
+    assert papers['arxiv:1'] == dict(fetched(30, 7), refresh_failed_at=NOW.isoformat())
+    assert papers['arxiv:2']['refresh_failed_at'] == NOW.isoformat()
+    # Neither heads the queue again until it is due like any other paper
+    assert select_stale(papers, 10, NOW) == []
+    assert sorted(select_stale(papers, 10, NOW + timedelta(days=2))) == ['arxiv:1', 'arxiv:2']
+
+def test_retries_count_against_the_budget():
+    papers = {f"arxiv:{i}": fetched(10 + i, 100) for i in range(4)}
+    responses = [MagicMock(status_code=429, headers={'Retry-After': '0'}),
+                 MagicMock(status_code=200, json=MagicMock(return_value=[{'citationCount': 101}] * 2))]
+    session = MagicMock()
+    session.post.side_effect = responses
+    client = SemanticScholarClient(session=session, batch_size=2, max_in_flight=1,
+                                   pacer=AIMDPacer(interval=0, min_interval=0, max_interval=0))
+
+    refreshed = refresh_citations(papers, budget=2, client=client, now=NOW)
+
+    # The throttled batch goes to the back of the queue and the budget runs out before it is retried
+    assert session.post.call_count == 2
+    assert sorted(refreshed) == ['arxiv:0', 'arxiv:1']
+    assert sorted(client.unsent_ids) == ['arXiv:2', 'arXiv:3']
+    # Papers never answered aren't stamped as missing
+    assert papers['arxiv:3'] == fetched(13, 100)
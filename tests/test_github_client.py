@@ -0,0 +1,137 @@
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+import pytest
+import requests
+
+# Add the parent directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from github_client import GitHubClient, RateLimiter, get_client, get_session, rate_limit_resource, WEB_RATE_LIMIT_THRESHOLD
+from rate_governor import RateGovernor, RateBudgetExhausted
+
+@pytest.fixture
+def governor(tmp_path):
+    return RateGovernor(path=str(tmp_path / 'rate_state.json'))
+
+def make_response(status_code, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = b'{}'
+    response.headers.update(headers or {})
+    return response
+
+def test_retries_rate_limited_requests_honouring_retry_after(governor):
+    session = MagicMock()
+    session.request.side_effect = [
+        make_response(429, {'Retry-After': '7'}),
+        make_response(200, {'X-RateLimit-Remaining': '4000', 'X-RateLimit-Reset': str(int(time.time()) + 3600)}),
+    ]
+    client = GitHubClient('testtoken', session=session, cache=None, governor=governor)
+    with patch('github_client.time.sleep') as mock_sleep:
+        response = client.get("https://api.github.com/repos/test/repo")
+
+    assert response.status_code == 200
+    mock_sleep.assert_called_once_with(7.0)
+    assert governor.remaining(client.keys['testtoken']) == 4000
+
+def test_permission_403_is_not_retried(governor):
+    session = MagicMock()
+    session.request.return_value = make_response(403, {'X-RateLimit-Remaining': '4000'})
+    client = GitHubClient('testtoken', session=session, cache=None, governor=governor)
+    with patch('github_client.time.sleep') as mock_sleep:
+        assert client.get("https://api.github.com/repos/test/private").status_code == 403
+    assert session.request.call_count == 1
+    mock_sleep.assert_not_called()
+
+def test_exhausted_primary_limit_raises_instead_of_sleeping(governor):
+    session = MagicMock()
+    session.request.return_value = make_response(403, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '1893456000'})
+    client = GitHubClient('testtoken', session=session, cache=None, governor=governor)
+    with patch('github_client.time.sleep') as mock_sleep, pytest.raises(RateBudgetExhausted):
+        client.get("https://api.github.com/repos/test/repo")
+    mock_sleep.assert_not_called()
+
+def test_api_headers_only_sent_to_api(governor):
+    session = MagicMock()
+    session.request.return_value = make_response(200)
+    client = GitHubClient('testtoken', session=session, cache=None, governor=governor)
+
+    client.get("https://api.github.com/rate_limit", headers={'X-Extra': '1'})
+    headers = session.request.call_args[1]['headers']
+    assert headers['Authorization'] == "token testtoken"
+    assert headers['Accept'] == "application/vnd.github.v3+json"
+    assert headers['X-Extra'] == '1'
+
+    client.get("https://github.com/testuser?tab=stars")
+    assert 'Accept' not in session.request.call_args[1]['headers']
+
+def test_rate_limit_resource():
+    assert rate_limit_resource("https://api.github.com/repos/test/repo") == 'core'
+    assert rate_limit_resource("https://api.github.com/graphql") == 'graphql'
+    assert rate_limit_resource("https://api.github.com/search/repositories") == 'search'
+    assert rate_limit_resource("https://api.github.com/rate_limit") is None
+    assert rate_limit_resource("https://github.com/testuser?tab=stars") is None
+
+def test_clients_share_one_pooled_session():
+    assert get_client('token-a') is get_client('token-a')
+    assert get_client('token-a').session is get_client('token-b').session is get_session()
+
+def rate_headers(remaining):
+    return {'X-RateLimit-Remaining': str(remaining), 'X-RateLimit-Reset': str(int(time.time()) + 3600)}
+
+def test_token_pool_routes_to_most_headroom(governor):
+    session = MagicMock()
+    session.request.return_value = make_response(200)
+    client = GitHubClient('token-a,token-b', session=session, cache=None, governor=governor)
+    governor.update(rate_headers(300), client.keys['token-a'])
+    governor.update(rate_headers(4000), client.keys['token-b'])
+
+    client.get("https://api.github.com/repos/test/repo")
+    assert session.request.call_args[1]['headers']['Authorization'] == "token token-b"
+
+def test_token_pool_skips_exhausted_tokens(governor):
+    session = MagicMock()
+    session.request.return_value = make_response(200)
+    client = GitHubClient(['token-a', 'token-b'], session=session, cache=None, governor=governor)
+    governor.update(rate_headers(50), client.keys['token-a'])
+    governor.update(rate_headers(150), client.keys['token-b'])
+
+    with patch('github_client.time.sleep') as mock_sleep:
+        client.get("https://api.github.com/repos/test/repo")
+    mock_sleep.assert_not_called()
+    assert session.request.call_args[1]['headers']['Authorization'] == "token token-b"
+    # Only token-b has budget above the reserve, less the request just sent
+    assert client.can_afford(49)
+    assert not client.can_afford(50)
+
+    governor.update(rate_headers(100), client.keys['token-b'])
+    with pytest.raises(RateBudgetExhausted):
+        client.get("https://api.github.com/repos/test/repo")
+
+def test_token_pool_switches_token_on_exhausted_response(governor):
+    session = MagicMock()
+    session.request.side_effect = [
+        make_response(403, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(int(time.time()) + 3600)}),
+        make_response(200),
+    ]
+    client = GitHubClient(['token-a', 'token-b'], session=session, cache=None, governor=governor)
+    assert client.get("https://api.github.com/repos/test/repo").status_code == 200
+    first, second = [call[1]['headers']['Authorization'] for call in session.request.call_args_list]
+    assert first != second
+
+def test_rate_limiter_gives_concurrent_callers_their_own_slots():
+    limiter = RateLimiter(limit=20, window=1)
+    sleeps = []
+    with patch('github_client.time.time', return_value=limiter.last_updated), \
+         patch('github_client.time.sleep', side_effect=sleeps.append):
+        threads = [threading.Thread(target=limiter.wait_if_needed) for _ in range(15)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    # The first 20 - threshold callers go straight through; each later one waits one interval longer
+    assert len(sleeps) == 15 - (20 - WEB_RATE_LIMIT_THRESHOLD)
+    assert sorted(sleeps) == pytest.approx([n / 20 for n in range(1, len(sleeps) + 1)])
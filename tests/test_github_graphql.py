@@ -0,0 +1,77 @@
+import pytest
+from functools import partial
+from unittest.mock import patch
+import sys
+from pathlib import Path
+
+# Add the parent directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from github_graphql import fetch_repos_graphql, build_batch_query
+from readme_store import ReadmeStore
+from scrape_stars import process_chunk_graphql
+from storage import Journal
+from tests.fake_github import FakeGitHubGraphQL, make_repository
+
+@pytest.fixture
+def fake_github():
+    repositories = {
+        "test/paper": make_repository(
+            "test/paper",
+            readme="See [![arXiv](https://img.shields.io/badge)](https://arxiv.org/abs/2104.08653)",
+            description="Code for arxiv:2104.08653",
+        ),
+        "test/rst": make_repository("test/rst", readme="Docs in rst", readme_name="README.rst", primaryLanguage=None),
+        "test/empty": make_repository("test/empty"),
+    }
+    with FakeGitHubGraphQL(repositories) as server:
+        yield server
+
+def test_build_batch_query_escapes_names():
+    query = build_batch_query(['owner/we"ird'])
+    assert 'r0: repository(owner: "owner", name: "we\\"ird")' in query
+
+def test_fetch_repos_graphql(fake_github):
+    names = ["test/paper", "test/rst", "test/missing", "test/empty"]
+    results = fetch_repos_graphql(names, 'testtoken', url=fake_github.url)
+
+    assert len(fake_github.requests) == 1
+    metadata, readme = results["test/paper"]
+    assert metadata['full_name'] == "test/paper"
+    assert metadata['html_url'] == "https://github.com/test/paper"
+    assert metadata['open_issues_count'] == 4
+    assert metadata['language'] == "Python"
+    assert "2104.08653" in readme
+
+    metadata, readme = results["test/rst"]
+    assert metadata['language'] is None
+    assert readme == "Docs in rst"
+
+    assert results["test/missing"] == (None, '')
+    assert results["test/empty"][1] == ''
+
+def test_process_chunk_graphql(fake_github, tmp_path):
+    chunk = [
+        {"repo": {"full_name": name}, "starred_at": "2022-01-01T00:00:00Z"}
+        for name in ["test/paper", "test/missing", "test/known"]
+    ]
+    existing_data = {"repositories": {"test/known": {"lists": ["a"]}}}
+
+    readme_store = ReadmeStore(str(tmp_path / 'readmes'))
+    with patch('scrape_stars.fetch_repos_graphql', partial(fetch_repos_graphql, url=fake_github.url)), \
+         patch('scrape_stars.readme_store', readme_store), \
+         patch('scrape_stars.journal', Journal(str(tmp_path / 'journal.jsonl'))), \
+         patch('scrape_stars.get_readme_content') as mock_readme:
+        assert process_chunk_graphql(chunk, 'testtoken', existing_data)
+
+    mock_readme.assert_not_called()
+    assert set(existing_data['repositories']) == {"test/known", "test/paper"}
+    record = existing_data['repositories']["test/paper"]
+    assert set(record['metadata']) == {
+        'id', 'name', 'full_name', 'description', 'url', 'homepage', 'language', 'stars',
+        'forks', 'open_issues', 'created_at', 'updated_at', 'pushed_at', 'starred_at'
+    }
+    assert record['metadata']['stars'] == 42
+    assert record['arxiv']['ids'] == ["2104.08653"]
+    assert record['arxiv']['primary_id'] == "2104.08653"
+    assert readme_store.get("test/paper").startswith("See [![arXiv]")
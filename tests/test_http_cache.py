@@ -0,0 +1,96 @@
+import json
+import sys
+from pathlib import Path
+from unittest.mock import patch
+import requests
+
+# Add the parent directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from http_cache import HTTPCache
+
+def make_response(status_code, body=None, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(body).encode('utf-8') if body is not None else b''
+    response.headers.update(headers or {})
+    return response
+
+class FakeGetter:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def __call__(self, url, headers=None):
+        self.calls.append((url, headers))
+        return self.responses.pop(0)
+
+def test_conditional_request_hit(tmp_path):
+    cache = HTTPCache(cache_dir=str(tmp_path))
+    headers = {'Accept': 'application/vnd.github.v3+json'}
+    getter = FakeGetter([
+        make_response(200, {'stars': 1}, {
+            'ETag': '"abc"',
+            'Link': '<https://api.github.com/x?page=2>; rel="next"',
+            'X-RateLimit-Remaining': '4000',
+        }),
+        make_response(304, headers={'ETag': '"abc"', 'X-RateLimit-Remaining': '3999'}),
+    ])
+
+    first = cache.get('https://api.github.com/x', headers=headers, params={'per_page': 100}, getter=getter)
+    second = cache.get('https://api.github.com/x', headers=headers, params={'per_page': 100}, getter=getter)
+
+    assert first.json() == second.json() == {'stars': 1}
+    assert getter.calls[0][0] == 'https://api.github.com/x?per_page=100'
+    assert 'If-None-Match' not in getter.calls[0][1]
+    assert getter.calls[1][1]['If-None-Match'] == '"abc"'
+    assert second.status_code == 200
+    assert second.headers['X-RateLimit-Remaining'] == '3999'
+    assert second.links['next']['url'] == 'https://api.github.com/x?page=2'
+    assert (cache.hits, cache.misses, cache.stores) == (1, 1, 1)
+
+def test_accept_header_is_part_of_key(tmp_path):
+    cache = HTTPCache(cache_dir=str(tmp_path))
+    getter = FakeGetter([
+        make_response(200, {'a': 1}, {'ETag': '"a"'}),
+        make_response(200, {'b': 2}, {'ETag': '"b"'}),
+    ])
+    cache.get('https://api.github.com/x', headers={'Accept': 'a'}, getter=getter)
+    cache.get('https://api.github.com/x', headers={'Accept': 'b'}, getter=getter)
+    assert 'If-None-Match' not in getter.calls[1][1]
+
+def test_uncacheable_responses_are_not_stored(tmp_path):
+    cache = HTTPCache(cache_dir=str(tmp_path))
+    getter = FakeGetter([make_response(200, {'a': 1}), make_response(404, {})])
+    cache.get('https://api.github.com/x', getter=getter)
+    cache.get('https://api.github.com/y', getter=getter)
+    assert cache.stores == 0
+    assert list(tmp_path.iterdir()) == []
+
+def test_size_based_eviction(tmp_path):
+    cache = HTTPCache(cache_dir=str(tmp_path), max_bytes=600)
+    for i in range(5):
+        getter = FakeGetter([make_response(200, {'payload': 'x' * 100}, {'ETag': f'"{i}"'})])
+        cache.get(f'https://api.github.com/repos/{i}', getter=getter)
+
+    remaining = list(tmp_path.glob('*.json'))
+    assert 0 < len(remaining) < 5
+    assert cache.evictions == 5 - len(remaining)
+    assert sum(path.stat().st_size for path in remaining) <= 600
+
+def test_directory_is_scanned_only_when_over_the_cap(tmp_path):
+    cache = HTTPCache(cache_dir=str(tmp_path), max_bytes=10**6)
+    scans = []
+    real_scan = cache._scan
+    with patch.object(cache, '_scan', side_effect=lambda: scans.append(1) or real_scan()):
+        for i in range(50):
+            getter = FakeGetter([make_response(200, {'payload': 'x' * 100}, {'ETag': f'"{i}"'})])
+            cache.get(f'https://api.github.com/repos/{i % 40}', getter=getter)
+        assert len(scans) == 1
+        assert cache.total_bytes == sum(path.stat().st_size for path in tmp_path.glob('*.json'))
+
+        cache.max_bytes = cache.total_bytes // 2
+        getter = FakeGetter([make_response(200, {'payload': 'x' * 100}, {'ETag': '"new"'})])
+        cache.get('https://api.github.com/repos/new', getter=getter)
+        assert len(scans) == 2
+    assert cache.total_bytes == sum(path.stat().st_size for path in tmp_path.glob('*.json')) <= cache.max_bytes
@@ -0,0 +1,119 @@
+import io
+import os
+import sys
+from pathlib import Path
+from unittest.mock import patch
+import pytest
+
+# Add the parent directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import migrations
+from migrations import JSONStream, JSONWriter, Migration, DataFile, migrate_file, file_version
+from build_frontend_data import load_papers
+from serialization import dumps, load_json, save_json
+
+LEGACY_STARS = {
+    'last_updated': "2024-01-01T00:00:00Z",
+    'repositories': {
+        'a/paper': {'lists': [], 'arxiv': {
+            'urls': ["https://arxiv.org/abs/2104.08653", "https://arxiv.org/pdf/2105.14075v2.pdf"],
+            'primary_url': "https://arxiv.org/abs/2104.08653",
+        }},
+        'b/broken': {'lists': ['ü'], 'arxiv': {'urls': ["https://example.com/not-a-paper", None], 'primary_url': None}},
+        'c/plain': {'lists': [], 'metadata': {'stars': 12345678901234}},
+    },
+}
+
+@pytest.mark.parametrize('compact', [True, False])
+def test_writer_matches_dumps(compact):
+    out = io.BytesIO()
+    writer = JSONWriter(out, compact)
+    writer.open_object()
+    writer.member('last_updated', LEGACY_STARS['last_updated'])
+    writer.open_object('repositories')
+    for name, repo in LEGACY_STARS['repositories'].items():
+        writer.member(name, repo)
+    writer.close_object()
+    writer.open_object('empty')
+    writer.close_object()
+    writer.close_object()
+    assert out.getvalue() == dumps(dict(LEGACY_STARS, empty={}), compact)
+    assert writer.offset == len(out.getvalue())
+
+def test_stream_reads_across_small_chunks():
+    payload = dumps(LEGACY_STARS, compact=False)
+    reader = JSONStream(io.BytesIO(payload), chunk_size=7)
+    reader.expect('{')
+    seen = {}
+    for key in reader.members():
+        if key == 'repositories':
+            reader.expect('{')
+            seen[key] = {name: reader.value() for name in reader.members()}
+        else:
+            seen[key] = reader.value()
+    assert seen == LEGACY_STARS
+
+def test_stars_migration_is_versioned_tolerant_and_idempotent(tmp_path):
+    path = tmp_path / 'github_stars.json'
+    save_json(LEGACY_STARS, str(path))
+
+    assert migrate_file(str(path))
+    data = load_json(str(path))
+    assert list(data) == ['schema_version', 'last_updated', 'repositories']
+    assert data['schema_version'] == 1
+    assert data['repositories']['a/paper']['arxiv'] == {'ids': ['2104.08653', '2105.14075'], 'primary_id': '2104.08653'}
+    assert data['repositories']['b/broken']['arxiv'] == {'ids': []}
+    assert data['repositories']['c/plain'] == LEGACY_STARS['repositories']['c/plain']
+    assert path.read_bytes() == dumps(data)
+
+    before = path.read_bytes()
+    assert not migrate_file(str(path))
+    assert path.read_bytes() == before
+    assert sorted(os.listdir(tmp_path)) == ['github_stars.json']
+
+def test_flat_arxiv_metadata_is_wrapped_with_its_version(tmp_path):
+    path = tmp_path / 'arxiv_metadata.json'
+    save_json({
+        '2104.08653': {'title': "A", 'categories': [{'@term': 'cs.LG', '@scheme': 'x'}, 'cs.CV']},
+        '2105.14075': {'title': "B", 'categories': ['stat.ML']},
+    }, str(path))
+
+    assert file_version(str(path)) is None
+    assert migrate_file(str(path))
+    assert file_version(str(path)) == 1
+    papers = load_papers(str(path))
+    assert papers['2104.08653']['categories'] == ['cs.LG', 'cs.CV']
+    assert papers['2105.14075']['categories'] == ['stat.ML']
+
+@pytest.mark.parametrize('records_key,flat', [('repositories', False), ('papers', True)])
+def test_interrupted_migration_resumes_from_checkpoint(tmp_path, records_key, flat):
+    records = {f"r{i}": {'n': i} for i in range(10)}
+    data = records if flat else {'last_updated': None, records_key: records, 'trailer': True}
+    path = tmp_path / 'data.json'
+    save_json(data, str(path))
+    applied = []
+
+    def bump(key, record):
+        if key == 'r7' and not applied.count('crashed'):
+            applied.append('crashed')
+            raise RuntimeError("killed")
+        applied.append(key)
+        return dict(record, n=record['n'] + 1)
+
+    data_file = DataFile(records_key, flat, [Migration(1, "bump", bump)])
+    with patch.object(migrations, 'READ_CHUNK_SIZE', 16), pytest.raises(RuntimeError):
+        migrate_file(str(path), data_file, checkpoint_interval=3)
+    assert load_json(str(path)) == data
+    assert load_json(f"{path}.migration.json")['records'] == 6
+
+    with patch.object(migrations, 'READ_CHUNK_SIZE', 16):
+        assert migrate_file(str(path), data_file, checkpoint_interval=3)
+
+    # Records before the checkpoint aren't migrated again
+    assert applied.count('r0') == 1 and applied.count('r6') == 2
+    migrated = load_json(str(path))
+    assert migrated[records_key] == {key: {'n': record['n'] + 1} for key, record in records.items()}
+    assert migrated['schema_version'] == 1
+    assert path.read_bytes() == dumps(migrated)
+    assert sorted(os.listdir(tmp_path)) == ['data.json']
@@ -0,0 +1,34 @@
+import sys
+from datetime import datetime, timedelta, UTC
+from pathlib import Path
+
+# Add the parent directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from negative_cache import NegativeCache
+
+NOW = datetime(2024, 1, 1, tzinfo=UTC)
+
+def test_misses_back_off_exponentially_up_to_the_cap(tmp_path):
+    cache = NegativeCache(str(tmp_path / 'misses.json'), ttl_days=7, max_ttl_days=20)
+    retry_after = []
+    for _ in range(3):
+        cache.record_miss('2104.99999', NOW)
+        retry_after.append(datetime.fromisoformat(cache.entries['2104.99999']['retry_after']) - NOW)
+    assert retry_after == [timedelta(days=7), timedelta(days=14), timedelta(days=20)]
+
+def test_filter_skips_recent_misses_and_retries_expired_ones(tmp_path):
+    path = str(tmp_path / 'misses.json')
+    cache = NegativeCache(path, ttl_days=7)
+    cache.record_miss('recent', NOW)
+    cache.record_miss('old', NOW - timedelta(days=8))
+    cache.save()
+
+    reloaded = NegativeCache(path, ttl_days=7)
+    assert reloaded.filter(['new', 'recent', 'old'], NOW) == ['new', 'old']
+    assert (reloaded.hits, reloaded.expired) == (1, 1)
+
+    reloaded.record_hit('old')
+    reloaded.save()
+    assert set(NegativeCache(path).entries) == {'recent'}
+    assert reloaded.resolved == 1
@@ -0,0 +1,60 @@
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+# Add the parent directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import paper_identifiers
+from paper_identifiers import IdentifierIndex, Identity, normalize_title, normalize_doi
+
+def test_identifier_keeps_collector_precedence(tmp_path):
+    index = IdentifierIndex(str(tmp_path / 'ids.json'))
+    assert index.identifier({'url': 'https://arxiv.org/abs/1234.56789v2'}) == 'arxiv:1234.56789'
+    assert index.identifier({'arxiv': '2104.08653'}) == 'arxiv:2104.08653'
+    assert index.identifier({'bibtex': '@article{x, doi={10.1234/Example}, arxiv={1234.56789}}'}) == 'doi:10.1234/Example'
+    assert index.identifier({'bibtex': '@article{x, arxiv={1234.56789}}'}) == 'arxiv:1234.56789'
+    assert index.identifier({'bibtex': '@article{x, title={Unique Title}}'}) == 'title:Unique Title'
+    assert index.identifier({'bibtex': '@article{x, arxiv={not an id}, title={Some Title}}'}) is None
+    assert index.identifier({'bibtex': '@article{x, arxiv={not an id}, doi={10.1/x}}'}) == 'doi:10.1/x'
+    assert index.identifier({'url': 'https://example.com/paper'}) is None
+    assert index.identifier({'other': 'data'}) is None
+
+def test_normalization():
+    assert normalize_title("{Attention} Is All You Need!") == normalize_title("attention is all  you need") == 'attentionisallyouneed'
+    assert normalize_doi("https://doi.org/10.1234/ABC ") == normalize_doi("10.1234/abc") == '10.1234/abc'
+    assert normalize_title(None) is None and normalize_doi('') is None
+
+def test_deduplicate_merges_on_any_shared_key(tmp_path):
+    index = IdentifierIndex(str(tmp_path / 'ids.json'))
+    papers = [
+        {'url': 'https://arxiv.org/abs/1234.56789'},
+        {'bibtex': '@article{a, arxiv={1234.56789}, doi={10.1/X}}'},  # Same arXiv ID
+        {'bibtex': '@article{b, title={Deep Learning: A Survey}}'},
+        {'bibtex': '@article{c, title={Deep learning - a survey}}'},  # Same title, normalized
+        {'bibtex': '@article{d, doi={10.1/y}}'},
+        {'bibtex': '@article{e, doi={https://doi.org/10.1/Y}}'},  # Same DOI
+        {'url': 'https://example.com/no-id'},
+    ]
+    unique = index.deduplicate(papers)
+    assert unique == [papers[0], papers[2], papers[4]]
+    assert index.lookup('title', "DEEP LEARNING, a survey") == 'title:Deep Learning: A Survey'
+    assert index.lookup('doi', '10.1/Y') == 'doi:10.1/y'
+    assert index.lookup('arxiv', '1234.56789') == 'arxiv:1234.56789'
+
+def test_parses_are_cached_by_content_across_runs(tmp_path):
+    path = str(tmp_path / 'ids.json')
+    papers = [{'bibtex': '@article{a, doi={10.1/x}, title={T}}'}, {'url': 'https://arxiv.org/abs/2104.08653'}]
+    index = IdentifierIndex(path)
+    with patch.object(paper_identifiers, 'parse_identity', wraps=paper_identifiers.parse_identity) as parse:
+        index.deduplicate(papers)
+        index.identifier(papers[0])
+        assert parse.call_count == 2
+    index.save()
+    assert (index.parsed, index.cached) == (2, 1)
+
+    rerun = IdentifierIndex(path)
+    with patch.object(paper_identifiers, 'parse_identity') as parse:
+        assert rerun.deduplicate(papers) == papers
+        assert rerun.identity(papers[0]) == Identity(None, '10.1/x', 'T')
+        parse.assert_not_called()
@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+
+# Add the parent directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from paper_store import PaperStore, build_paper_store, load_papers
+from serialization import save_json
+
+ARXIV = {
+    '2104.08653': {'id': "http://arxiv.org/abs/2104.08653v1", 'title': "Ground truth", 'abstract': "From arXiv",
+                   'categories': ['cs.LG'], 'doi': None},
+    '2105.14075': {'id': "http://arxiv.org/abs/2105.14075v2", 'title': "Second", 'categories': ['cs.CV'], 'doi': "10.1/Second"},
+}
+ARTICLES = {
+    'arxiv:2104.08653': {'source': 'Semantic Scholar', 'title': "Ground Truth (S2)", 'abstract': None, 'arxivId': '2104.08653',
+                         'doi': None, 'paperId': 's2-a', 'citation_count': 10},
+    'doi:10.1/second': {'source': 'Semantic Scholar', 'title': "second", 'arxivId': None, 'paperId': 's2-b', 'venue': "CVPR"},
+    'doi:10.2/journal-only': {'source': 'Semantic Scholar', 'title': "Journal", 'arxivId': None, 'doi': "10.2/Journal-Only", 'paperId': 's2-c'},
+    'title:Unknown': {'source': 'Semantic Scholar', 'title': "Unknown", 'arxivId': None, 'doi': None, 'paperId': None},
+}
+
+def test_records_from_both_collectors_merge_once(tmp_path):
+    arxiv_path, article_path, path = (str(tmp_path / name) for name in ('arxiv.json', 'article.json', 'papers.json'))
+    save_json({'schema_version': 1, 'papers': ARXIV}, arxiv_path)
+    save_json({'last_updated': None, 'papers': ARTICLES}, article_path)
+
+    store = build_paper_store(arxiv_path, article_path, path)
+
+    assert sorted(store.papers) == ['2104.08653', '2105.14075', 'doi:10.2/journal-only']
+    first = store.lookup('arxiv', '2104.08653')
+    assert first is store.lookup('paperId', 's2-a')
+    assert first['title'] == "Ground truth" and first['abstract'] == "From arXiv"  # arXiv wins for its own fields
+    assert first['citation_count'] == 10
+    assert first['sources'] == ['arxiv', 'semantic_scholar']
+    second = store.lookup('doi', 'https://doi.org/10.1/second')
+    assert second is store.lookup('paperId', 's2-b') is store.papers['2105.14075']
+    assert second['venue'] == "CVPR"
+    assert store.lookup('doi', '10.2/journal-only')['paperId'] == 's2-c'
+
+    # Reloading and re-merging the same inputs changes nothing
+    before = load_papers(path)
+    assert build_paper_store(arxiv_path, article_path, path).papers == before
+
+def test_upsert_rekeys_and_merges_papers_found_to_be_the_same():
+    store = PaperStore()
+    assert store.upsert({'doi': "10.1/x", 'title': "By DOI", 'citation_count': 3}, 'semantic_scholar') == 'doi:10.1/x'
+    assert store.upsert({'paperId': 's2-x', 'venue': "NeurIPS"}, 'semantic_scholar') == 's2:s2-x'
+    assert len(store) == 2
+
+    # One record carrying all three identifiers joins both papers under the arXiv ID
+    assert store.upsert({'arxiv_id': '2401.00001', 'doi': "10.1/X", 'paperId': 's2-x', 'title': "By arXiv"}, 'arxiv') == '2401.00001'
+    assert list(store.papers) == ['2401.00001']
+    paper = store.lookup('doi', '10.1/x')
+    assert paper is store.lookup('paperId', 's2-x')
+    assert (paper['title'], paper['citation_count'], paper['venue']) == ("By arXiv", 3, "NeurIPS")
+    assert store.upsert({'title': "No identifiers"}) is None
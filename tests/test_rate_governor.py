@@ -0,0 +1,105 @@
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+import pytest
+
+# Add the parent directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from rate_governor import RateGovernor, RateBudgetExhausted, MIN_BURST
+
+def headers(remaining, reset_in=3600, resource='core'):
+    return {
+        'X-RateLimit-Remaining': str(remaining),
+        'X-RateLimit-Reset': str(int(time.time()) + reset_in),
+        'X-RateLimit-Resource': resource,
+    }
+
+@pytest.fixture
+def state_file(tmp_path):
+    return str(tmp_path / 'rate_state.json')
+
+def test_unknown_budget_does_not_block(state_file):
+    governor = RateGovernor(path=state_file)
+    with patch('rate_governor.time.sleep') as mock_sleep:
+        governor.acquire('token')
+    mock_sleep.assert_not_called()
+    assert governor.can_afford(10**6, 'token')
+
+class FakeClock:
+    def __init__(self):
+        self.now = time.time()
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+def test_paces_instead_of_sleeping_until_reset(state_file):
+    clock = FakeClock()
+    governor = RateGovernor(path=state_file, reserve=100)
+    with patch('rate_governor.time', clock):
+        governor.update(headers(460, reset_in=3600), 'token')  # 360 spendable over an hour: 0.1 req/s
+        for _ in range(MIN_BURST + 1):
+            governor.acquire('token')
+
+    assert len(clock.sleeps) == 1
+    assert 9 < clock.sleeps[0] < 11
+    assert governor.remaining('token') == 460 - (MIN_BURST + 1)
+
+def test_exhausted_budget_raises(state_file):
+    governor = RateGovernor(path=state_file, reserve=100)
+    governor.update(headers(100), 'token')
+    assert not governor.can_afford(1, 'token')
+    with pytest.raises(RateBudgetExhausted) as excinfo:
+        governor.acquire('token')
+    assert excinfo.value.resource == 'core'
+
+def test_state_is_shared_between_governors(state_file):
+    first = RateGovernor(path=state_file, reserve=0)
+    second = RateGovernor(path=state_file, reserve=0)
+    first.update(headers(1000), 'token')
+
+    second.acquire('token')
+    second.acquire('token')
+    assert first.remaining('token') == 998
+
+    # A response that saw fewer acquisitions doesn't undo the other process's spend
+    first.update(headers(999), 'token')
+    assert second.remaining('token') == 998
+
+def test_uncharged_responses_give_the_provisional_spend_back(state_file):
+    governor = RateGovernor(path=state_file, reserve=0)
+    not_modified = headers(1000)  # 304s: GitHub's figure doesn't move
+    with patch('rate_governor.time', FakeClock()):
+        governor.update(not_modified, 'token')
+        for _ in range(50):
+            governor.acquire('token')
+            governor.update(not_modified, 'token')
+        assert governor.remaining('token') == 1000
+
+        # Spends still in flight stay counted; a request that never got a response is released
+        governor.acquire('token')
+        governor.acquire('token')
+        governor.update(not_modified, 'token')
+        assert governor.remaining('token') == 999
+        governor.release('token')
+        assert governor.remaining('token') == 1000
+
+def test_resources_and_keys_are_independent(state_file):
+    governor = RateGovernor(path=state_file, reserve=100)
+    governor.update(headers(100, resource='graphql'), 'token')
+    governor.update(headers(5000), 'other-token')
+    assert not governor.can_afford(1, 'token', 'graphql')
+    assert governor.can_afford(1, 'token', 'core')
+    assert governor.can_afford(1000, 'other-token')
+
+def test_expired_window_is_ignored(state_file):
+    governor = RateGovernor(path=state_file, reserve=100)
+    governor.update(headers(0, reset_in=-5), 'token')
+    assert governor.remaining('token') is None
+    governor.acquire('token')
@@ -0,0 +1,72 @@
+import sys
+import time
+from pathlib import Path
+import pytest
+
+# Add the parent directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from readme_scanner import normalize_arxiv_id, primary_arxiv_id, scan_readme
+
+FIXTURES = Path(__file__).resolve().parent.parent / 'benchmarks' / 'fixtures' / 'readmes'
+
+@pytest.mark.parametrize("raw,expected", [
+    ("2104.08653", "2104.08653"),
+    ("2104.08653v3", "2104.08653"),
+    ("hep-th/9711200v1", "hep-th/9711200"),
+    ("math.GT/0309136", "math/0309136"),
+    ("HEP-TH/9711200", "hep-th/9711200"),
+])
+def test_normalize_arxiv_id(raw, expected):
+    assert normalize_arxiv_id(raw) == expected
+
+def test_scan_finds_ids_in_every_form():
+    text = (
+        "See arXiv:2104.08653v2, https://arxiv.org/pdf/2105.14075.pdf and arxiv.org/abs/2104.08653. "
+        "Classic: arXiv:hep-th/9711200 and https://arxiv.org/abs/math.GT/0309136v1. Bare 2106.00001 is ignored."
+    )
+    assert scan_readme(text).arxiv_ids == ['2104.08653', '2105.14075', 'hep-th/9711200', 'math/0309136']
+
+def test_scan_finds_badges():
+    text = (
+        "[![Paper](https://img.shields.io/badge/paper-blue)](https://example.com)\n"
+        "[![arXiv](https://img.shields.io/badge/arXiv-2105.14075-b31b1b.svg)](https://arxiv.org/abs/2105.14075v2)\n"
+    )
+    scan = scan_readme(text)
+    assert scan.badge_id == '2105.14075'
+    assert scan.arxiv_ids == ['2105.14075']
+
+def test_scan_brace_matches_bibtex():
+    entry = "@article{doe2021,\n  title={A {Nested} Title},\n  note={jane@example.com},\n  journal={arXiv preprint arXiv:2104.08653}\n}"
+    text = f"Cite us:\n```\n{entry}\n```\n@decorator\ndef f(): pass\n@include{{path}}\n@misc{{unterminated,\n title={{x}}"
+    scan = scan_readme(text)
+    assert scan.bibtex == [entry]
+    assert scan.arxiv_ids == ['2104.08653']
+
+def test_long_entries_fall_back_to_the_brace_matcher():
+    fields = ",\n".join(f"  field{i}={{value {{{i}}}}}" for i in range(40))
+    entry = f"@article{{long,\n{fields}\n}}"
+    assert scan_readme(f"{entry}\n@misc{{next, title={{x}}}}").bibtex == [entry, "@misc{next, title={x}}"]
+
+def test_unterminated_entries_stay_linear():
+    hostile = "@a{k," * 20000 + "@article{x, title={y}}"
+    start = time.perf_counter()
+    assert scan_readme(hostile).bibtex == ["@article{x, title={y}}"]
+    assert time.perf_counter() - start < 1
+
+def test_primary_arxiv_id():
+    scan = scan_readme("Check out our paper: [arXiv:2105.14075](https://arxiv.org/abs/2105.14075) and arxiv:2104.08653")
+    assert primary_arxiv_id("Implementation of arxiv:2104.08653", scan) == "2104.08653"
+    assert primary_arxiv_id(None, scan) is None
+
+    badge = scan_readme("[![arXiv](https://img.shields.io/badge/arXiv-x)](https://arxiv.org/abs/2105.14075) arxiv:2104.08653")
+    assert primary_arxiv_id("", badge) == "2105.14075"
+    assert primary_arxiv_id("", scan_readme("arxiv:2104.08653")) == "2104.08653"
+    assert primary_arxiv_id("arxiv:2104.08653", scan_readme("")) is None
+
+def test_fixtures():
+    diffusion = scan_readme((FIXTURES / 'diffusion_model.md').read_text())
+    assert diffusion.badge_id == '2112.10752'
+    assert primary_arxiv_id("", diffusion) == '2112.10752'
+    assert len(diffusion.bibtex) == 2
+    assert scan_readme((FIXTURES / 'app_no_papers.md').read_text()) == ([], None, [])
@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Add the parent directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from readme_store import ReadmeStore, git_blob_sha
+
+def test_git_blob_sha_matches_git():
+    content = b"# Project\n\nSee arxiv:2104.08653\n"
+    expected = subprocess.run(['git', 'hash-object', '--stdin'], input=content, capture_output=True, check=True).stdout.decode().strip()
+    assert git_blob_sha(content) == expected
+
+def test_identical_readmes_are_stored_once(tmp_path):
+    store = ReadmeStore(str(tmp_path))
+    sha = store.put("a/fork", b"same README", '"e1"')
+    assert store.put("b/fork", b"same README") == sha
+    assert store.put("a/fork", b"same README", '"e1"') == sha
+    assert (store.stored, store.unchanged) == (1, 2)
+    assert len(os.listdir(tmp_path / 'objects' / sha[:2])) == 1
+
+def test_index_survives_a_reload(tmp_path):
+    store = ReadmeStore(str(tmp_path))
+    store.put("a/repo", "Ünïcode README".encode('utf-8'), '"e1"')
+    store.save()
+
+    reloaded = ReadmeStore(str(tmp_path))
+    assert reloaded.get("a/repo") == "Ünïcode README"
+    assert reloaded.entry("a/repo")['etag'] == '"e1"'
+    assert reloaded.get("missing/repo") is None
+    assert reloaded.names() == ["a/repo"]
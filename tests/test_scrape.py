@@ -1,7 +1,6 @@
 import pytest
 from unittest.mock import patch, MagicMock
 import json
-import base64
 from datetime import datetime, UTC
 import sys
 from pathlib import Path
@@ -10,13 +9,30 @@ import requests
 # Add the parent directory to the Python path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
+from rate_governor import RateBudgetExhausted
+from storage import Journal, SQLiteStore
+from readme_store import ReadmeStore
 from scrape_stars import (
     get_starred_repos, get_repo_metadata, extract_metadata,
     get_readme_content, extract_arxiv_id, extract_arxiv_ids,
     extract_bibtex, infer_primary_arxiv_id, process_repo,
-    process_stars, handle_rate_limit, check_initial_rate_limit
+    process_stars, check_initial_rate_limit,
+    select_stale_repos, refresh_stale_repos, load_existing_data, reindex_repos
 )
 
+@pytest.fixture(autouse=True)
+def journal(tmp_path):
+    journal = Journal(str(tmp_path / 'journal.jsonl'))
+    with patch('scrape_stars.journal', journal):
+        yield journal
+    journal.clear()
+
+@pytest.fixture(autouse=True)
+def readme_store(tmp_path):
+    store = ReadmeStore(str(tmp_path / 'readmes'))
+    with patch('scrape_stars.readme_store', store):
+        yield store
+
 @pytest.fixture
 def mock_response():
     mock = MagicMock()
@@ -43,24 +59,58 @@ def mock_repo_metadata():
         "pushed_at": "2021-01-01T00:00:00Z",
     }
 
+def mock_client(response=None, **kwargs):
+    client = MagicMock()
+    client.tokens = ('testtoken',)
+    if response is not None:
+        client.get.return_value = response
+    for name, value in kwargs.items():
+        setattr(client.get, name, value)
+    return patch('scrape_stars.get_client', return_value=client)
+
 def test_get_starred_repos(mock_response):
-    with patch('scrape_stars.requests.get', return_value=mock_response), \
-         patch('scrape_stars.handle_rate_limit'):
+    with mock_client(mock_response):
         repos = get_starred_repos('testuser', 'testtoken')
     assert repos == [{"repo": {"full_name": "test/repo"}}]
 
+def test_get_starred_repos_stops_at_known_page():
+    def page(items, next_url=None):
+        response = MagicMock()
+        response.json.return_value = [
+            {"repo": {"full_name": name}, "starred_at": starred_at} for name, starred_at in items
+        ]
+        response.links = {'next': {'url': next_url}} if next_url else {}
+        return response
+
+    pages = [
+        page([("new/repo", "2024-01-02T00:00:00Z"), ("old/repo1", "2023-01-01T00:00:00Z")], "https://api.github.com/user/starred?page=2"),
+        page([("old/repo2", "2022-01-01T00:00:00Z")], "https://api.github.com/user/starred?page=3"),
+        page([("old/repo3", "2021-01-01T00:00:00Z")]),
+    ]
+    known = {
+        ("old/repo1", "2023-01-01T00:00:00Z"),
+        ("old/repo2", "2022-01-01T00:00:00Z"),
+        ("old/repo3", "2021-01-01T00:00:00Z"),
+    }
+    with mock_client(side_effect=pages) as get_client:
+        repos = get_starred_repos('testuser', 'testtoken', known_stars=known)
+
+    mock_get = get_client.return_value.get
+    assert mock_get.call_count == 2
+    assert mock_get.call_args_list[0][1]['params']['sort'] == "created"
+    assert mock_get.call_args_list[0][1]['params']['direction'] == "desc"
+    assert [item['repo']['full_name'] for item in repos] == ["new/repo", "old/repo1", "old/repo2"]
+
 def test_get_repo_metadata(mock_response, mock_repo_metadata):
     mock_response.json.return_value = mock_repo_metadata
-    with patch('scrape_stars.requests.get', return_value=mock_response), \
-         patch('scrape_stars.handle_rate_limit'):
+    with mock_client(mock_response):
         metadata = get_repo_metadata({"full_name": "test/repo"}, 'testtoken')
     assert metadata == mock_repo_metadata
 
 def test_get_repo_metadata_404_error(mock_response):
     mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=mock_response)
     mock_response.status_code = 404
-    with patch('scrape_stars.requests.get', return_value=mock_response), \
-         patch('scrape_stars.handle_rate_limit'):
+    with mock_client(mock_response):
         metadata = get_repo_metadata({"full_name": "test/repo"}, 'testtoken')
     assert metadata is None
 
@@ -71,12 +121,24 @@ def test_extract_metadata(mock_repo_metadata):
     assert extracted['name'] == "test-repo"
     assert extracted['starred_at'] == starred_at
 
-def test_get_readme_content(mock_response):
+def test_get_readme_content(mock_response, readme_store):
     mock_response.status_code = 200
-    mock_response.json.return_value = {"content": base64.b64encode(b"Test README").decode('utf-8')}
-    with patch('scrape_stars.requests.get', return_value=mock_response):
+    mock_response.content = b"Test README"
+    mock_response.headers = {'ETag': '"abc"'}
+    with mock_client(mock_response) as get_client:
         content = get_readme_content("test/repo", 'testtoken')
     assert content == "Test README"
+    assert get_client.return_value.get.call_args[1]['headers'] == {"Accept": "application/vnd.github.raw"}
+    assert readme_store.get("test/repo") == "Test README"
+    assert readme_store.entry("test/repo")['etag'] == '"abc"'
+
+def test_get_readme_content_unchanged_is_served_from_store(mock_response, readme_store):
+    readme_store.put("test/repo", b"Stored README", '"abc"')
+    mock_response.status_code = 304
+    with mock_client(mock_response) as get_client:
+        content = get_readme_content("test/repo", 'testtoken')
+    assert content == "Stored README"
+    assert get_client.return_value.get.call_args[1]['headers']['If-None-Match'] == '"abc"'
 
 def test_extract_arxiv_id():
     assert extract_arxiv_id("https://arxiv.org/abs/2104.08653") == "2104.08653"
@@ -118,12 +180,65 @@ def test_process_repo(repo_data, expected_ids, expected_primary):
     assert processed['arxiv']['ids'] == expected_ids
     assert processed['arxiv']['primary_id'] == expected_primary
 
-def test_handle_rate_limit():
-    mock_response = MagicMock()
-    mock_response.headers = {'X-RateLimit-Remaining': '10', 'X-RateLimit-Reset': str(int(datetime.now(UTC).timestamp()) + 3600)}
-    with patch('scrape_stars.time.sleep') as mock_sleep:
-        handle_rate_limit(mock_response)
-        mock_sleep.assert_called()
+def test_process_stars_checkpoints_when_budget_exhausted(mock_repo_metadata):
+    starred = [{"repo": {"full_name": f"test/repo{i}"}, "starred_at": "2022-01-01T00:00:00Z"} for i in range(3)]
+    existing_data = {"repositories": {}}
+
+    def fake_metadata(repo, token):
+        if repo['full_name'] == "test/repo1":
+            raise RateBudgetExhausted('core', 100, 0)
+        return dict(mock_repo_metadata, full_name=repo['full_name'])
+
+    with patch('scrape_stars.get_starred_repos', return_value=starred), \
+         patch('scrape_stars.get_repo_metadata', side_effect=fake_metadata), \
+         patch('scrape_stars.process_repo', side_effect=lambda name, data, token: data), \
+         patch('scrape_stars.save_data') as mock_save, \
+         patch('scrape_stars.commit_and_push') as mock_commit:
+        with pytest.raises(RateBudgetExhausted):
+            process_stars('testuser', 'testtoken', existing_data, concurrency=1)
+
+    assert set(existing_data['repositories']) == {"test/repo0", "test/repo2"}
+    mock_save.assert_called_once_with(existing_data)
+    mock_commit.assert_called_once()
+
+def test_interrupted_run_resumes_from_journal(mock_repo_metadata, journal):
+    starred = [{"repo": {"full_name": f"test/repo{i}"}, "starred_at": "2022-01-01T00:00:00Z"} for i in range(3)]
+
+    def crashing_metadata(repo, token):
+        if repo['full_name'] == "test/repo1":
+            raise RuntimeError("connection lost")
+        return dict(mock_repo_metadata, full_name=repo['full_name'])
+
+    with patch('scrape_stars.get_starred_repos', return_value=starred), \
+         patch('scrape_stars.get_repo_metadata', side_effect=crashing_metadata), \
+         patch('scrape_stars.process_repo', side_effect=lambda name, data, token: data), \
+         patch('scrape_stars.save_data') as mock_save, \
+         patch('scrape_stars.commit_and_push'):
+        with pytest.raises(RuntimeError):
+            process_stars('testuser', 'testtoken', {"repositories": {}}, concurrency=1)
+    mock_save.assert_not_called()
+
+    # A partial line from a crash mid-write is ignored
+    with open(journal.path, 'a') as f:
+        f.write('{"full_name": "test/re')
+
+    with patch('scrape_stars.store') as mock_store:
+        mock_store.load.return_value = {"last_updated": None, "repositories": {}}
+        existing_data = load_existing_data()
+    assert set(existing_data['repositories']) == {"test/repo0", "test/repo2"}
+    # Replayed records are saved and the journal compacted before any new work
+    mock_store.save.assert_called_once_with(existing_data)
+    assert journal.replay({"repositories": {}}) == 0
+
+    with patch('scrape_stars.get_starred_repos', return_value=starred), \
+         patch('scrape_stars.get_repo_metadata', return_value=mock_repo_metadata) as mock_metadata, \
+         patch('scrape_stars.process_repo', side_effect=lambda name, data, token: data), \
+         patch('scrape_stars.store') as mock_store, \
+         patch('scrape_stars.commit_and_push'):
+        process_stars('testuser', 'testtoken', existing_data, concurrency=1)
+    assert mock_metadata.call_count == 1  # Only the repo that was in flight
+    mock_store.save.assert_called_with(existing_data)
+    assert journal.replay({"repositories": {}}) == 0
 
 def test_check_initial_rate_limit():
     mock_response = MagicMock()
@@ -132,8 +247,141 @@ def test_check_initial_rate_limit():
             'core': {'remaining': 4000, 'reset': int(datetime.now(UTC).timestamp()) + 3600}
         }
     }
-    with patch('scrape_stars.requests.get', return_value=mock_response):
+    with mock_client(mock_response):
         assert check_initial_rate_limit('testtoken') == True
 
+def test_process_stars_concurrent(mock_repo_metadata):
+    starred = [
+        {"repo": {"full_name": f"test/repo{i}"}, "starred_at": f"2022-01-0{i}T00:00:00Z"}
+        for i in range(1, 6)
+    ]
+    existing_data = {"repositories": {"test/repo2": {"lists": ["keep"], "metadata": {}}}}
+
+    def fake_metadata(repo, token):
+        if repo['full_name'] == "test/repo4":
+            return None
+        return dict(mock_repo_metadata, full_name=repo['full_name'])
+
+    def fake_process_repo(repo_name, repo_data, token):
+        repo_data['arxiv'] = {'ids': [], 'primary_id': None, 'bibtex_citations': []}
+        return repo_data
+
+    with patch('scrape_stars.get_starred_repos', return_value=starred), \
+         patch('scrape_stars.get_repo_metadata', side_effect=fake_metadata) as mock_metadata, \
+         patch('scrape_stars.process_repo', side_effect=fake_process_repo), \
+         patch('scrape_stars.save_data') as mock_save, \
+         patch('scrape_stars.commit_and_push'):
+        process_stars('testuser', 'testtoken', existing_data, concurrency=3)
+
+    assert mock_metadata.call_count == 4
+    assert list(existing_data['repositories']) == ["test/repo2", "test/repo1", "test/repo3", "test/repo5"]
+    assert existing_data['repositories']["test/repo2"] == {"lists": ["keep"], "metadata": {}}
+    record = existing_data['repositories']["test/repo3"]
+    assert record['metadata']['full_name'] == "test/repo3"
+    assert record['metadata']['starred_at'] == "2022-01-03T00:00:00Z"
+    assert record['lists'] == []
+    assert 'arxiv' in record
+    mock_save.assert_called()
+
+def test_select_stale_repos():
+    now = datetime(2024, 6, 1, tzinfo=UTC)
+
+    def record(last_updated, pushed_at):
+        return {'metadata': {'pushed_at': pushed_at}, 'last_updated': last_updated}
+
+    existing_data = {"repositories": {
+        "fresh/repo": record("2024-05-30T00:00:00+00:00", "2024-05-30T00:00:00Z"),
+        "stale/dormant": record("2024-05-01T00:00:00+00:00", "2019-01-01T00:00:00Z"),
+        "stale/active": record("2024-05-01T00:00:00+00:00", "2024-05-31T00:00:00Z"),
+        "very-stale/dormant": record("2024-01-01T00:00:00+00:00", "2019-01-01T00:00:00Z"),
+        "never/refreshed": {'metadata': {}},
+    }}
+
+    assert select_stale_repos(existing_data, budget=100, now=now) == [
+        "never/refreshed", "very-stale/dormant", "stale/active", "stale/dormant"
+    ]
+    assert select_stale_repos(existing_data, budget=5, now=now) == ["never/refreshed", "very-stale/dormant"]
+    assert select_stale_repos(existing_data, budget=-10, now=now) == []
+
+def test_refresh_stale_repos(mock_repo_metadata):
+    existing_data = {"repositories": {
+        "test/repo": {
+            'lists': ['tools'],
+            'metadata': {'stars': 1, 'pushed_at': "2020-01-01T00:00:00Z", 'starred_at': "2020-02-02T00:00:00Z"},
+            'arxiv': {'ids': [], 'primary_id': None, 'bibtex_citations': []},
+            'last_updated': "2020-01-01T00:00:00+00:00",
+        },
+        "test/unchanged": {
+            'lists': [],
+            'metadata': {'stars': 5, 'pushed_at': "2021-01-01T00:00:00Z", 'starred_at': "2020-02-02T00:00:00Z"},
+            'arxiv': {'ids': ['2104.08653'], 'primary_id': None, 'bibtex_citations': []},
+            'last_updated': "2020-01-01T00:00:00+00:00",
+        },
+        "test/fresh": {'metadata': {}, 'last_updated': datetime.now(UTC).isoformat()},
+    }}
+
+    with patch('scrape_stars.get_repo_metadata', return_value=mock_repo_metadata) as mock_metadata, \
+         patch('scrape_stars.process_repo', side_effect=lambda name, data, token: data) as mock_process, \
+         patch('scrape_stars.save_data') as mock_save, \
+         patch('scrape_stars.commit_and_push'):
+        refresh_stale_repos('testtoken', existing_data, budget=100)
+
+    assert mock_metadata.call_count == 2
+    assert mock_process.call_count == 1  # Only the repo whose pushed_at moved
+    record = existing_data['repositories']["test/repo"]
+    assert record['metadata']['stars'] == 100
+    assert record['metadata']['starred_at'] == "2020-02-02T00:00:00Z"
+    assert record['lists'] == ['tools']
+    assert record['last_updated'] > "2020-01-01T00:00:00+00:00"
+    assert existing_data['repositories']["test/unchanged"]['arxiv']['ids'] == ['2104.08653']
+    mock_save.assert_called()
+
+def test_refresh_exports_progress_when_budget_exhausted(tmp_path, mock_repo_metadata):
+    stale = {'metadata': {'pushed_at': "2020-01-01T00:00:00Z"}, 'arxiv': {'ids': []}, 'last_updated': "2020-01-01T00:00:00+00:00"}
+    existing_data = {"last_updated": None, "repositories": {f"test/repo{i}": dict(stale) for i in range(3)}}
+    stars_file = str(tmp_path / 'github_stars.json')
+    store = SQLiteStore(str(tmp_path / 'github_stars.db'), stars_file)
+    calls = []
+
+    def fake_metadata(repo, token):
+        calls.append(repo['full_name'])
+        if len(calls) == 2:
+            raise RateBudgetExhausted('core', 100, 0)
+        return dict(mock_repo_metadata, full_name=repo['full_name'])
+
+    with patch('scrape_stars.store', store), \
+         patch('scrape_stars.STARS_FILE', stars_file), \
+         patch('scrape_stars.CHUNK_SIZE', 1), \
+         patch('scrape_stars.subprocess.run'), \
+         patch('scrape_stars.get_repo_metadata', side_effect=fake_metadata), \
+         patch('scrape_stars.process_repo', side_effect=lambda name, data, token: data):
+        with pytest.raises(RateBudgetExhausted):
+            refresh_stale_repos('testtoken', existing_data, budget=100, concurrency=1)
+
+    exported = json.loads(Path(stars_file).read_text())
+    refreshed = exported['repositories'][calls[0]]
+    assert refreshed['metadata']['stars'] == 100
+    assert refreshed['last_updated'] > "2020-01-01T00:00:00+00:00"
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_reindex_rewrites_only_changed_arxiv_blocks(readme_store, workers):
+    current = {'ids': ['2104.08653'], 'primary_id': '2104.08653', 'bibtex_citations': []}
+    existing_data = {"repositories": {
+        "test/current": {"metadata": {"description": None}, "arxiv": current},
+        "test/stale": {"metadata": {"description": "Code for our paper"}, "arxiv": {'ids': [], 'primary_id': None, 'bibtex_citations': []}},
+        "test/uncached": {"metadata": {"description": None}, "arxiv": current},
+    }}
+    readme_store.put("test/current", b"arxiv:2104.08653")
+    readme_store.put("test/stale", b"[![arXiv](https://img.shields.io/badge)](https://arxiv.org/abs/2301.00001v2)")
+
+    with patch('scrape_stars.get_client') as get_client:
+        changed = reindex_repos(existing_data, target_store=readme_store, workers=workers, chunk_size=1)
+
+    get_client.assert_not_called()
+    assert changed == ["test/stale"]
+    assert existing_data['repositories']["test/stale"]['arxiv']['primary_id'] == "2301.00001"
+    assert existing_data['repositories']["test/current"]['arxiv'] is current
+    assert existing_data['repositories']["test/uncached"]['arxiv'] is current
+
 if __name__ == "__main__":
     pytest.main()
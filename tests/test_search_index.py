@@ -0,0 +1,36 @@
+import sys
+from pathlib import Path
+
+# Add the parent directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from search_index import build_search_index, decode_postings, search, tokenize
+
+ROWS = [
+    ("openai/whisper", {'metadata': {'description': "Robust speech recognition", 'language': "Python"}, 'lists': ['audio']}, {}),
+    ("huggingface/diffusers", {'metadata': {'description': "Diffusion models in PyTorch", 'language': "Python"}, 'lists': []}, {}),
+    ("lucidrains/imagen-pytorch", {'metadata': {'description': None, 'language': "Python"}, 'lists': ['ml']},
+     {'2205.11487': {'title': "Photorealistic Text-to-Image Diffusion Models"}}),
+]
+
+def test_tokenize():
+    assert tokenize("Text-to-Image diffusion_models, v2!") == ['text', 'to', 'image', 'diffusion', 'models', 'v2']
+    assert tokenize(None) == []
+
+def test_index_is_sorted_and_delta_encoded():
+    index = build_search_index(ROWS)
+    assert index['terms'] == sorted(index['terms'])
+    python = index['terms'].index('python')
+    assert index['postings'][python] == [0, 1, 1]
+    assert decode_postings(index['postings'][python]) == [0, 1, 2]
+
+def test_search_intersects_prefix_matches():
+    index = build_search_index(ROWS)
+    assert search(index, "diffusion") == {1, 2}  # Description and linked paper title
+    assert search(index, "diff model") == {1, 2}
+    assert search(index, "Diff PyTorch") == {1, 2}
+    assert search(index, "models photo") == {2}
+    assert search(index, "whisper audio") == {0}
+    assert search(index, "imagen") == {2}
+    assert search(index, "nonexistent") == set()
+    assert search(index, "  --  ") is None
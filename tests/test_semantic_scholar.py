@@ -0,0 +1,96 @@
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+import requests
+
+# Add the parent directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from semantic_scholar import AIMDPacer, SemanticScholarClient
+
+def response(status_code, body=None, headers=None):
+    mock = MagicMock()
+    mock.status_code = status_code
+    mock.json.return_value = body
+    mock.headers = headers or {}
+    mock.text = str(body)
+    return mock
+
+class FakeSemanticScholar:
+    """Answers batch POSTs from `handler(ids, call_number)`, recording every batch it was sent."""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def post(self, url, params=None, json=None, headers=None, timeout=None):
+        with self._lock:
+            self.batches.append(json['ids'])
+            call = len(self.batches)
+        result = self.handler(json['ids'], call)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+def found(ids):
+    return response(200, [{'paperId': i, 'title': i} if not i.endswith('missing') else None for i in ids])
+
+def client_for(session, **kwargs):
+    return SemanticScholarClient(session=session, pacer=AIMDPacer(interval=0, min_interval=0, max_interval=0), **kwargs)
+
+def test_batches_are_fetched_and_unknown_ids_left_out():
+    session = FakeSemanticScholar(lambda ids, call: found(ids))
+    client = client_for(session, batch_size=2)
+    papers = client.fetch(['arXiv:1', 'arXiv:2', 'arXiv:missing'])
+    assert set(papers) == {'arXiv:1', 'arXiv:2'}
+    assert sorted(map(len, session.batches)) == [1, 2]
+    assert client.succeeded == 2 and not client.failed_ids
+
+def test_throttled_and_failed_batches_are_requeued():
+    def handler(ids, call):
+        if call == 1:
+            return response(429, headers={'Retry-After': '0'})
+        if call == 2:
+            return requests.exceptions.ConnectionError("reset")
+        return found(ids)
+    session = FakeSemanticScholar(handler)
+    client = client_for(session, max_in_flight=1)
+    assert set(client.fetch(['arXiv:1', 'arXiv:2'])) == {'arXiv:1', 'arXiv:2'}
+    assert client.retried == 2 and len(client.latencies) == 3
+
+def test_oversized_batches_are_split_and_bad_ids_reported():
+    def handler(ids, call):
+        if len(ids) > 2 or 'DOI:bad' in ids:
+            return response(400, {'error': 'Too many ids'})
+        return found(ids)
+    session = FakeSemanticScholar(handler)
+    client = client_for(session)
+    papers = client.fetch(['arXiv:1', 'arXiv:2', 'arXiv:3', 'DOI:bad', 'arXiv:5'])
+    assert set(papers) == {'arXiv:1', 'arXiv:2', 'arXiv:3', 'arXiv:5'}
+    assert client.failed_ids == ['DOI:bad']
+    assert client.split == 3
+
+def test_batches_give_up_after_max_attempts():
+    session = FakeSemanticScholar(lambda ids, call: response(503))
+    client = client_for(session, max_attempts=3)
+    assert client.fetch(['arXiv:1']) == {}
+    assert client.failed_ids == ['arXiv:1'] and len(session.batches) == 3
+
+def test_default_session_leaves_5xx_retries_to_the_client():
+    client = SemanticScholarClient()
+    retry = client.session.get_adapter(client.url).max_retries
+    # Retried inside the session, each re-queued attempt would cost up to six paced-around requests
+    assert not retry.status_forcelist
+
+def test_pacer_backs_off_multiplicatively_and_recovers_additively():
+    pacer = AIMDPacer(interval=1.0, min_interval=1.0, max_interval=10.0, step=0.5)
+    pacer.throttled()
+    pacer.throttled()
+    assert pacer.interval == 4.0
+    pacer.success()
+    assert pacer.interval == 3.5
+    pacer.throttled(retry_after=30)
+    assert pacer.next_start >= time.monotonic() + 29
@@ -0,0 +1,38 @@
+import json
+import os
+import sys
+from pathlib import Path
+from unittest.mock import patch
+import pytest
+
+# Add the parent directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import serialization
+from serialization import dumps, load_json, save_json
+
+DATA = {'last_updated': None, 'repositories': {'a/ü': {'lists': ['ml'], 'stars': 3}}}
+
+@pytest.mark.parametrize('fast_path', [True, False])
+def test_pretty_and_compact_output_match_across_backends(fast_path):
+    with patch.object(serialization, 'orjson', serialization.orjson if fast_path else None):
+        pretty = dumps(DATA, compact=False)
+        compact = dumps(DATA, compact=True)
+    assert pretty.decode('utf-8') == json.dumps(DATA, ensure_ascii=False, indent=2)
+    assert compact.decode('utf-8') == json.dumps(DATA, ensure_ascii=False, separators=(',', ':'))
+
+def test_save_json_round_trips_and_leaves_no_temp_files(tmp_path):
+    path = tmp_path / 'github_stars.json'
+    save_json(DATA, str(path))
+    save_json(DATA, str(path), compact=True)
+    assert load_json(str(path)) == DATA
+    assert os.listdir(tmp_path) == ['github_stars.json']
+    assert os.stat(path).st_mode & 0o777 == 0o644
+
+def test_failed_write_keeps_the_previous_file(tmp_path):
+    path = tmp_path / 'github_stars.json'
+    save_json(DATA, str(path))
+    with patch('serialization.os.fsync', side_effect=OSError("disk full")), pytest.raises(OSError):
+        save_json({'repositories': {}}, str(path))
+    assert load_json(str(path)) == DATA
+    assert os.listdir(tmp_path) == ['github_stars.json']
@@ -0,0 +1,119 @@
+import json
+import sys
+from pathlib import Path
+import pytest
+
+# Add the parent directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from storage import Journal, SQLiteStore, JSONStore, get_store
+
+def make_repo(name, starred_at, lists=(), arxiv_ids=()):
+    return {
+        'lists': list(lists),
+        'metadata': {'full_name': name, 'starred_at': starred_at, 'pushed_at': starred_at},
+        'last_updated': starred_at,
+        'arxiv': {'ids': list(arxiv_ids), 'primary_id': arxiv_ids[0] if arxiv_ids else None, 'bibtex_citations': []},
+    }
+
+@pytest.fixture
+def stars_data():
+    return {
+        'last_updated': '2024-01-03T00:00:00+00:00',
+        'repositories': {
+            'b/second': make_repo('b/second', '2024-01-02T00:00:00Z', lists=['ml'], arxiv_ids=['2401.00001']),
+            'a/first': make_repo('a/first', '2024-01-01T00:00:00Z', lists=['ml', 'tools']),
+        },
+    }
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteStore(db_path=str(tmp_path / 'stars.db'), json_path=str(tmp_path / 'github_stars.json'))
+    yield store
+    store.close()
+
+def test_round_trip_preserves_records_and_order(store, stars_data):
+    store.save(stars_data)
+    assert store.load() == stars_data
+    assert list(store.load()['repositories']) == ['b/second', 'a/first']
+
+def test_load_returns_default_when_empty(store):
+    assert store.load({'repositories': {}, 'extra': 1}) == {'repositories': {}, 'extra': 1}
+
+def test_save_only_writes_changed_repos(store, stars_data):
+    store.save(stars_data)
+    data = store.load()
+    data['repositories']['a/first']['metadata']['stars'] = 10
+    data['repositories']['c/third'] = make_repo('c/third', '2024-01-03T00:00:00Z')
+
+    before = store.conn.total_changes
+    store.save(data)
+    # meta rows plus two repo upserts and their list/arXiv rows; 'b/second' is untouched
+    assert store.conn.total_changes - before < 10
+    assert store.load() == data
+
+    del data['repositories']['b/second']
+    store.save(data)
+    assert 'b/second' not in store.load()['repositories']
+    assert store.repos_citing('2401.00001') == []
+
+def test_indexes_lists_and_arxiv_links(store, stars_data):
+    store.save(stars_data)
+    assert store.repos_in_list('ml') == ['b/second', 'a/first']
+    assert store.repos_in_list('tools') == ['a/first']
+    assert store.repos_citing('2401.00001') == ['b/second']
+    assert store.arxiv_ids() == ['2401.00001']
+
+def test_imports_json_and_reimports_when_it_changes(store, stars_data):
+    Path(store.json_path).write_text(json.dumps(stars_data))
+    assert store.load() == stars_data
+
+    # Our own export is not mistaken for an outside change
+    store.export()
+    assert store.load() == stars_data
+
+    stars_data['repositories']['a/first']['lists'] = []
+    Path(store.json_path).write_text(json.dumps(stars_data))
+    assert store.load() == stars_data
+    assert store.repos_in_list('tools') == []
+
+def test_export_matches_json_store(store, stars_data, tmp_path):
+    store.save(stars_data)
+    store.export(str(tmp_path / 'public' / 'github_stars.json'))
+
+    json_store = JSONStore(str(tmp_path / 'reference.json'))
+    json_store.save(stars_data)
+    assert (tmp_path / 'public' / 'github_stars.json').read_text() == (tmp_path / 'reference.json').read_text()
+
+def test_get_store_rejects_unknown_backend():
+    assert isinstance(get_store('json'), JSONStore)
+    with pytest.raises(ValueError):
+        get_store('yaml')
+
+def test_journal_survives_repeated_crashes(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+
+    def crash_mid_write(journal):
+        # The process dies with its handle open, partway through the next line
+        journal._file.close()
+        journal._file = None
+        with open(path, 'a') as f:
+            f.write('{"full_name": "torn/re')
+
+    first = Journal(path)
+    first.append('a/1', {'n': 1})
+    crash_mid_write(first)
+
+    # Resume, finish another repo, crash again
+    second = Journal(path)
+    assert second.replay({'repositories': {}}) == 1
+    second.append('a/2', {'n': 2})
+    crash_mid_write(second)
+
+    third = Journal(path)
+    assert third.replay({'repositories': {}}) == 2
+    third.append('a/3', {'n': 3})
+
+    data = {'repositories': {}}
+    assert Journal(path).replay(data) == 3
+    assert data['repositories'] == {'a/1': {'n': 1}, 'a/2': {'n': 2}, 'a/3': {'n': 3}}
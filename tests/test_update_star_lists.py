@@ -0,0 +1,74 @@
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+import pytest
+import requests
+
+pytest.importorskip("bs4")
+
+# Add the parent directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import update_star_lists
+from github_client import RateLimiter
+from update_star_lists import crawl_lists, get_repos_in_list, LIST_PAGE_SIZE
+
+def list_page(repos):
+    rows = ''.join(f'<div class="col-12 d-block"><h3><a href="/{name}">{name.replace("/", " / ")}</a></h3></div>' for name in repos)
+    return f'<div id="user-list-repositories">{rows}</div>'
+
+class FakeListPages:
+    """Serves star list pages of LIST_PAGE_SIZE repositories from {list_url: [repo, ...]}, recording every page requested."""
+
+    def __init__(self, lists, missing=()):
+        self.lists = lists
+        self.missing = set(missing)
+        self.requested = []
+        self._lock = threading.Lock()
+
+    def get(self, url, use_cache=True):
+        list_url, page = url.removeprefix(update_star_lists.GITHUB_URL).split('?page=')
+        with self._lock:
+            self.requested.append((list_url, int(page)))
+        response = MagicMock(headers={})
+        if (list_url, int(page)) in self.missing:
+            response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=MagicMock(status_code=404))
+            return response
+        start = (int(page) - 1) * LIST_PAGE_SIZE
+        response.text = list_page(self.lists[list_url][start:start + LIST_PAGE_SIZE])
+        return response
+
+@pytest.fixture(autouse=True)
+def rate_limiter():
+    with patch.object(update_star_lists, 'rate_limiter', RateLimiter(limit=10**6)):
+        yield
+
+def repos(prefix, count):
+    return [f"{prefix}/repo{i}" for i in range(count)]
+
+def test_predicted_pages_are_fetched_without_a_page_limit():
+    lists = {'/u/lists/big': repos('big', 3010), '/u/lists/small': repos('small', 45), '/u/lists/empty': []}
+    client = FakeListPages(lists)
+    star_lists = [('Big', '/u/lists/big', 3010), ('Small', '/u/lists/small', 45), ('Empty', '/u/lists/empty', 0)]
+
+    crawled = list(crawl_lists(star_lists, client, workers=8))
+
+    assert crawled == [('Big', 3010, lists['/u/lists/big']), ('Small', 45, lists['/u/lists/small']), ('Empty', 0, [])]
+    # Exactly the predicted pages: no trailing empty page per list, and more than 100 for the big one
+    assert sorted(client.requested) == sorted(
+        [('/u/lists/big', page) for page in range(1, 102)] + [('/u/lists/small', 1), ('/u/lists/small', 2)] + [('/u/lists/empty', 1)]
+    )
+
+def test_pages_stop_at_the_repo_count():
+    client = FakeListPages({'/u/lists/exact': repos('exact', 60), '/u/lists/short': repos('short', 75)})
+    # An exact multiple of the page size ends on a full page without probing the next one
+    assert get_repos_in_list('/u/lists/exact', client, repo_count=60) == repos('exact', 60)
+    # Predicted pages that come up short of the count are followed up one at a time
+    assert get_repos_in_list('/u/lists/short', client, repo_count=75, pages=[repos('short', 30)]) == repos('short', 75)
+    assert client.requested == [('/u/lists/exact', 1), ('/u/lists/exact', 2), ('/u/lists/short', 2), ('/u/lists/short', 3)]
+
+def test_missing_pages_end_the_list():
+    client = FakeListPages({'/u/lists/a': repos('a', 90)}, missing={('/u/lists/a', 2)})
+    assert get_repos_in_list('/u/lists/a', client) == repos('a', 30)
+    assert [page for _, page in client.requested] == [1, 2]
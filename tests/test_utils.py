@@ -0,0 +1,47 @@
+import sys
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+import pytest
+import requests
+
+# Add the parent directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from github_client import GitHubClient
+from utils import controlled_request
+
+def make_response(status_code, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = b'{}'
+    response.headers.update(headers or {})
+    return response
+
+@pytest.fixture
+def session():
+    session = MagicMock()
+    client = GitHubClient(session=session, cache=None, max_retries=3)
+    with patch('utils.get_client', return_value=client):
+        yield session
+
+def test_controlled_request_uses_the_clients_retry_policy(session):
+    session.request.side_effect = [make_response(429, {'Retry-After': '2'}), make_response(200)]
+    with patch('time.sleep') as mock_sleep:
+        response = controlled_request("https://api.semanticscholar.org/v1/paper/x")
+
+    assert response.status_code == 200
+    assert session.request.call_count == 2
+    # One backoff honouring Retry-After, and no fixed delay on top
+    mock_sleep.assert_called_once_with(2.0)
+
+def test_controlled_request_gives_up_when_still_rate_limited(session):
+    session.request.return_value = make_response(429)
+    with patch('github_client.time.sleep'):
+        assert controlled_request("http://export.arxiv.org/api/query", params={'id_list': 'x'}) is None
+    assert session.request.call_count == 3
+
+def test_controlled_request_raises_other_errors(session):
+    session.request.return_value = make_response(404)
+    with pytest.raises(requests.exceptions.HTTPError):
+        controlled_request("https://api.semanticscholar.org/v1/paper/missing", method='POST', json={})
+    session.request.assert_called_once()
@@ -1,98 +1,48 @@
 import requests
 from bs4 import BeautifulSoup
 import json
-import time
 from datetime import datetime, UTC
 import os
 from loguru import logger
 import sys
 import re
-import random
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+from github_client import GitHubClient, RateLimiter, parse_tokens
+from rate_governor import RateBudgetExhausted
+from storage import get_store, STARS_FILE
 
 GITHUB_API = "https://api.github.com"
 GITHUB_URL = "https://github.com"
-STARS_FILE = 'github_stars.json'
 MAX_RETRIES = 5
 INITIAL_BACKOFF = 60  # Initial backoff time in seconds
-RATE_LIMIT_THRESHOLD = 10  # Number of requests to keep in reserve
-DEFAULT_RATE_LIMIT = 60  # Default to 60 requests per minute
-DEFAULT_RATE_LIMIT_WINDOW = 60  # 1 minute in seconds
+LIST_PAGE_SIZE = 30  # Repositories per star list page
+LIST_CRAWL_WORKERS = 4  # List pages fetched at once; every request still draws on rate_limiter's shared budget
 
 logger.add("star_lists_update.log", rotation="10 MB")
 
+store = get_store()
+
 def load_existing_data():
-    if os.path.exists(STARS_FILE):
-        with open(STARS_FILE, 'r') as f:
-            return json.load(f)
-    return {"last_updated": None, "repositories": {}}
+    return store.load()
 
 def save_data(data):
-    with open(STARS_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
-
-class RateLimiter:
-    def __init__(self, limit=DEFAULT_RATE_LIMIT, window=DEFAULT_RATE_LIMIT_WINDOW):
-        self.limit = limit
-        self.window = window
-        self.tokens = limit
-        self.last_updated = time.time()
-
-    def update_rate_limit(self, headers):
-        new_limit = int(headers.get('X-RateLimit-Limit', self.limit))
-        new_remaining = int(headers.get('X-RateLimit-Remaining', self.tokens))
-        new_reset = int(headers.get('X-RateLimit-Reset', time.time() + self.window))
-        
-        # Only update if we're dealing with API rate limits (which are typically higher)
-        if new_limit > DEFAULT_RATE_LIMIT:
-            self.limit = new_limit
-            self.tokens = new_remaining
-            self.window = max(new_reset - time.time(), 1)
-        else:
-            # For web scraping, stick to the default limits
-            self.tokens = min(new_remaining, self.tokens)
-        
-        self.last_updated = time.time()
-
-    def wait_if_needed(self):
-        now = time.time()
-        time_passed = now - self.last_updated
-        self.tokens = min(self.limit, self.tokens + time_passed * (self.limit / self.window))
-
-        if self.tokens < RATE_LIMIT_THRESHOLD:
-            sleep_time = (RATE_LIMIT_THRESHOLD - self.tokens) * (self.window / self.limit)
-            logger.info(f"Approaching rate limit. Sleeping for {sleep_time:.2f} seconds.")
-            time.sleep(sleep_time)
-            self.tokens = RATE_LIMIT_THRESHOLD
-            self.last_updated = time.time()
-        else:
-            self.tokens -= 1
-            self.last_updated = now
-
-def exponential_backoff(attempt):
-    return INITIAL_BACKOFF * (2 ** attempt) + random.uniform(0, 1)
+    store.save(data)
 
 rate_limiter = RateLimiter()
 
-def make_request(session, url, max_retries=MAX_RETRIES):
-    for attempt in range(max_retries):
-        rate_limiter.wait_if_needed()
-        try:
-            response = session.get(url)
-            response.raise_for_status()
-            rate_limiter.update_rate_limit(response.headers)
-            return response
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 429:
-                if attempt < max_retries - 1:
-                    backoff_time = exponential_backoff(attempt)
-                    logger.warning(f"Rate limited (429). Backing off for {backoff_time:.2f} seconds.")
-                    time.sleep(backoff_time)
-                    continue
-            raise
-
-def get_star_lists(username, session):
+def make_request(client, url):
+    """Paced GET through the shared GitHub client, which handles 429 backoff and retries."""
+    rate_limiter.wait_if_needed()
+    response = client.get(url, use_cache=False)
+    response.raise_for_status()
+    rate_limiter.update_rate_limit(response.headers)
+    return response
+
+def get_star_lists(username, client):
     url = f"{GITHUB_URL}/{username}?tab=stars"
-    response = make_request(session, url)
+    response = make_request(client, url)
     soup = BeautifulSoup(response.text, 'html.parser')
     
     lists = []
@@ -120,41 +70,73 @@ def clean_repo_name(repo_name):
         return f"{owner.strip()}/{name.strip()}"
     return repo_name.strip()
 
-def get_repos_in_list(list_url, session):
+def expected_pages(repo_count, page_size=LIST_PAGE_SIZE):
+    return max(1, math.ceil(repo_count / page_size))
+
+def parse_list_page(html):
+    soup = BeautifulSoup(html, 'html.parser')
     repos = []
-    page = 1
-    while True:
-        full_url = f"{GITHUB_URL}{list_url}?page={page}"
-        try:
-            response = make_request(session, full_url)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            repo_elements = soup.select('#user-list-repositories .col-12.d-block')
-            if not repo_elements:
-                break
-            
-            for element in repo_elements:
-                repo_link = element.select_one('h3 a')
-                if repo_link:
-                    repo_name = repo_link.text.strip()
-                    clean_name = clean_repo_name(repo_name)
-                    repos.append(clean_name)
-            
-            page += 1
-            if page > 100:
-                logger.warning(f"Reached page limit (100) for list {list_url}. Some repositories may be missing.")
-                break
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 404:
-                logger.warning(f"Reached end of list or encountered 404 error for {list_url} on page {page}. Some repositories may be missing.")
-                break
-            else:
-                raise
-    
+    for element in soup.select('#user-list-repositories .col-12.d-block'):
+        repo_link = element.select_one('h3 a')
+        if repo_link:
+            repos.append(clean_repo_name(repo_link.text.strip()))
     return repos
 
+def get_list_page(list_url, page, client):
+    """The repositories on one page of a star list; a 404 counts as past the end."""
+    try:
+        response = make_request(client, f"{GITHUB_URL}{list_url}?page={page}")
+    except requests.exceptions.HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
+            logger.warning(f"Reached end of list or encountered 404 error for {list_url} on page {page}. Some repositories may be missing.")
+            return []
+        raise
+    return parse_list_page(response.text)
+
+def needs_more_pages(pages, repo_count=None):
+    """Whether a list runs past the pages fetched so far: they hold fewer repos than its count, or, without a count, the last wasn't empty."""
+    if not pages[-1]:
+        return False
+    return repo_count is None or sum(map(len, pages)) < repo_count
+
+def get_repos_in_list(list_url, client, repo_count=None, pages=None):
+    """
+    Every repository in a star list, in list order.
+
+    `pages` are leading pages already fetched; further pages are fetched one
+    at a time for as long as the list runs on, with no page limit. Without a
+    `repo_count`, that means until an empty page.
+    """
+    pages = list(pages or [get_list_page(list_url, 1, client)])
+    while needs_more_pages(pages, repo_count):
+        pages.append(get_list_page(list_url, len(pages) + 1, client))
+    return [repo for page in pages for repo in page]
+
+def crawl_lists(star_lists, client, workers=LIST_CRAWL_WORKERS):
+    """
+    Yield (list_name, repo_count, repos) for each of `star_lists`, in order.
+
+    Each list's page count is predicted from the repo count on the profile, and
+    every predicted page of every list is fetched up front on a pool of
+    `workers` threads, so one list is yielded (and can be committed) while later
+    ones are still downloading. A list whose predicted pages hold fewer repos than
+    its count is finished page by page by get_repos_in_list.
+    """
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='star-lists')
+    try:
+        futures = [
+            [pool.submit(get_list_page, list_url, page, client) for page in range(1, expected_pages(repo_count) + 1)]
+            for _, list_url, repo_count in star_lists
+        ]
+        for (list_name, list_url, repo_count), list_futures in zip(star_lists, futures):
+            pages = [future.result() for future in list_futures]
+            yield list_name, repo_count, get_repos_in_list(list_url, client, repo_count, pages)
+    finally:
+        pool.shutdown(cancel_futures=True)
+
 def commit_and_push():
     try:
+        store.export(STARS_FILE)
         os.system('git config --global user.name "GitHub Action"')
         os.system('git config --global user.email "action@github.com"')
         os.system(f'git add {STARS_FILE}')
@@ -168,20 +150,18 @@ def update_star_lists(username, token):
     logger.info(f"Starting star lists update for user: {username}")
     existing_data = load_existing_data()
     
-    session = requests.Session()
-    session.headers.update({'Authorization': f'token {token}'})
+    client = GitHubClient(token, max_retries=MAX_RETRIES, backoff_base=INITIAL_BACKOFF)
+    changes_made = False
     
     try:
-        api_response = make_request(session, f"{GITHUB_API}/rate_limit")
+        api_response = make_request(client, f"{GITHUB_API}/rate_limit")
         rate_limit_data = api_response.json()['resources']['core']
         logger.info(f"Initial rate limit: {rate_limit_data['remaining']}/{rate_limit_data['limit']}")
         
-        star_lists = get_star_lists(username, session)
-        changes_made = False
+        star_lists = get_star_lists(username, client)
         
-        for list_name, list_url, repo_count in star_lists:
+        for list_name, repo_count, repos_in_list in crawl_lists(star_lists, client):
             logger.info(f"Processing list: {list_name} (Expected repos: {repo_count})")
-            repos_in_list = get_repos_in_list(list_url, session)
             
             logger.info(f"Found {len(repos_in_list)} repositories in list {list_name}")
             if len(repos_in_list) < repo_count:
@@ -216,6 +196,9 @@ def update_star_lists(username, token):
         else:
             logger.info("Star lists update completed. No changes were necessary.")
     
+    except RateBudgetExhausted as e:
+        # Every list with changes has already been saved and committed
+        logger.warning(f"{e}. Exiting early; the next run will pick up the remaining lists.")
     except requests.exceptions.RequestException as e:
         logger.error(f"An error occurred during the update process: {e}")
         if changes_made:
@@ -226,10 +209,10 @@ def update_star_lists(username, token):
 
 if __name__ == "__main__":
     username = os.environ.get('GITHUB_USERNAME')
-    token = os.environ.get('GITHUB_TOKEN')
+    token = parse_tokens(os.environ.get('GITHUB_TOKENS') or os.environ.get('GITHUB_TOKEN'))
     
     if not username or not token:
-        logger.error("GITHUB_USERNAME or GITHUB_TOKEN environment variable is not set.")
+        logger.error("GITHUB_USERNAME or GITHUB_TOKEN(S) environment variable is not set.")
         sys.exit(1)
     
     update_star_lists(username, token)
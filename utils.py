@@ -1,8 +1,8 @@
-import requests
 import subprocess
-import time
 from loguru import logger
 
+from github_client import get_client
+
 def commit_and_push(file_to_commit):
     try:
         # Configure Git for GitHub Actions
@@ -28,38 +28,18 @@ def commit_and_push(file_to_commit):
             logger.warning("Exiting early due to Git error.")
             raise
 
-def handle_rate_limit(response, threshold):
-    remaining = int(response.headers.get('X-RateLimit-Remaining', 0))
-    reset_time = int(response.headers.get('X-RateLimit-Reset', 0))
-    
-    if remaining <= threshold:
-        current_time = time.time()
-        sleep_time = max(reset_time - current_time, 0) + 1
-        
-        if sleep_time > 0:
-            logger.warning(f"Rate limit low. {remaining} requests remaining. Sleeping for {sleep_time:.2f} seconds until reset.")
-            time.sleep(sleep_time)
-        else:
-            logger.info(f"Rate limit low but reset time has passed. Proceeding cautiously.")
-
-def controlled_request(url, method='get', params=None, json=None, max_retries=3, delay=1):
-    for attempt in range(max_retries):
-        try:
-            if method.lower() == 'get':
-                response = requests.get(url, params=params)
-            elif method.lower() == 'post':
-                response = requests.post(url, params=params, json=json)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-            
-            response.raise_for_status()
-            time.sleep(delay)  # Wait for 1 second before the next request
-            return response
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 429:
-                logger.warning(f"Rate limit exceeded. Retrying in {2**attempt} seconds.")
-                time.sleep(2**attempt)  # Exponential backoff
-            else:
-                raise
-    logger.error("Max retries reached. Unable to complete the request.")
-    return None
+def controlled_request(url, method='get', params=None, json=None):
+    """
+    Send a request through the shared client, so retries follow its single policy:
+    the session retries 5xx and the client backs off 429s honouring Retry-After.
+    Returns None if the request is still rate limited once those retries run out.
+    """
+    method = method.lower()
+    if method not in ('get', 'post'):
+        raise ValueError(f"Unsupported HTTP method: {method}")
+    response = get_client(None).request(method, url, params=params, json=json, use_cache=False)
+    if response.status_code == 429:
+        logger.error("Max retries reached. Unable to complete the request.")
+        return None
+    response.raise_for_status()
+    return response